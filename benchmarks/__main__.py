@@ -0,0 +1,162 @@
+"""
+Measure the speed of geoconvert functions.
+
+Run it from the root of the repository:
+    python -m benchmarks                          # run all benchmarks
+    python -m benchmarks -k safe_string           # only the matching ones
+    python -m benchmarks --save                   # store results as the baseline
+    python -m benchmarks --compare --threshold 0.2
+
+When comparing, the exit code is 1 if any benchmark is slower than the
+baseline by more than the threshold (0.2 meaning 20%).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+from .cases import CASES, COLD_START_CASES
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def calibrate(function, inputs, min_round_time):
+    """
+    Return how many times inputs must be gone through for a round
+    to last at least min_round_time seconds.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            for text in inputs:
+                function(text)
+        if time.perf_counter() - start >= min_round_time:
+            return number
+        number *= 2
+
+
+def measure(function, inputs, rounds=20, min_round_time=0.01):
+    """
+    Return statistics about the time taken by one call of function,
+    going through inputs in turn.
+    """
+    number = calibrate(function, inputs, min_round_time)
+    calls = number * len(inputs)
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            for text in inputs:
+                function(text)
+        timings.append((time.perf_counter() - start) / calls)
+    return summarize(timings)
+
+
+def measure_cold_start(statement, rounds=20):
+    """
+    Return statistics about the time taken by statement in a new interpreter,
+    bytecode being cached like in a regular installation.
+    """
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"{statement}; print(time.perf_counter() - start)"
+    )
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key != "PYTHONDONTWRITEBYTECODE"
+    }
+    timings = []
+    # The first run only writes the bytecode
+    for _ in range(rounds + 1):
+        output = subprocess.run(
+            [sys.executable, "-c", code], env=env, check=True, capture_output=True
+        ).stdout
+        timings.append(float(output))
+    return summarize(timings[1:])
+
+
+def summarize(timings):
+    percentiles = statistics.quantiles(timings, n=100, method="inclusive")
+    median = statistics.median(timings)
+    return {
+        "ops_per_sec": 1 / median,
+        "p50": median,
+        "p90": percentiles[89],
+        "p99": percentiles[98],
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Return the names of the benchmarks which are slower than the baseline
+    by more than the threshold.
+    """
+    return [
+        name
+        for name, stats in results.items()
+        if name in baseline and stats["p50"] > baseline[name]["p50"] * (1 + threshold)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-k", "--filter", help="only run benchmarks containing it")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="store as baseline")
+    parser.add_argument("--compare", action="store_true", help="compare to baseline")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        baseline = json.loads(args.baseline.read_text())
+
+    results = {}
+    print(
+        f"{'benchmark':<48} {'ops/sec':>10} {'p50 µs':>9} {'p90 µs':>9} {'p99 µs':>9}"
+    )
+    benchmarks = [
+        (name, partial(measure, function, inputs))
+        for name, (function, inputs) in CASES.items()
+    ] + [
+        (name, partial(measure_cold_start, statement))
+        for name, statement in COLD_START_CASES.items()
+    ]
+    for name, run in benchmarks:
+        if args.filter and args.filter not in name:
+            continue
+        stats = results[name] = run(rounds=args.rounds)
+        line = (
+            f"{name:<48} {stats['ops_per_sec']:>10.0f} {stats['p50'] * 1e6:>9.2f}"
+            f" {stats['p90'] * 1e6:>9.2f} {stats['p99'] * 1e6:>9.2f}"
+        )
+        if name in baseline:
+            change = stats["p50"] / baseline[name]["p50"] - 1
+            line += f" {change:>+8.1%}"
+        print(line)
+
+    if args.save:
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(
+            f"Slower than the baseline by more than {args.threshold:.0%}: "
+            + ", ".join(regressions)
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+Benchmarked functions, each one with the inputs it is called with in turn.
+"""
+
+import io
+from functools import partial
+
+from geoconvert import (
+    address_to_country_and_subdivision_codes,
+    address_to_country_code,
+    address_to_subdivision_code,
+    br_address_to_state_code,
+    br_postcode_to_state_code,
+    br_postcodes_to_state_codes,
+    ca_address_to_province_code,
+    count_countries,
+    de_address_to_land_code,
+    de_postcode_to_land_code,
+    de_postcodes_to_land_codes,
+    find_countries,
+    find_countries_in_stream,
+    find_country_mentions,
+    fr_address_to_dept_code,
+    fr_postcode_to_dept_code,
+    fr_postcodes_to_dept_codes,
+    us_address_to_state_code,
+)
+from geoconvert.address import AddressParser
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+try:
+    import pandas
+
+    import geoconvert.pandas_accessor  # noqa: F401
+except ImportError:
+    pandas = None
+try:
+    import pyarrow
+
+    from geoconvert.arrow import arrow_addresses_to_country_and_subdivision_codes
+except ImportError:
+    pyarrow = None
+from geoconvert.utils import safe_string
+
+# Found via a country name, a capital name or a subdivision
+HIT_ADDRESSES = [
+    "Welcome to Cyprus",
+    "Willkommen bei Kairo",
+    "14467 Potsdam",
+    "Montréal, Québec",
+    "1800 W Erie Ave, Lorain, OH 44052",
+]
+# Nothing found
+MISS_ADDRESSES = [
+    "2 pl. Saint-Pierre, Nantes",
+    "Av. Pres. Castelo Branco, Portão 3 - Maracanã",
+    "96524 Föritztal OT Neuhaus-Schierschnitz",
+]
+DOCUMENT = (
+    "Le programme a été mis en œuvre au Bénin, au Cameroun, en Côte d’Ivoire, "
+    "à Madagascar et au Tchad, avec le soutien de la France, de l'Allemagne "
+    "et du Royaume-Uni. Les rapports sont disponibles à Bruxelles et à Genève."
+)
+# About 100 kB
+LARGE_DOCUMENT = DOCUMENT * 500
+address_parser = AddressParser()
+
+CASES = {
+    "address_to_country_and_subdivision_codes[hit]": (
+        address_to_country_and_subdivision_codes,
+        HIT_ADDRESSES,
+    ),
+    "address_to_country_and_subdivision_codes[miss]": (
+        address_to_country_and_subdivision_codes,
+        MISS_ADDRESSES,
+    ),
+    "address_to_country_code[hit]": (address_to_country_code, HIT_ADDRESSES),
+    "address_to_country_code[miss]": (address_to_country_code, MISS_ADDRESSES),
+    "address_to_subdivision_code": (
+        address_to_subdivision_code,
+        HIT_ADDRESSES + MISS_ADDRESSES,
+    ),
+    "find_countries": (find_countries, [DOCUMENT]),
+    "find_country_mentions[spans]": (
+        partial(find_country_mentions, spans=True),
+        [DOCUMENT],
+    ),
+    "count_countries": (count_countries, [DOCUMENT]),
+    "find_countries_in_stream[100kB]": (
+        lambda text: find_countries_in_stream(io.StringIO(text)),
+        [LARGE_DOCUMENT],
+    ),
+    "safe_string[ascii]": (safe_string, ["1800 W Erie Ave, Lorain, OH 44052"]),
+    "safe_string[unicode]": (safe_string, ["Provence-Alpes-Côte d’Azur"]),
+    "br_address_to_state_code": (
+        br_address_to_state_code,
+        ["Luz, 01120-010", "Piauí", "Dourados, MS", "Wonderland"],
+    ),
+    "ca_address_to_province_code": (
+        ca_address_to_province_code,
+        ["H3T 1X6", "Toronto, Ontario", "Toronto, ON", "Wonderland"],
+    ),
+    "de_address_to_land_code": (
+        de_address_to_land_code,
+        ["region DE2", "Thüringen", "Potsdam", "53119 Bonn", "Wonderland"],
+    ),
+    "fr_address_to_dept_code": (
+        fr_address_to_dept_code,
+        [
+            "Chemin du Solarium 33175 GRADIGNAN CEDEX",
+            "Les Pays de la Loire",
+            "Loire-Atlantique",
+            "Wonderland",
+        ],
+    ),
+    "us_address_to_state_code": (
+        us_address_to_state_code,
+        ["Sunnyvale, CA 94085", "New Hampshire", "Los Angeles, CA", "Wonderland"],
+    ),
+    "br_postcode_to_state_code": (br_postcode_to_state_code, ["Luz, 01120-010"]),
+    "de_postcode_to_land_code": (de_postcode_to_land_code, ["53119 Bonn"]),
+    "fr_postcode_to_dept_code": (
+        fr_postcode_to_dept_code,
+        ["44000 Nantes", "20223 Solenzara", "97821 Le Port", "98800 Nouméa"],
+    ),
+    "AddressParser.parse": (
+        address_parser.parse,
+        ["2 pl. Saint-Pierre, 44000 Nantes", "BP 123 CEDEX 44 (44)", "Wonderland"],
+    ),
+}
+
+if numpy is not None:
+    # 10000 postcodes in one call
+    CASES["br_postcodes_to_state_codes[10000]"] = (
+        br_postcodes_to_state_codes,
+        [numpy.linspace(0, 99999999, 10000, dtype=numpy.int64)],
+    )
+    CASES["de_postcodes_to_land_codes[10000]"] = (
+        de_postcodes_to_land_codes,
+        [numpy.linspace(1000, 99999, 10000, dtype=numpy.int64)],
+    )
+    CASES["fr_postcodes_to_dept_codes[10000]"] = (
+        fr_postcodes_to_dept_codes,
+        [numpy.linspace(1000, 99999, 10000, dtype=numpy.int64)],
+    )
+
+if pandas is not None:
+    # 10000 rows of 8 distinct addresses
+    CASES["Series.geoconvert.country_and_subdivision[10000]"] = (
+        lambda series: series.geoconvert.country_and_subdivision(),
+        [pandas.Series((HIT_ADDRESSES + MISS_ADDRESSES) * 1250)],
+    )
+
+if pyarrow is not None:
+    # 10000 addresses of 8 distinct ones
+    CASES["arrow_addresses_to_country_and_subdivision_codes[10000]"] = (
+        arrow_addresses_to_country_and_subdivision_codes,
+        [pyarrow.array((HIT_ADDRESSES + MISS_ADDRESSES) * 1250)],
+    )
+
+# Statements run in a new interpreter, to measure the cost of a cold start
+COLD_START_CASES = {
+    "import geoconvert": "import geoconvert",
+    "import geoconvert + first lookup": (
+        "import geoconvert; "
+        "geoconvert.address_to_country_and_subdivision_codes('14467 Potsdam')"
+    ),
+}
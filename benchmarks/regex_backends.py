@@ -0,0 +1,106 @@
+"""
+Compare the regex backends searching the big alternations of geoconvert.data.
+
+Run it from the root of the repository:
+    python -m benchmarks.regex_backends
+    python -m benchmarks.regex_backends --backends re re2 --rounds 500
+
+For each installed backend (re, re2, regex), report the microseconds per search
+of each regex over the benchmark addresses and a long text, then per call of the
+subdivision lookups going through these regexes, which do not always search them.
+"""
+
+import argparse
+import sys
+import time
+
+from geoconvert import (
+    br_address_to_state_code,
+    ca_address_to_province_code,
+    data,
+    de_address_to_land_code,
+    fr_address_to_dept_code,
+    us_address_to_state_code,
+)
+from geoconvert.regex_backend import (
+    available_regex_backends,
+    get_regex_backend,
+    set_regex_backend,
+)
+from geoconvert.utils import safe_string
+
+from .cases import DOCUMENT, HIT_ADDRESSES, MISS_ADDRESSES
+
+ADDRESSES = HIT_ADDRESSES + MISS_ADDRESSES
+# Lookups search safe texts, and codes are searched in the texts themselves
+TEXTS = ADDRESSES + [safe_string(text) for text in ADDRESSES + [DOCUMENT * 10]]
+
+REGEXES = [
+    "br_state_name_backend_regex",
+    "ca_province_name_backend_regex",
+    "de_land_name_backend_regex",
+    "de_land_hauptstadt_backend_regex",
+    "fr_department_name_backend_regex",
+    "fr_region_name_backend_regex",
+    "us_state_name_backend_regex",
+    "us_state_code_backend_regex",
+]
+LOOKUPS = [
+    br_address_to_state_code,
+    ca_address_to_province_code,
+    de_address_to_land_code,
+    fr_address_to_dept_code,
+    us_address_to_state_code,
+]
+
+
+def measure(function, texts, rounds):
+    """
+    Return the best time in microseconds of function on each text.
+    """
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for text in texts:
+            function(text)
+        best = min(best, time.perf_counter() - start)
+    return 1e6 * best / len(texts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--backends", nargs="+", default=available_regex_backends(), metavar="BACKEND"
+    )
+    parser.add_argument("--rounds", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    previous_backend = get_regex_backend()
+    rows = {}
+    try:
+        for backend in args.backends:
+            set_regex_backend(backend)
+            for name in REGEXES:
+                regex = getattr(data, name)
+                # Compiled before measuring
+                regex.search("")
+                rows.setdefault(name, []).append(
+                    measure(regex.search, TEXTS, args.rounds)
+                )
+            for function in LOOKUPS:
+                function(ADDRESSES[0])
+                rows.setdefault(function.__name__, []).append(
+                    measure(function, ADDRESSES, args.rounds)
+                )
+    finally:
+        set_regex_backend(previous_backend)
+
+    header = "µs per search / call"
+    print(f"{header:<34}" + "".join(f"{backend:>10}" for backend in args.backends))
+    for name, times in rows.items():
+        print(f"{name:<34}" + "".join(f"{elapsed:>10.2f}" for elapsed in times))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
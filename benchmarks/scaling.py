@@ -0,0 +1,106 @@
+"""
+Measure how the throughput of geoconvert scales with the number of threads.
+
+Run it from the root of the repository:
+    python -m benchmarks.scaling                  # 1, 2, 4... threads up to the CPUs
+    python -m benchmarks.scaling --threads 1 2 4 8
+    python -m benchmarks.scaling --cache          # with the shared result cache
+
+Every thread resolves the same mix of addresses and documents. On free-threaded
+Python (python3.13t, python3.14t), the throughput should grow almost linearly
+with the number of threads, up to the number of CPUs; with the GIL, threads
+take turns and the throughput stays about the same.
+"""
+
+import argparse
+import os
+import sys
+import sysconfig
+import threading
+import time
+
+from geoconvert import (
+    address_to_country_and_subdivision_codes,
+    disable_cache,
+    enable_cache,
+    find_countries,
+)
+
+from .cases import DOCUMENT, HIT_ADDRESSES, MISS_ADDRESSES
+
+WORKLOAD = [
+    (address_to_country_and_subdivision_codes, text)
+    for text in HIT_ADDRESSES + MISS_ADDRESSES
+] + [(find_countries, DOCUMENT)]
+
+
+def run(rounds):
+    for _ in range(rounds):
+        for function, text in WORKLOAD:
+            function(text)
+
+
+def measure(threads, rounds):
+    """
+    Return the calls per second of threads threads each going rounds times
+    through the workload at the same time.
+    """
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        run(rounds)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return threads * rounds * len(WORKLOAD) / (time.perf_counter() - start)
+
+
+def describe_interpreter():
+    if not sysconfig.get_config_var("Py_GIL_DISABLED"):
+        build = "with the GIL"
+    elif sys._is_gil_enabled():
+        build = "free-threaded build, GIL enabled"
+    else:
+        build = "free-threaded, GIL disabled"
+    return f"Python {sys.version.split()[0]} ({build}), {os.cpu_count()} CPUs"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, nargs="+")
+    parser.add_argument("--rounds", type=int, default=200, help="per thread")
+    parser.add_argument(
+        "--cache", action="store_true", help="use the result cache (enable_cache)"
+    )
+    args = parser.parse_args(argv)
+    threads = args.threads
+    if threads is None:
+        cpus = os.cpu_count() or 1
+        threads = sorted({1 << power for power in range(cpus.bit_length())} | {cpus})
+
+    if args.cache:
+        enable_cache(maxsize=65536)
+    # Data is loaded and automatons are built before measuring
+    run(1)
+    print(describe_interpreter())
+    print(f"{'threads':>7} {'calls/sec':>12} {'speedup':>8} {'efficiency':>10}")
+    reference = None
+    for count in threads:
+        calls_per_sec = measure(count, args.rounds)
+        reference = reference or calls_per_sec / count
+        speedup = calls_per_sec / reference
+        print(
+            f"{count:>7} {calls_per_sec:>12.0f} {speedup:>8.2f} {speedup / count:>10.0%}"
+        )
+    disable_cache()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
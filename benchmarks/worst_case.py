@@ -0,0 +1,107 @@
+"""
+Measure how the time of the main address functions grows with the size of
+worst-case texts.
+
+Run it from the root of the repository:
+    python -m benchmarks.worst_case                     # 2k to 32k characters
+    python -m benchmarks.worst_case --sizes 1000 10000 100000
+    python -m benchmarks.worst_case --max-length 2000   # with set_max_text_length
+
+Each family of texts stresses one part of the lookups: long words and digit runs
+for regexes retrying from every position, street and town names for the cleaning
+of French department names, unclosed HTML tags, postcodes, names... The time of
+every family should grow linearly with the size of the texts, about twice as long
+for twice as long texts: the command fails when it grows more than --threshold
+times (3 by default), on average, for twice as long texts. With --max-length, it
+should stay about the same whatever the size.
+"""
+
+import argparse
+import math
+import sys
+import time
+
+from geoconvert import (
+    address_to_country_and_subdivision_codes,
+    address_to_subdivision_code,
+    set_max_text_length,
+)
+
+
+def repeated(pattern):
+    # Whole repetitions only: a text cut in the middle of a name may take
+    # another path than the other sizes
+    return lambda size: pattern * max(1, round(size / len(pattern)))
+
+
+FAMILIES = {
+    "long word": repeated("a"),
+    "digits": repeated("1"),
+    "postcodes": repeated("75001 "),
+    "street names": repeated("rue de la paix "),
+    "town names": repeated("Ville-sur-Loire sous "),
+    "hyphens": repeated("saint-"),
+    "unclosed tags": repeated("<div "),
+    "html": repeated("<div class='x'>Lorem ipsum dolor</div>"),
+    "country names": repeated("Paris France Berlin "),
+    "accents": repeated("é"),
+    "address": repeated("Rue de la Loire-sur-Mer 44000 Nantes France "),
+}
+
+
+def measure(text, rounds):
+    """
+    Return the best time in seconds of the main address functions on text.
+    """
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        address_to_country_and_subdivision_codes(text)
+        address_to_subdivision_code(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[2000, 4000, 8000, 16000, 32000]
+    )
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--max-length", type=int, help="set_max_text_length")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=3.0,
+        help="largest growth of the time for twice as long texts",
+    )
+    args = parser.parse_args(argv)
+
+    set_max_text_length(args.max_length)
+    # Data is loaded and automatons are built before measuring
+    measure(FAMILIES["address"](100), 1)
+    sizes = sorted(args.sizes)
+    if len(sizes) < 2:
+        parser.error("at least two sizes are needed")
+    print(f"{'ms':<14}" + "".join(f"{size:>10}" for size in sizes) + f"{'growth':>8}")
+    failed = False
+    try:
+        for name, make in FAMILIES.items():
+            times = [measure(make(size), args.rounds) for size in sizes]
+            # Growth of the time for twice as long texts, on average
+            growth = (times[-1] / times[0]) ** (1 / math.log2(sizes[-1] / sizes[0]))
+            slow = growth > args.threshold
+            failed = failed or slow
+            print(
+                f"{name:<14}"
+                + "".join(f"{1000 * elapsed:>10.2f}" for elapsed in times)
+                + f"{growth:>8.2f}"
+                + (" superlinear" if slow else "")
+            )
+    finally:
+        set_max_text_length(None)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
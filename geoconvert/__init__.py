@@ -2,31 +2,65 @@ __author__ = "Octopusmind <informatique@octopusmind.info>"
 __version__ = "6.1.0"
 
 
+from .batch import (
+    addresses_to_country_and_subdivision_codes,
+    batch,
+    iter_addresses_to_country_and_subdivision_codes,
+    iter_batch,
+)
+from .cache import cache_clear, cache_info, disable_cache, enable_cache
 from .convert import (
     address_to_country_and_subdivision_codes,
     address_to_country_code,
     address_to_subdivision_code,
     br_address_to_state_code,
     br_postcode_to_state_code,
+    br_postcodes_to_state_codes,
     br_state_name_to_state_code,
     ca_address_to_province_code,
     ca_postcode_to_province_code,
     ca_province_name_to_province_code,
     capital_name_to_country_code,
+    count_countries,
     country_name_to_country_code,
     country_name_to_country_name_and_code,
     de_address_to_land_code,
     de_hauptstadt_to_land_code,
     de_land_name_to_land_code,
     de_postcode_to_land_code,
+    de_postcodes_to_land_codes,
     find_countries,
+    find_country_mentions,
     fr_address_to_dept_code,
     fr_dept_name_to_dept_code,
     fr_postcode_to_dept_code,
+    fr_postcodes_to_dept_codes,
     fr_region_id_to_info,
     fr_region_name_to_id,
     fr_region_name_to_info,
+    set_max_text_length,
     us_address_to_state_code,
     us_postcode_to_state_code,
     us_state_name_to_state_code,
 )
+from .metrics import (
+    disable_metrics,
+    enable_metrics,
+    export_metrics,
+    metrics_snapshot,
+    reset_metrics,
+)
+from .regex_backend import (
+    available_regex_backends,
+    get_regex_backend,
+    set_regex_backend,
+)
+from .slowlog import (
+    clear_slow_calls,
+    disable_slow_log,
+    dropped_slow_calls,
+    enable_slow_log,
+    slow_calls,
+)
+from .stream import find_countries_in_stream, iter_country_mentions
+from .trace import explain
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+asyncio versions of the main functions, running the work in an executor
+so that the event loop is not blocked by long texts.
+
+    >>> import asyncio
+    >>> from geoconvert.aio import async_address_to_country_code
+    >>> asyncio.run(async_address_to_country_code("Willkommen bei Kairo"))
+    'EG'
+"""
+
+import asyncio
+import concurrent.futures
+import contextlib
+import copy
+import weakref
+from functools import partial
+
+from .convert import (
+    address_to_country_and_subdivision_codes,
+    address_to_country_code,
+    address_to_subdivision_code,
+    find_countries,
+)
+from .parallel import _warm_up
+
+EXECUTOR_KINDS = ("thread", "process", "interpreter")
+
+
+def _create_executor(kind, max_workers=None):
+    if kind == "thread":
+        return concurrent.futures.ThreadPoolExecutor(max_workers)
+    if kind == "process":
+        return concurrent.futures.ProcessPoolExecutor(max_workers, initializer=_warm_up)
+    if kind == "interpreter":
+        try:
+            executor_class = concurrent.futures.InterpreterPoolExecutor
+        except AttributeError:
+            raise ValueError("interpreter pools need Python 3.14 or later") from None
+        return executor_class(max_workers, initializer=_warm_up)
+    raise ValueError(f"executor must be an Executor or one of {EXECUTOR_KINDS}")
+
+
+class AsyncResolver:
+    """
+    Run geoconvert functions in an executor from asyncio code.
+
+    executor is a concurrent.futures.Executor, "thread", "process" or
+    "interpreter" (Python 3.14+) to start a pool of max_workers workers
+    owned (and closed) by the resolver, or None to use the default executor
+    of the event loop. Functions must be importable by the workers of
+    process and interpreter pools (module-level functions).
+
+    At most max_concurrency texts are resolved at the same time by each
+    event loop using the resolver (any number if None), the others waiting
+    for their turn without blocking the loop.
+
+    Concurrent calls with the same function, text and options share a
+    single computation, each caller getting its own copy of the result.
+
+    >>> import asyncio
+    >>> async def main():
+    ...     async with AsyncResolver("thread", max_concurrency=4) as resolver:
+    ...         return await asyncio.gather(
+    ...             resolver.address_to_country_and_subdivision_codes("14467 Potsdam"),
+    ...             resolver.find_countries("Bienvenue à Kinshasa"),
+    ...         )
+    >>> asyncio.run(main())
+    [('DE', 'BB'), ['CD']]
+    """
+
+    def __init__(self, executor=None, max_concurrency=None, max_workers=None):
+        self._owns_executor = isinstance(executor, str)
+        if self._owns_executor:
+            executor = _create_executor(executor, max_workers)
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        # Semaphores are bound to the loop they are first used in: one per
+        # loop, created in it
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._in_flight = {}
+
+    async def run(self, function, text, **options):
+        """
+        Return function(text, **options), computed in the executor.
+        """
+        loop = asyncio.get_running_loop()
+        key = (loop, function, text, tuple(sorted(options.items())))
+        task = self._in_flight.get(key)
+        if task is None:
+            task = loop.create_task(self._run(loop, function, text, options))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda task: self._in_flight.pop(key))
+        # A caller being cancelled does not cancel the shared computation
+        result = await asyncio.shield(task)
+        # Callers sharing a result (such as the list of find_countries) must
+        # not see the changes of the others
+        return copy.copy(result)
+
+    def _semaphore(self, loop):
+        if self.max_concurrency is None:
+            return contextlib.nullcontext()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores.setdefault(
+                loop, asyncio.Semaphore(self.max_concurrency)
+            )
+        return semaphore
+
+    async def _run(self, loop, function, text, options):
+        async with self._semaphore(loop):
+            return await loop.run_in_executor(
+                self.executor, partial(function, text, **options)
+            )
+
+    async def address_to_country_code(self, text, lang=None):
+        return await self.run(address_to_country_code, text, lang=lang)
+
+    async def address_to_subdivision_code(self, text, country=None):
+        return await self.run(address_to_subdivision_code, text, country=country)
+
+    async def address_to_country_and_subdivision_codes(
+        self, text, lang=None, country=None, iso_format=False
+    ):
+        return await self.run(
+            address_to_country_and_subdivision_codes,
+            text,
+            lang=lang,
+            country=country,
+            iso_format=iso_format,
+        )
+
+    async def find_countries(self, text, lang=None, enable_ambiguous_detection=False):
+        return await self.run(
+            find_countries,
+            text,
+            lang=lang,
+            enable_ambiguous_detection=enable_ambiguous_detection,
+        )
+
+    def close(self):
+        """
+        Stop the executor if the resolver started it.
+        """
+        if self._owns_executor:
+            self.executor.shutdown()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+# Resolver of the module-level functions, using the default executor of
+# the running loop
+_default_resolver = AsyncResolver()
+
+
+async def async_address_to_country_code(text, lang=None):
+    """
+    Return address_to_country_code(text), computed in the default executor
+    of the running loop.
+    """
+    return await _default_resolver.address_to_country_code(text, lang=lang)
+
+
+async def async_address_to_subdivision_code(text, country=None):
+    """
+    Return address_to_subdivision_code(text), computed in the default
+    executor of the running loop.
+    """
+    return await _default_resolver.address_to_subdivision_code(text, country=country)
+
+
+async def async_address_to_country_and_subdivision_codes(
+    text, lang=None, country=None, iso_format=False
+):
+    """
+    Return address_to_country_and_subdivision_codes(text), computed in the
+    default executor of the running loop.
+    """
+    return await _default_resolver.address_to_country_and_subdivision_codes(
+        text, lang=lang, country=country, iso_format=iso_format
+    )
+
+
+async def async_find_countries(text, lang=None, enable_ambiguous_detection=False):
+    """
+    Return find_countries(text), computed in the default executor of the
+    running loop.
+    """
+    return await _default_resolver.find_countries(
+        text, lang=lang, enable_ambiguous_detection=enable_ambiguous_detection
+    )
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Batch functions on PyArrow arrays of addresses, staying columnar end to end.
+
+Addresses are dictionary-encoded (unless they already are), only the entries
+of the dictionary are resolved, and the results are returned as
+dictionary-encoded arrays sharing the indices of the addresses.
+
+    >>> import pyarrow
+    >>> from geoconvert.arrow import arrow_addresses_to_country_codes
+    >>> addresses = pyarrow.array(["Kairo", "Welcome to Cyprus", "Kairo", None])
+    >>> arrow_addresses_to_country_codes(addresses).to_pylist()
+    ['EG', 'CY', 'EG', None]
+"""
+
+try:
+    import pyarrow
+    import pyarrow.compute
+except ImportError:
+    raise ImportError(
+        "PyArrow is needed for the Arrow batch functions: "
+        "pip install geoconvert[arrow]"
+    ) from None
+
+from .convert import (
+    address_to_country_and_subdivision_codes,
+    address_to_country_code,
+    address_to_subdivision_code,
+)
+
+CODES_TYPE = pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+
+
+def arrow_addresses_to_country_and_subdivision_codes(
+    addresses, lang=None, country=None, iso_format=False
+):
+    """
+    Return the country codes and the subdivision codes of addresses, a
+    pyarrow Array or ChunkedArray, as two dictionary-encoded arrays of the
+    same kind (or the ISO codes as a single one with iso_format=True).
+
+    >>> import pyarrow
+    >>> addresses = pyarrow.chunked_array([["14467 Potsdam", "Kairo"], ["Kairo"]])
+    >>> country_codes, subdivision_codes = (
+    ...     arrow_addresses_to_country_and_subdivision_codes(addresses)
+    ... )
+    >>> country_codes.to_pylist(), subdivision_codes.to_pylist()
+    (['DE', 'EG', 'EG'], ['BB', None, None])
+    """
+    results = _resolve(
+        addresses,
+        address_to_country_and_subdivision_codes,
+        lang=lang,
+        country=country,
+        iso_format=iso_format,
+    )
+    if iso_format:
+        return _scatter(addresses, *results)
+    indices, codes = results
+    return (
+        _scatter(addresses, indices, [code and code[0] for code in codes]),
+        _scatter(addresses, indices, [code and code[1] for code in codes]),
+    )
+
+
+def arrow_addresses_to_country_codes(addresses, lang=None):
+    """
+    Return the country codes of addresses, a pyarrow Array or ChunkedArray,
+    as a dictionary-encoded array of the same kind.
+    """
+    return _scatter(addresses, *_resolve(addresses, address_to_country_code, lang=lang))
+
+
+def arrow_addresses_to_subdivision_codes(addresses, country=None):
+    """
+    Return the subdivision codes of addresses, a pyarrow Array or
+    ChunkedArray, as a dictionary-encoded array of the same kind.
+    """
+    return _scatter(
+        addresses, *_resolve(addresses, address_to_subdivision_code, country=country)
+    )
+
+
+def _dictionary_encode(addresses):
+    """
+    Return the indices of the values of each chunk of addresses into
+    a dictionary of their distinct values, and this dictionary.
+    """
+    chunked = isinstance(addresses, pyarrow.ChunkedArray)
+    if not pyarrow.types.is_dictionary(addresses.type):
+        encoded = pyarrow.compute.dictionary_encode(addresses)
+        if not chunked:
+            return [encoded.indices], encoded.dictionary
+        chunks = encoded.unify_dictionaries().chunks
+        if not chunks:
+            return [], pyarrow.array([], pyarrow.string())
+        return [chunk.indices for chunk in chunks], chunks[0].dictionary
+    # Already encoded chunks may have different dictionaries, with repeated
+    # or null entries: their entries are encoded again all together.
+    chunks = addresses.chunks if chunked else [addresses]
+    dictionaries = [chunk.dictionary for chunk in chunks]
+    entries = pyarrow.compute.dictionary_encode(
+        pyarrow.concat_arrays(dictionaries)
+        if dictionaries
+        else pyarrow.array([], addresses.type.value_type)
+    )
+    indices = []
+    offset = 0
+    for chunk, dictionary in zip(chunks, dictionaries):
+        chunk_indices = pyarrow.compute.add(chunk.indices.cast(pyarrow.int64()), offset)
+        indices.append(pyarrow.compute.take(entries.indices, chunk_indices))
+        offset += len(dictionary)
+    return indices, entries.dictionary
+
+
+def _resolve(addresses, function, **options):
+    """
+    Return the indices of the values of each chunk of addresses into
+    their distinct values, and the result of function for each one.
+    """
+    indices, dictionary = _dictionary_encode(addresses)
+    return indices, [
+        function(str(value), **options) for value in dictionary.to_pylist()
+    ]
+
+
+def _scatter(addresses, indices, results):
+    """
+    Return the dictionary-encoded results of the values of addresses,
+    given the indices of each chunk into the results.
+    """
+    codes = pyarrow.array(results, pyarrow.string()).dictionary_encode()
+    # Missing addresses (null indices) and missing results (null indices
+    # of codes) both give null indices.
+    chunks = [
+        pyarrow.DictionaryArray.from_arrays(
+            pyarrow.compute.take(codes.indices, chunk_indices), codes.dictionary
+        )
+        for chunk_indices in indices
+    ]
+    if isinstance(addresses, pyarrow.ChunkedArray):
+        return pyarrow.chunked_array(chunks, CODES_TYPE)
+    return chunks[0]
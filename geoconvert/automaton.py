@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+from collections import deque
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == "_"
+
+
+def is_delimited(text, start, end):
+    """
+    Tell if text[start:end] is delimited the same way as
+    `(\\s|[^\\w\\s]|\\b)<keyword>(\\s|[^\\w\\s]|\\b)` would delimit it.
+
+    >>> is_delimited("welcome to cyprus", 11, 17)
+    True
+    >>> is_delimited("welcome to cyprus", 3, 7)
+    False
+    >>> is_delimited("l'ocean", 2, 7)
+    True
+    """
+    before = text[start - 1] if start > 0 else ""
+    after = text[end] if end < len(text) else ""
+    left_is_word = bool(before) and _is_word_char(before)
+    right_is_word = bool(after) and _is_word_char(after)
+    left_ok = (before and not left_is_word) or (
+        left_is_word != _is_word_char(text[start])
+    )
+    right_ok = (after and not right_is_word) or (
+        right_is_word != _is_word_char(text[end - 1])
+    )
+    return bool(left_ok and right_ok)
+
+
+class Automaton:
+    """
+    Aho-Corasick automaton finding all the given keywords in a text
+    in a single linear scan.
+
+    >>> automaton = Automaton(["france", "guinea", "papua new guinea"])
+    >>> list(automaton.finditer("papua new guinea and france"))
+    [(0, 'papua new guinea'), (10, 'guinea'), (21, 'france')]
+    >>> automaton.longest("papua new guinea and france")
+    'papua new guinea'
+    """
+
+    def __init__(self, keywords):
+        # Keywords and their insertion rank, used to break ties
+        self.keywords = {}
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        for keyword in keywords:
+            if not keyword or keyword in self.keywords:
+                continue
+            self.keywords[keyword] = len(self.keywords)
+            self._add(keyword)
+        self._link()
+
+    def _add(self, keyword):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] = (keyword,)
+
+    def _link(self):
+        # Breadth-first walk, so that failure links always point to
+        # already completed states.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail
+                # Keep the longest keywords first
+                self._output[next_state] += self._output[fail]
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def __contains__(self, keyword):
+        return keyword in self.keywords
+
+    def finditer(self, text):
+        """
+        Yield (start, keyword) for every keyword occurrence in text,
+        ordered by end position.
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword in output[state]:
+                yield index + 1 - len(keyword), keyword
+
+    def finditer_chunks(self, chunks):
+        """
+        Yield (start, keyword) for every keyword occurrence in the text made
+        of the given chunks, ordered by end position, going through one chunk
+        at a time. (end, None) is yielded at the end of each chunk.
+
+        >>> list(Automaton(["trinidad y tobago"]).finditer_chunks(["trinidad y", " tobago"]))
+        [(10, None), (0, 'trinidad y tobago'), (17, None)]
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        offset = 0
+        for chunk in chunks:
+            for index, char in enumerate(chunk, offset):
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+                for keyword in output[state]:
+                    yield index + 1 - len(keyword), keyword
+            offset += len(chunk)
+            yield offset, None
+
+    def finditer_delimited(self, text):
+        """
+        Yield (start, keyword) for every keyword occurrence in text
+        which is not part of a bigger word.
+        """
+        for start, keyword in self.finditer(text):
+            if is_delimited(text, start, start + len(keyword)):
+                yield start, keyword
+
+    def scan(self, text):
+        """
+        Return the set of all keywords found in text, and the set of
+        those found at least once without being part of a bigger word.
+
+        >>> found, delimited = Automaton(["iran", "ran"]).scan("iran")
+        >>> sorted(found), sorted(delimited)
+        (['iran', 'ran'], ['iran'])
+        """
+        found = set()
+        delimited = set()
+        for start, keyword in self.finditer(text):
+            found.add(keyword)
+            if keyword not in delimited and is_delimited(
+                text, start, start + len(keyword)
+            ):
+                delimited.add(keyword)
+        return found, delimited
+
+    def longest(self, text, keywords=None):
+        """
+        Return the longest delimited keyword found in text, the first
+        inserted one being returned on ties.
+
+        If keywords is given, only those keywords are considered.
+        """
+        return self.pick_longest(
+            (keyword for _, keyword in self.finditer_delimited(text)), keywords
+        )
+
+    def pick_longest(self, found, keywords=None):
+        """
+        Return the longest keyword of found (for instance found by a bigger
+        automaton), the first inserted one being returned on ties.
+
+        If keywords is given, only those keywords are considered.
+        """
+        longest = None
+        for keyword in found:
+            if keyword not in (self.keywords if keywords is None else keywords):
+                continue
+            if (
+                longest is None
+                or len(keyword) > len(longest)
+                or (
+                    len(keyword) == len(longest)
+                    and self.keywords[keyword] < self.keywords[longest]
+                )
+            ):
+                longest = keyword
+        return longest
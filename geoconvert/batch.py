@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+
+from .convert import address_to_country_and_subdivision_codes
+
+# Results may be None, so use another value to tell a result is not known yet
+_missing = object()
+
+
+def iter_batch(function, texts, cache_size=65536, **options):
+    """
+    Lazily yield function(text, **options) for each text, in the same order,
+    computing the result of each distinct text only once.
+
+    Up to cache_size distinct results are remembered (the least recently
+    used ones are forgotten first), which bounds the memory used when
+    streaming through a lot of texts. Use cache_size=None to remember them all.
+
+    >>> from geoconvert import address_to_country_code
+    >>> list(iter_batch(address_to_country_code, ["Kairo", "Paris", "Kairo"]))
+    ['EG', 'FR', 'EG']
+    """
+    results = OrderedDict()
+    for text in texts:
+        result = results.get(text, _missing)
+        if result is _missing:
+            result = function(text, **options)
+            results[text] = result
+            if cache_size is not None and len(results) > cache_size:
+                results.popitem(last=False)
+        elif cache_size is not None:
+            results.move_to_end(text)
+        yield result
+
+
+def batch(function, texts, **options):
+    """
+    Return the list of function(text, **options) for each text, in the same
+    order, computing the result of each distinct text only once.
+
+    >>> from geoconvert import address_to_country_code
+    >>> batch(address_to_country_code, ["Kairo", "Roma", "Kairo"], lang="de")
+    ['EG', None, 'EG']
+    """
+    return list(iter_batch(function, texts, cache_size=None, **options))
+
+
+def addresses_to_country_and_subdivision_codes(
+    texts, lang=None, country=None, iso_format=False
+):
+    """
+    Return address_to_country_and_subdivision_codes for each text, in the
+    same order, computing the result of each distinct text only once.
+
+    >>> addresses_to_country_and_subdivision_codes(
+    ...     ["14467 Potsdam", "Kairo", "14467 Potsdam"], iso_format=True
+    ... )
+    ['DE-BB', 'EG', 'DE-BB']
+    """
+    return batch(
+        address_to_country_and_subdivision_codes,
+        texts,
+        lang=lang,
+        country=country,
+        iso_format=iso_format,
+    )
+
+
+def iter_addresses_to_country_and_subdivision_codes(
+    texts, lang=None, country=None, iso_format=False, cache_size=65536
+):
+    """
+    Lazily yield address_to_country_and_subdivision_codes for each text, in the
+    same order, computing the result of each distinct text only once
+    (among the cache_size last distinct texts).
+
+    >>> results = iter_addresses_to_country_and_subdivision_codes(
+    ...     ["Montréal, QC", "Toronto, ON"], country="CA"
+    ... )
+    >>> next(results)
+    ('CA', 'QC')
+    """
+    return iter_batch(
+        address_to_country_and_subdivision_codes,
+        texts,
+        cache_size=cache_size,
+        lang=lang,
+        country=country,
+        iso_format=iso_format,
+    )
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple(
+    "CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"]
+)
+
+# Results may be None, so use another value to tell a result is not cached
+_missing = object()
+
+
+class LRUCache:
+    """
+    Thread-safe bounded cache, evicting the least recently used entries.
+
+    >>> cache = LRUCache(maxsize=2)
+    >>> cache.set("a", 1)
+    >>> cache.set("b", None)
+    >>> cache.get("b")
+    >>> cache.set("c", 3)
+    >>> cache.get("a", "missing")
+    'missing'
+    >>> cache.info()
+    CacheInfo(hits=1, misses=1, evictions=1, maxsize=2, currsize=2)
+    """
+
+    def __init__(self, maxsize=4096):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _missing)
+            if value is _missing:
+                self._misses += 1
+                return default
+            self._hits += 1
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        """
+        Remove all entries and reset statistics.
+        """
+        with self._lock:
+            self._data.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(
+                self._hits, self._misses, self._evictions, self.maxsize, len(self._data)
+            )
+
+
+class ShardedLRUCache:
+    """
+    Thread-safe bounded cache split into shards, each one with its own lock
+    and its own least recently used entries, so that threads looking up
+    different keys seldom wait for each other.
+
+    >>> cache = ShardedLRUCache(maxsize=10, shards=4)
+    >>> cache.set("a", 1)
+    >>> cache.get("a"), cache.get("b", "missing")
+    (1, 'missing')
+    >>> cache.info()
+    CacheInfo(hits=1, misses=1, evictions=0, maxsize=10, currsize=1)
+    """
+
+    def __init__(self, maxsize=4096, shards=16):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        shards = max(1, min(shards, maxsize))
+        # Shard sizes add up to maxsize
+        self._shards = tuple(
+            LRUCache(maxsize // shards + (index < maxsize % shards))
+            for index in range(shards)
+        )
+
+    def _shard(self, key):
+        return self._shards[hash(key) % len(self._shards)]
+
+    def get(self, key, default=None):
+        return self._shard(key).get(key, default)
+
+    def set(self, key, value):
+        self._shard(key).set(key, value)
+
+    def clear(self):
+        """
+        Remove all entries and reset statistics.
+        """
+        for shard in self._shards:
+            shard.clear()
+
+    def info(self):
+        infos = [shard.info() for shard in self._shards]
+        return CacheInfo(
+            sum(info.hits for info in infos),
+            sum(info.misses for info in infos),
+            sum(info.evictions for info in infos),
+            self.maxsize,
+            sum(info.currsize for info in infos),
+        )
+
+
+def default_shards():
+    """
+    Return the number of shards of the result cache: a single one (an exact
+    LRU order) when the GIL lets one thread at a time use the cache anyway,
+    a few per CPU on free-threaded Python.
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    if is_gil_enabled is None or is_gil_enabled():
+        return 1
+    return 4 * (os.cpu_count() or 1)
+
+
+# The cache shared by all cached functions, None while caching is disabled
+_cache = None
+
+
+def enable_cache(maxsize=4096, shards=None):
+    """
+    Cache the results of the main address functions, up to maxsize
+    results (including "not found" results).
+
+    The cache is split into shards (default_shards() if None) locked
+    independently, each one evicting its own least recently used results.
+
+    Calling it again replaces the cache with an empty one.
+    """
+    global _cache
+    _cache = ShardedLRUCache(maxsize, default_shards() if shards is None else shards)
+
+
+def disable_cache():
+    """
+    Stop caching results and forget the cached ones.
+    """
+    global _cache
+    _cache = None
+
+
+def cache_info():
+    """
+    Return hits, misses, evictions, maxsize and current size of the cache,
+    or None when caching is disabled.
+    """
+    cache = _cache
+    if cache is not None:
+        return cache.info()
+
+
+def cache_clear():
+    """
+    Forget all cached results and reset statistics.
+    """
+    cache = _cache
+    if cache is not None:
+        cache.clear()
+
+
+def cached_call(key, compute):
+    """
+    Return compute(), taken from the cache while caching is enabled.
+
+    key identifies the call (function and arguments) among all cached calls.
+    """
+    cache = _cache
+    if cache is None:
+        return compute()
+
+    result = cache.get(key, _missing)
+    if result is _missing:
+        result = compute()
+        cache.set(key, result)
+    return result
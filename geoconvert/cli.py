@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""
+Annotate CSV or JSON Lines records with the codes found in one of their fields.
+
+    python -m geoconvert --column address addresses.csv > annotated.csv
+    python -m geoconvert --column text --find-countries --format jsonl < in.jsonl
+
+Records are read, resolved and written batch by batch, so that files of any
+size can be annotated with bounded memory, and each distinct text is only
+resolved once (among the --cache-size last distinct texts).
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from contextlib import ExitStack
+from itertools import islice
+from pathlib import Path
+
+from .cache import LRUCache
+from .convert import address_to_country_and_subdivision_codes, find_countries
+from .parallel import WorkerPool
+
+JSONL_SUFFIXES = {".jsonl", ".ndjson", ".json"}
+# Results may be None, so use another value to tell a result is not known yet
+_missing = object()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m geoconvert", description=__doc__.splitlines()[1]
+    )
+    parser.add_argument(
+        "files", nargs="*", type=Path, help="files to read (standard input if none)"
+    )
+    parser.add_argument("-c", "--column", required=True, help="field to look into")
+    parser.add_argument(
+        "-f", "--format", choices=["csv", "jsonl"], help="guessed from the file name"
+    )
+    parser.add_argument("-o", "--output", type=Path, help="standard output if none")
+    parser.add_argument("--delimiter", default=",", help="CSV delimiter")
+    parser.add_argument(
+        "--find-countries",
+        action="store_true",
+        help="find all countries (find_countries) instead of the country "
+        "and subdivision codes",
+    )
+    parser.add_argument("--lang")
+    parser.add_argument("--country")
+    parser.add_argument("--iso-format", action="store_true")
+    parser.add_argument("--enable-ambiguous-detection", action="store_true")
+    parser.add_argument(
+        "-j", "--processes", type=int, default=1, help="worker processes to use"
+    )
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--cache-size", type=int, default=65536)
+    parser.add_argument(
+        "--progress", action="store_true", help="report progress every second"
+    )
+    parser.add_argument("-q", "--quiet", action="store_true", help="no final report")
+    args = parser.parse_args(argv)
+    if args.format is None:
+        suffix = args.files[0].suffix.lower() if args.files else ""
+        args.format = "jsonl" if suffix in JSONL_SUFFIXES else "csv"
+    if args.find_countries and (args.country or args.iso_format):
+        parser.error("--country and --iso-format only apply to address codes")
+    if args.processes < 1:
+        parser.error("--processes must be at least 1")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    return args
+
+
+class Converter:
+    """
+    Resolve texts batch by batch, each distinct text only once
+    (among the cache_size last distinct ones), in worker processes
+    if processes > 1.
+    """
+
+    def __init__(self, function, options, processes=1, cache_size=65536):
+        self.function = function
+        self.options = options
+        self.pool = WorkerPool(processes) if processes > 1 else None
+        self.cache = LRUCache(max(cache_size, 1))
+        self.rows = 0
+        self.resolved = 0
+
+    def convert(self, texts):
+        results = [self.cache.get(text, _missing) for text in texts]
+        unknown = list(
+            dict.fromkeys(
+                text for text, result in zip(texts, results) if result is _missing
+            )
+        )
+        if self.pool is not None:
+            resolved = self.pool.batch(self.function, unknown, **self.options)
+        else:
+            resolved = [self.function(text, **self.options) for text in unknown]
+        resolved = dict(zip(unknown, resolved))
+        for text, result in resolved.items():
+            self.cache.set(text, result)
+        self.rows += len(texts)
+        self.resolved += len(resolved)
+        return [
+            resolved[text] if result is _missing else result
+            for text, result in zip(texts, results)
+        ]
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+
+
+class Report:
+    """
+    Report the throughput on stderr, every interval seconds while running
+    if progress is set, and at the end unless quiet is set.
+    """
+
+    def __init__(self, converter, progress=False, quiet=False, interval=1.0):
+        self.converter = converter
+        self.progress = progress
+        self.quiet = quiet
+        self.interval = interval
+        self.start = self.last = time.perf_counter()
+
+    def line(self):
+        elapsed = time.perf_counter() - self.start
+        rows = self.converter.rows
+        return (
+            f"{rows} rows ({self.converter.resolved} resolved, "
+            f"{rows - self.converter.resolved} from cache) in {elapsed:.1f} s, "
+            f"{rows / elapsed if elapsed else 0:.0f} rows/s"
+        )
+
+    def update(self):
+        now = time.perf_counter()
+        if self.progress and now - self.last >= self.interval:
+            self.last = now
+            print(self.line(), file=sys.stderr, flush=True)
+
+    def finish(self):
+        if not self.quiet:
+            print(self.line(), file=sys.stderr, flush=True)
+
+
+def result_fields(args):
+    if args.find_countries:
+        return ["countries"]
+    if args.iso_format:
+        return ["iso_code"]
+    return ["country_code", "subdivision_code"]
+
+
+def to_fields(result, args):
+    """
+    Return the values of the result fields for a result.
+    """
+    if args.find_countries or args.iso_format:
+        return [result]
+    return list(result) if result else [None, None]
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def read_csv(file, args):
+    reader = csv.DictReader(file, delimiter=args.delimiter)
+    if reader.fieldnames is not None and args.column not in reader.fieldnames:
+        raise SystemExit(f"error: no {args.column!r} column in {file.name}")
+    return reader
+
+
+def read_jsonl(file, args):
+    for number, line in enumerate(file, 1):
+        if line.strip():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as error:
+                raise SystemExit(
+                    f"error: invalid JSON on line {number} of {file.name}: {error}"
+                ) from None
+            if not isinstance(record, dict):
+                raise SystemExit(
+                    f"error: line {number} of {file.name} is not a JSON object"
+                )
+            yield record
+
+
+def annotate(records, converter, report, args):
+    """
+    Lazily yield the records with the result fields, batch by batch.
+    """
+    fields = result_fields(args)
+    for batch in batches(records, args.batch_size):
+        texts = []
+        for record in batch:
+            value = record.get(args.column)
+            texts.append("" if value is None else str(value))
+        for record, result in zip(batch, converter.convert(texts)):
+            record.update(zip(fields, to_fields(result, args)))
+            yield record
+        report.update()
+
+
+def csv_fieldnames(paths, args):
+    """
+    Return the columns of all the CSV files, in order of appearance,
+    then the result fields.
+    """
+    fieldnames = {}
+    for path in paths:
+        with path.open(encoding="utf-8", newline="") as file:
+            fieldnames.update(
+                dict.fromkeys(next(csv.reader(file, delimiter=args.delimiter), []))
+            )
+    fieldnames.update(dict.fromkeys(result_fields(args)))
+    return list(fieldnames)
+
+
+def write_csv(records, output, args):
+    writer = None
+    for record in records:
+        if writer is None:
+            # Files may not all have the same columns
+            if len(args.files) > 1:
+                fieldnames = csv_fieldnames(args.files, args)
+            else:
+                fieldnames = list(record)
+            writer = csv.DictWriter(
+                output,
+                fieldnames,
+                delimiter=args.delimiter,
+                restval="",
+                extrasaction="ignore",
+                lineterminator="\n",
+            )
+            writer.writeheader()
+        if args.find_countries:
+            record["countries"] = ",".join(record["countries"])
+        writer.writerow(record)
+
+
+def write_jsonl(records, output, args):
+    for record in records:
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.find_countries:
+        function = find_countries
+        options = {
+            "lang": args.lang,
+            "enable_ambiguous_detection": args.enable_ambiguous_detection,
+        }
+    else:
+        function = address_to_country_and_subdivision_codes
+        options = {
+            "lang": args.lang,
+            "country": args.country,
+            "iso_format": args.iso_format,
+        }
+    read, write = {
+        "csv": (read_csv, write_csv),
+        "jsonl": (read_jsonl, write_jsonl),
+    }[args.format]
+
+    def records():
+        if not args.files:
+            # Read like the files: newlines may be part of quoted CSV fields
+            stdin = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+            try:
+                yield from read(stdin, args)
+            finally:
+                stdin.detach()
+        for path in args.files:
+            with path.open(encoding="utf-8", newline="") as file:
+                yield from read(file, args)
+
+    converter = Converter(function, options, args.processes, args.cache_size)
+    report = Report(converter, progress=args.progress, quiet=args.quiet)
+    with ExitStack() as stack:
+        stack.callback(converter.close)
+        if args.output is None:
+            output = sys.stdout
+        else:
+            output = stack.enter_context(
+                args.output.open("w", encoding="utf-8", newline="")
+            )
+        write(annotate(records(), converter, report, args), output, args)
+    report.finish()
+    return 0
@@ -1,60 +1,98 @@
 # -*- coding: utf-8 -*-
 import re
+from collections import Counter
+from functools import partial
+from itertools import chain, islice
+from types import MappingProxyType
+
+from . import data
+from .automaton import Automaton
+from .cache import cached_call
+from .gazetteer import Gazetteers
+from .lazy import build_once, lazy_attributes
+from .mentions import CountryMention, MentionFinder
+from .ranges import DenseTable
+from .utils import (
+    LookupText,
+    address_window,
+    safe_string,
+    safe_string_with_offsets,
+)
 
-from .data import (
-    ALL_COUNTRY_CODES,
-    ALL_NUTS_CODES,
-    BR_POSTCODES_RANGE,
-    CA_POSTCODE_FIRST_LETTER_TO_PROVINCE_CODE,
-    DE_HAUPTSTADT,
-    DE_POSTCODE_RANGE,
-    NUTS_CODES_BY_COUNTRY,
-    all_nuts_regex,
-    ambiguous_country_names,
-    br_postcode_regex,
-    br_state_code_regex,
-    br_state_name_regex,
-    br_states,
-    ca_postcode_regex,
-    ca_province_code_regex,
-    ca_province_name_regex,
-    ca_provinces,
-    corse_du_sud_special_zipcodes,
-    de_land_code_regex,
-    de_land_hauptstadt_regex,
-    de_land_name_regex,
-    de_landers,
-    de_postcode_regex,
-    fr_department_name_regex,
-    fr_departments,
-    fr_postcode_regex,
-    fr_principal_places,
-    fr_region_name_regex,
-    fr_regions,
-    language_to_capital_names,
-    language_to_country_names,
-    nuts_regexes_by_country,
-    us_postcode_regex,
-    us_state_code_regex,
-    us_state_name_regex,
-    us_states,
+# Keep backward compatibility: data used to be imported here
+__getattr__ = lazy_attributes(
+    globals(), {name: partial(getattr, data, name) for name in data.__all__}
 )
-from .utils import safe_string
+
+
+class _Stages:
+    """
+    The stages of the main address functions, which explain times and
+    records (see geoconvert.trace). Here, they only return their result.
+    """
+
+    def scan(self, text):
+        """
+        Return the safe text and what the address automaton finds in it.
+        """
+        safe_text = safe_string(text)
+        return safe_text, get_address_automaton().scan(safe_text)
+
+    def find_name(self, kind, lang, gazetteer, safe_text, delimited):
+        """
+        Return the (name, country code) of the first country or capital name
+        (kind) of lang found in safe_text, or (None, None).
+        """
+        return gazetteer.find(safe_text, delimited)
+
+    def find_nuts_code(self, text, country=None):
+        """
+        Return the NUTS code found in text (of country when given), or None.
+        """
+        if country is None:
+            return data.all_nuts_index.find(text)
+        return data.nuts_indexes_by_country[country].find(text)
+
+    def lookup_subdivision(self, function, text):
+        """
+        Return the subdivision code found in text by the lookup function of
+        a country, which goes through its steps with these stages.
+        """
+        return function(text, self)
+
+    def lookup_subdivision_step(self, country_code, function, text):
+        """
+        Return what a step (function) of the subdivision lookup of
+        country_code finds in text.
+        """
+        return function(text)
+
+    def lookup_safe_subdivision(self, country_code, function, text, safe_text):
+        return function(text)
+
+
+_stages = _Stages()
+
 
 # BRAZIL
 
 
-def br_address_to_state_code(text):
+def br_address_to_state_code(text, stages=_stages):
+    text = LookupText.wrap(text)
     # First, look for the postcode and derive the state code from it
-    code = br_postcode_to_state_code(text)
+    code = stages.lookup_subdivision_step("BR", br_postcode_to_state_code, text)
     if code is not None:
         return code
     # Look for the state name in plain text
-    state_code = br_state_name_to_state_code(text)
+    state_code = stages.lookup_subdivision_step("BR", br_state_name_to_state_code, text)
     if state_code:
         return state_code
     # Look for the state code in the plain text
-    code_match = re.search(br_state_code_regex, text)
+    return stages.lookup_subdivision_step("BR", br_state_code_to_state_code, text)
+
+
+def br_state_code_to_state_code(text):
+    code_match = data.br_state_code_backend_regex.search(text)
     if code_match:
         return code_match.group("code").upper()
 
@@ -63,44 +101,56 @@ def br_state_name_to_state_code(text):
     text = safe_string(text)
 
     # Quickly reach conclusion if possible
-    if text in br_states:
-        return br_states[text]
+    if text in data.br_states:
+        return data.br_states[text]
 
     # Otherwise use a regex
-    state_name_match = re.search(br_state_name_regex, text)
+    state_name_match = data.br_state_name_backend_regex.search(text)
     if state_name_match:
         state_name = state_name_match.group("state")
-        return br_states[state_name]
+        return data.br_states[state_name]
 
 
 def br_postcode_to_state_code(text):
     # An american postcode is made of 5 digit preceded by the state code
-    br_postcode_match = re.search(br_postcode_regex, text)
+    br_postcode_match = data.br_postcode_regex.search(text)
     if not br_postcode_match:
         return
 
     postcode = int(br_postcode_match.group("postcode"))
-    state_code = None
-    for max_range, state_code in BR_POSTCODES_RANGE.items():
-        if max_range >= postcode:
-            break
-    return state_code
+    return data.BR_POSTCODES_TABLE.get(postcode)
+
+
+def br_postcodes_to_state_codes(postcodes):
+    """
+    Return the NumPy array of the state codes of a NumPy array of integer
+    postcodes (like 1120010 for "01120-010"), all computed in one call.
+
+    NumPy must be installed.
+    """
+    # The state is given by the first 3 of the 8 digits
+    return data.BR_POSTCODES_TABLE.get_many(postcodes // 100000)
 
 
 # CANADA
 
 
-def ca_address_to_province_code(text):
+def ca_address_to_province_code(text, stages=_stages):
+    text = LookupText.wrap(text)
     # First, look for the postcode and derive the province code from it
-    code = ca_postcode_to_province_code(text)
+    code = stages.lookup_subdivision_step("CA", ca_postcode_to_province_code, text)
     if code is not None:
         return code
     # Look for the province name in the plain text
-    code = ca_province_name_to_province_code(text)
+    code = stages.lookup_subdivision_step("CA", ca_province_name_to_province_code, text)
     if code is not None:
         return code
     # Look for the province code in the plain text
-    code_match = re.search(ca_province_code_regex, text)
+    return stages.lookup_subdivision_step("CA", ca_province_code_to_province_code, text)
+
+
+def ca_province_code_to_province_code(text):
+    code_match = data.ca_province_code_backend_regex.search(text)
     if code_match:
         return code_match.group("code").upper()
 
@@ -108,118 +158,134 @@ def ca_address_to_province_code(text):
 def ca_postcode_to_province_code(text):
     text = safe_string(text)
     # A Canadian postcode looks like "H0H 0H0".
-    ca_postcode_match = re.search(ca_postcode_regex, text)
+    ca_postcode_match = data.ca_postcode_regex.search(text)
     if ca_postcode_match:
         ca_postcode = ca_postcode_match.group("postcode")
         if ca_postcode.startswith("x"):
             # Postcodes starting with an "x" may mean Nunavut or
             # Northest Territories.
             if ca_postcode[1:3] in ["0a", "0b", "0c"]:
-                return ca_provinces["nunavut"]
+                return data.ca_provinces["nunavut"]
             else:
-                return ca_provinces["northwest territories"]
+                return data.ca_provinces["northwest territories"]
         else:
             # In every other case, the first letter of the postcode
             # allows to find the related province or territory.
-            return CA_POSTCODE_FIRST_LETTER_TO_PROVINCE_CODE.get(ca_postcode[0])
+            return data.CA_POSTCODE_FIRST_LETTER_TO_PROVINCE_CODE.get(ca_postcode[0])
 
 
 def ca_province_name_to_province_code(text):
     text = safe_string(text)
 
     # Quickly reach conclusion if possible
-    if text in ca_provinces:
-        return ca_provinces[text]
+    if text in data.ca_provinces:
+        return data.ca_provinces[text]
 
     # Otherwise use a regex
-    province_name_match = re.search(ca_province_name_regex, text)
+    province_name_match = data.ca_province_name_backend_regex.search(text)
     if province_name_match:
         province_name = province_name_match.group("province")
-        return ca_provinces[province_name]
+        return data.ca_provinces[province_name]
 
 
 # GERMANY
 
 
-def de_address_to_land_code(text):
+def de_address_to_land_code(text, stages=_stages):
+    text = LookupText.wrap(text)
     # First, look for NUTS code in the plain text
-    nuts_match = re.search(nuts_regexes_by_country["DE"], text)
-    if nuts_match:
-        return NUTS_CODES_BY_COUNTRY["DE"].get(nuts_match.group().upper())
+    nuts_code = stages.find_nuts_code(text, "DE")
+    if nuts_code is not None:
+        return data.NUTS_CODES_BY_COUNTRY["DE"].get(nuts_code)
     # Look for the land name in the plain text
-    code = de_land_name_to_land_code(text)
+    code = stages.lookup_subdivision_step("DE", de_land_name_to_land_code, text)
     if code:
         return code
     # Look for the land hauptstadt in the plain text
-    code = de_hauptstadt_to_land_code(text)
+    code = stages.lookup_subdivision_step("DE", de_hauptstadt_to_land_code, text)
     if code:
         return code
     # Look for the postcode and derive the state code from it
-    code = de_postcode_to_land_code(text)
+    code = stages.lookup_subdivision_step("DE", de_postcode_to_land_code, text)
     if code is not None:
         return code
     # Look for the land code in the plain text
-    code_match = re.search(de_land_code_regex, text)
+    return stages.lookup_subdivision_step("DE", de_land_code_to_land_code, text)
+
+
+def de_land_code_to_land_code(text):
+    code_match = data.de_land_code_backend_regex.search(text)
     if code_match:
         return code_match.group("code").upper()
 
 
 def de_postcode_to_land_code(text):
     # A German postcode is made of 5 digit
-    de_postcode_match = re.search(de_postcode_regex, text)
+    de_postcode_match = data.de_postcode_regex.search(text)
     if not de_postcode_match:
         return
 
     postcode = int(de_postcode_match.group("postcode"))
-    state_code = None
-    for max_range, state_code in DE_POSTCODE_RANGE.items():
-        if max_range >= postcode:
-            break
-    return state_code
+    return data.DE_POSTCODE_TABLE.get(postcode)
+
+
+def de_postcodes_to_land_codes(postcodes):
+    """
+    Return the NumPy array of the land codes of a NumPy array of integer
+    postcodes, all computed in one call.
+
+    NumPy must be installed.
+    """
+    return data.DE_POSTCODE_TABLE.get_many(postcodes)
 
 
 def de_hauptstadt_to_land_code(text):
     text = safe_string(text)
 
     # Quickly reach conclusion if possible
-    if text in DE_HAUPTSTADT.keys():
-        return DE_HAUPTSTADT[text]
+    if text in data.DE_HAUPTSTADT.keys():
+        return data.DE_HAUPTSTADT[text]
 
     # Otherwise use a regex
-    hauptstadt_match = re.search(de_land_hauptstadt_regex, text)
+    hauptstadt_match = data.de_land_hauptstadt_backend_regex.search(text)
     if hauptstadt_match:
         land_name = hauptstadt_match.group("hauptstadt")
-        return DE_HAUPTSTADT[land_name]
+        return data.DE_HAUPTSTADT[land_name]
 
 
 def de_land_name_to_land_code(text):
     text = safe_string(text)
 
     # Quickly reach conclusion if possible
-    if text in de_landers:
-        return de_landers[text]
+    if text in data.de_landers:
+        return data.de_landers[text]
 
     # Otherwise use a regex
-    land_name_match = re.search(de_land_name_regex, text)
+    land_name_match = data.de_land_name_backend_regex.search(text)
     if land_name_match:
         land_name = land_name_match.group("land")
-        return de_landers[land_name]
+        return data.de_landers[land_name]
 
 
 # USA
 
 
-def us_address_to_state_code(text):
+def us_address_to_state_code(text, stages=_stages):
+    text = LookupText.wrap(text)
     # First, look for the postcode and derive the state code from it
-    code = us_postcode_to_state_code(text)
+    code = stages.lookup_subdivision_step("US", us_postcode_to_state_code, text)
     if code is not None:
         return code
     # Look for the state name in plain text
-    state_code = us_state_name_to_state_code(text)
+    state_code = stages.lookup_subdivision_step("US", us_state_name_to_state_code, text)
     if state_code:
         return state_code
     # Look for the state code in the plain text
-    code_match = re.search(us_state_code_regex, text)
+    return stages.lookup_subdivision_step("US", us_state_code_to_state_code, text)
+
+
+def us_state_code_to_state_code(text):
+    code_match = data.us_state_code_backend_regex.search(text)
     if code_match:
         return code_match.group("code").upper()
 
@@ -228,20 +294,20 @@ def us_state_name_to_state_code(text):
     text = safe_string(text)
 
     # Quickly reach conclusion if possible
-    if text in us_states:
-        return us_states[text]
+    if text in data.us_states:
+        return data.us_states[text]
 
     # Otherwise use a regex
-    state_name_match = re.search(us_state_name_regex, text)
+    state_name_match = data.us_state_name_backend_regex.search(text)
     if state_name_match:
         state_name = state_name_match.group("state")
-        return us_states[state_name]
+        return data.us_states[state_name]
 
 
 def us_postcode_to_state_code(text):
     text = safe_string(text)
     # An american postcode is made of 5 digit preceded by the state code
-    us_postcode_match = re.search(us_postcode_regex, text)
+    us_postcode_match = data.us_postcode_regex.search(text)
     if us_postcode_match:
         return us_postcode_match.group("state_code").upper()
 
@@ -249,50 +315,88 @@ def us_postcode_to_state_code(text):
 # FRANCE
 
 
-def fr_address_to_dept_code(text):
+def fr_address_to_dept_code(text, stages=_stages):
+    text = LookupText.wrap(text)
     # First, look for NUTS code in the plain text
-    if nuts_match := re.search(nuts_regexes_by_country["FR"], text):
-        return NUTS_CODES_BY_COUNTRY["FR"].get(nuts_match.group().upper())
+    if (nuts_code := stages.find_nuts_code(text, "FR")) is not None:
+        return data.NUTS_CODES_BY_COUNTRY["FR"].get(nuts_code)
     # Look for the postcode and derive the dept code from it
-    if (code := fr_postcode_to_dept_code(text)) is not None:
+    code = stages.lookup_subdivision_step("FR", fr_postcode_to_dept_code, text)
+    if code is not None:
         return code
     # Look for the region name in plain text
-    if region_info := fr_region_name_to_info(text):
-        return region_info[0]
+    code = stages.lookup_subdivision_step("FR", fr_region_name_to_dept_code, text)
+    if code:
+        return code
     # Look for the dept name in plain text
-    return fr_dept_name_to_dept_code(text)
+    return stages.lookup_subdivision_step("FR", fr_dept_name_to_dept_code, text)
 
 
 def fr_postcode_to_dept_code(text):
-    postcode_match = re.search(fr_postcode_regex, text)
+    postcode_match = data.fr_postcode_regex.search(text)
     if postcode_match:
-        postcode = postcode_match.group("postcode").replace(" ", "").zfill(5)
+        postcode = int(re.sub(r"\s", "", postcode_match.group("postcode")))
+        return get_fr_postcode_table().get(postcode)
+
+
+def fr_postcodes_to_dept_codes(postcodes):
+    """
+    Return the NumPy array of the department codes of a NumPy array of
+    integer postcodes, all computed in one call (with the same special cases
+    as fr_postcode_to_dept_code).
+
+    NumPy must be installed.
+    """
+    return get_fr_postcode_table().get_many(postcodes)
+
+
+def _fr_five_digit_postcode_to_dept_code(postcode, dept_codes):
+    """
+    Return the department code of a five-digit postcode, given the set of
+    all department codes.
+    """
+    # Let us treat special cases first
+
+    # St Barthelemy (97701 or 97098)
+    if postcode in ("97701", "97098"):
+        return "977"
 
-        # Let us treat special cases first
+    # 978 or 977 may be used for Réunion: let's turn that into 974
+    if postcode[:3] in ("977", "978"):
+        return "974"
 
-        # St Barthelemy (97701 or 97098)
-        if postcode in ("97701", "97098"):
-            return "977"
+    # Corse
+    if postcode[:2] == "20":
+        postcode_int = int(postcode)
+        if postcode_int < 20200 or postcode_int in data.corse_du_sud_special_zipcodes:
+            return "20A"
+        return "20B"
 
-        # 978 or 977 may be used for Réunion: let's turn that into 974
-        if postcode[:3] in ("977", "978"):
-            return "974"
+    # Saint-Martin
+    if postcode[:3] == "970":
+        return "971"
 
-        # Corse
-        if postcode[:2] == "20":
-            postcode_int = int(postcode)
-            if postcode_int < 20200 or postcode_int in corse_du_sud_special_zipcodes:
-                return "20A"
-            return "20B"
+    # Other cases
+    for code in (postcode[:2], postcode[:3]):
+        if code in dept_codes:
+            return code
 
-        # Saint-Martin
-        if postcode[:3] == "970":
-            return "971"
 
-        # Other cases
-        for code in (postcode[:2], postcode[:3]):
-            if code in fr_departments.values():
-                return code
+@build_once
+def get_fr_postcode_table():
+    """
+    Return the department code of every five-digit postcode, built on first use.
+    """
+    dept_codes = set(data.fr_departments.values())
+    table = DenseTable(100000)
+    # Apart from special cases, the first 3 digits give the department
+    for prefix in range(1000):
+        code = _fr_five_digit_postcode_to_dept_code(f"{prefix:03}00", dept_codes)
+        table.set(prefix * 100, (prefix + 1) * 100, code)
+    for postcode in chain(range(20000, 21000), (97701, 97098)):
+        code = _fr_five_digit_postcode_to_dept_code(f"{postcode:05}", dept_codes)
+        table.set(postcode, postcode + 1, code)
+    return table
 
 
 # Keep backward compatibility
@@ -317,49 +421,62 @@ fr_street_names_re = "|".join(
 fr_street_name_cleaning_re = re.compile(
     rf"\b({fr_street_names_re})\b[^\d\(,\n-]{{,20}}", flags=re.I
 )
-# Avoid "Ville-sur-Loire" situations
-fr_town_name_cleaning_re = re.compile(r"\w+.\b(sous|sur|val\Wde)\b.(\w+)", flags=re.I)
+# Avoid "Ville-sur-Loire" situations. Matches start at a word boundary
+# anyway: saying so keeps the regex from retrying \w+ from every position
+# of long words (quadratic time).
+fr_town_name_cleaning_re = re.compile(r"\b\w+.\b(sous|sur|val\Wde)\b.(\w+)", flags=re.I)
 
 
 def fr_dept_name_to_dept_code(text):
     """
     Return the departement number from the departement name
     """
-    # Avoid "rue de Paris" situations
-    text = fr_street_name_cleaning_re.sub("", text)
-    # Avoid "Ville-sur-Loire" situations
-    text = fr_town_name_cleaning_re.sub("", text)
-
-    # There is no space in french dept names, but hyphens instead.
-    text = safe_string(text).replace(" ", "-")
+    text = _fr_dept_name_text(text)
 
     # Quickly reach conclusion if possible
-    if text in fr_departments:
-        return fr_departments[text]
+    if text in data.fr_departments:
+        return data.fr_departments[text]
 
     # Otherwise use a regex
-    dept_name_match = re.search(fr_department_name_regex, text)
+    dept_name_match = data.fr_department_name_backend_regex.search(text)
     if dept_name_match:
         dept_name = dept_name_match.group("dept")
-        return fr_departments[dept_name]
+        return data.fr_departments[dept_name]
 
 
 # Keep backward compatibility
 dept_name_to_zipcode = fr_dept_name_to_dept_code
 
 
+def _fr_dept_name_text(text):
+    """
+    Return the text department names are looked for in: safe, without street
+    and town names, with hyphens instead of spaces.
+    """
+    # Avoid "rue de Paris" situations
+    cleaned_text = fr_street_name_cleaning_re.sub("", text)
+    # Avoid "Ville-sur-Loire" situations
+    cleaned_text = fr_town_name_cleaning_re.sub("", cleaned_text)
+    # Keep the text (and its already known safe version) when nothing changed
+    if cleaned_text != text:
+        text = cleaned_text
+
+    # There is no space in french dept names, but hyphens instead.
+    return safe_string(text).replace(" ", "-")
+
+
 def fr_region_name_to_id(text):
     text = safe_string(text)
 
     # Quickly reach conclusion if possible
-    if text in fr_regions:
-        return fr_regions[text]
+    if text in data.fr_regions:
+        return data.fr_regions[text]
 
     # Otherwise use a regex
-    region_name_match = re.search(fr_region_name_regex, text)
+    region_name_match = data.fr_region_name_backend_regex.search(text)
     if region_name_match:
         region_name = region_name_match.group("region")
-        return fr_regions[region_name]
+        return data.fr_regions[region_name]
 
 
 # Keep backward compatibility
@@ -368,8 +485,8 @@ region_name_to_id = fr_region_name_to_id
 
 def fr_region_id_to_info(region_id):
     region_id = str(region_id).zfill(2)
-    if region_id in fr_principal_places:
-        return fr_principal_places[region_id]
+    if region_id in data.fr_principal_places:
+        return data.fr_principal_places[region_id]
 
 
 # Keep backward compatibility
@@ -386,9 +503,35 @@ def fr_region_name_to_info(region_name):
 region_info_from_name = fr_region_name_to_info
 
 
+def fr_region_name_to_dept_code(text):
+    """
+    Return the code of the main department of the region named in text.
+    """
+    if region_info := fr_region_name_to_info(text):
+        return region_info[0]
+
+
 # GLOBAL
 
 
+@build_once
+def get_country_gazetteers():
+    """
+    Return the read-only country names of every language, with and without
+    ambiguous names, built on first use and shared by all lookups.
+    """
+    return Gazetteers(data.language_to_country_names, data.ambiguous_country_names)
+
+
+@build_once
+def get_capital_gazetteers():
+    """
+    Return the read-only capital names of every language, with and without
+    ambiguous names, built on first use and shared by all lookups.
+    """
+    return Gazetteers(data.language_to_capital_names, data.ambiguous_country_names)
+
+
 def country_name_to_country_name_and_code(text, lang=None):
     """
     Get country names and return his code associated with found name.
@@ -413,7 +556,7 @@ def country_name_to_country_name_and_code(text, lang=None):
     >>> country_name_to_country_name_and_code("Germania", lang="it")
 
     """
-    return _full_name_to_country_name_and_code(text, lang, language_to_country_names)
+    return _full_name_to_country_name_and_code(text, lang, get_country_gazetteers())
 
 
 def country_name_to_country_code(text, lang=None):
@@ -452,7 +595,7 @@ def capital_name_to_country_name_and_code(text, lang=None):
     """
     Find the corresponding country code from the capital name.
     """
-    return _full_name_to_country_name_and_code(text, lang, language_to_capital_names)
+    return _full_name_to_country_name_and_code(text, lang, get_capital_gazetteers())
 
 
 def capital_name_to_country_code(text, lang=None):
@@ -464,7 +607,7 @@ def capital_name_to_country_code(text, lang=None):
         return found_country[1]
 
 
-def _full_name_to_country_name_and_code(text, lang, language_to_full_names):
+def _full_name_to_country_name_and_code(text, lang, gazetteers):
     """
     Find the corresponding country code from the full name.
     """
@@ -473,44 +616,70 @@ def _full_name_to_country_name_and_code(text, lang, language_to_full_names):
     if not text:
         return
 
-    # Find the languages to be used use to find the country code
-    if lang and lang.lower() in language_to_full_names:
-        # Use just the given language when it is available.
-        language_to_full_names = {lang: language_to_full_names[lang.lower()]}
-    elif lang is not None:
-        # If the language is unknown, just do not use any language.
-        language_to_full_names = {}
-
-    for language, full_names in language_to_full_names.items():
-        # When no language is set, remove ambiguous country names from the countries list.
-        if not lang:
-            full_names = full_names.copy()
-            for name in ambiguous_country_names:
-                full_names.pop(name, None)
-        country_name, country_code = _full_name_to_country_name_and_code_for_lang(
-            text, language, full_names
-        )
+    # When no language is set, ambiguous country names are not used.
+    for _, gazetteer in gazetteers.for_lang(lang):
+        country_name, country_code = gazetteer.find(text)
         if country_code:
             return (country_name, country_code)
 
 
-def _full_name_to_country_name_and_code_for_lang(text, lang, full_names):
-    # Quickly reach conclusion if possible
-    if text in full_names:
-        return (text, full_names[text])
+# Keep backward compatibility
+capital_name_to_country_id = capital_name_to_country_code
 
-    # Otherwise use a regex
-    items_found = []
-    for name, code in full_names.items():
-        if re.search(rf"(\s|[^\w\s]|\b){name}(\s|[^\w\s]|\b)", text):
-            items_found.append((name, code))
-    if items_found:
-        return max(items_found, key=lambda item: len(item[0]))
-    return (None, None)
+# The most characters of a text the main address functions look at, None for
+# no limit (see set_max_text_length)
+_max_text_length = None
 
 
-# Keep backward compatibility
-capital_name_to_country_id = capital_name_to_country_code
+def set_max_text_length(max_length):
+    """
+    Make the main address functions (and address_to_found_text_and_country_code)
+    look at max_length characters of each text at most, for a bounded time on very long texts, or at the whole text
+    if max_length is None (the default).
+
+    Longer texts are reduced to their most address-like lines, or texts
+    between HTML tags (see utils.address_window).
+
+    >>> set_max_text_length(40)
+    >>> address_to_subdivision_code("<p>" + "Lorem ipsum " * 1000 + "</p><p>Maine-et-Loire</p>")
+    '49'
+    >>> set_max_text_length(None)
+    """
+    global _max_text_length
+    if max_length is not None and max_length < 1:
+        raise ValueError("max_length must be at least 1")
+    _max_text_length = max_length
+
+
+def _guarded_text(text):
+    """
+    Return the part of text the main address functions look at.
+    """
+    max_length = _max_text_length
+    if max_length is None or len(text) <= max_length:
+        return text
+    return address_window(text, max_length)
+
+
+# The metrics and the slow call log of the main address functions (see
+# geoconvert.metrics and geoconvert.slowlog), None while they are disabled
+_metrics = None
+_slow_log = None
+
+
+def _observed_call(function, key, compute, text, **options):
+    """
+    Return compute(), the result of function(text, **options), taken from
+    the cache while caching is enabled, and observed by the metrics and the
+    slow call log while they are enabled.
+    """
+    slow_log = _slow_log
+    if slow_log is not None:
+        compute = slow_log.watch(function, compute, text, options)
+    metrics = _metrics
+    if metrics is None:
+        return cached_call(key, compute)
+    return metrics.observe(function, key, compute, text, **options)
 
 
 def address_to_country_code(text, lang=None):
@@ -537,22 +706,24 @@ def address_to_country_code(text, lang=None):
     >>> address_to_country_code("Ungarn", lang="us")
     >>> address_to_country_code("Ungarn", lang="de")
     'HU'
-    """
-    # Look for the country code from the country name first.
-    country_code = country_name_to_country_code(text, lang)
-    if country_code:
-        return country_code
-
-    # Look for the country code from the capital name second.
-    country_code = capital_name_to_country_code(text, lang)
-    if country_code:
-        return country_code
 
-    # Go through all countries, one after the other, to guess the country
-    # from a subdivision (but only via safe-enough means of identifying
-    # the subdivision)
-    country_code, _ = _guess_subdivision_then_country_codes(text)
-    return country_code
+    Languages are tried one after the other, country names before capital
+    names, and the first name found wins. So when names of several
+    languages overlap, the result may differ from find_country_mentions,
+    where the longest name wins whatever its language:
+    >>> address_to_country_code("Samoa Americana")  # "Samoa" (DE) comes first
+    'WS'
+    >>> find_country_mentions("Samoa Americana")[0].country_code  # (PT) is longer
+    'AS'
+    """
+    text = _guarded_text(text)
+    return _observed_call(
+        address_to_country_code,
+        ("address_to_country_code", text, lang and lang.lower()),
+        lambda: _address_to_found_text_and_country_code(text, lang)[1],
+        text,
+        lang=lang,
+    )
 
 
 def address_to_found_text_and_country_code(text, lang=None):
@@ -581,18 +752,38 @@ def address_to_found_text_and_country_code(text, lang=None):
     >>> address_to_found_text_and_country_code("Ungarn", lang="de")
     ('ungarn', 'HU')
     """
-    # Look for the country code from the country name first.
-    if country := country_name_to_country_name_and_code(text, lang):
-        return country
+    return _address_to_found_text_and_country_code(_guarded_text(text), lang)
 
-    # Look for the country code from the capital name second.
-    if country := capital_name_to_country_name_and_code(text, lang):
-        return country
+
+def _address_to_found_text_and_country_code(text, lang, stages=_stages):
+    """
+    Hidden function to be used by address_to_country_code and
+    address_to_found_text_and_country_code, scanning the text only once.
+    """
+    text = LookupText.wrap(text)
+    # Find all country, capital and subdivision names in a single scan
+    safe_text, (found, delimited) = stages.scan(text)
+
+    if safe_text:
+        # Look for the country code from the country name first,
+        # then from the capital name.
+        for kind, gazetteers in (
+            ("country name", get_country_gazetteers()),
+            ("capital name", get_capital_gazetteers()),
+        ):
+            for name_lang, gazetteer in gazetteers.for_lang(lang):
+                country_name, country_code = stages.find_name(
+                    kind, name_lang, gazetteer, safe_text, delimited
+                )
+                if country_code:
+                    return (country_name, country_code)
 
     # Go through all countries, one after the other, to guess the country
     # from a subdivision (but only via safe-enough means of identifying
     # the subdivision)
-    country_code, _ = _guess_subdivision_then_country_codes(text)
+    country_code, _ = _guess_subdivision_then_country_codes(
+        text, safe_text, found, stages
+    )
     return (None, country_code)
 
 
@@ -600,13 +791,15 @@ def address_to_found_text_and_country_code(text, lang=None):
 # This means that we can use all possible ways to find subdivisions
 # for that given country, because the user explicitly said which country
 # the input text comes from.
-country_to_subdivision_lookup_function = {
-    "BR": br_address_to_state_code,
-    "CA": ca_address_to_province_code,
-    "FR": fr_address_to_dept_code,
-    "DE": de_address_to_land_code,
-    "US": us_address_to_state_code,
-}
+country_to_subdivision_lookup_function = MappingProxyType(
+    {
+        "BR": br_address_to_state_code,
+        "CA": ca_address_to_province_code,
+        "FR": fr_address_to_dept_code,
+        "DE": de_address_to_land_code,
+        "US": us_address_to_state_code,
+    }
+)
 
 # Here are the lookup functions to use when the country is unknown.
 # This makes sure that only safe functions, with almost zero risk of
@@ -639,6 +832,79 @@ country_to_safe_subdivision_lookup_function = (
 )
 
 
+@build_once
+def get_fr_spaced_department_names():
+    """
+    Return the French department names, with spaces instead of hyphens
+    like in safe strings.
+    """
+    return frozenset(name.replace("-", " ") for name in data.fr_departments)
+
+
+@build_once
+def get_address_automaton():
+    """
+    Return the automaton finding everything which can be found by name when
+    looking for a country: country and capital names in all languages, and
+    the subdivision names used by the safe subdivision lookup functions.
+
+    It is built on first use.
+    """
+    country_gazetteers = get_country_gazetteers().by_language.values()
+    capital_gazetteers = get_capital_gazetteers().by_language.values()
+    return Automaton(
+        chain(
+            *(gazetteer.names for gazetteer in country_gazetteers),
+            *(gazetteer.names for gazetteer in capital_gazetteers),
+            data.ca_provinces,
+            get_fr_spaced_department_names(),
+            data.DE_HAUPTSTADT,
+            data.de_landers,
+            data.us_states,
+        )
+    )
+
+
+def _has_digit(text):
+    return any(char.isdigit() for char in text)
+
+
+def _fr_dept_name_may_be_found(text, safe_text, found):
+    # Cleaning may change the text, so the department names found before
+    # cleaning tell nothing.
+    if fr_street_name_cleaning_re.search(text) or fr_town_name_cleaning_re.search(text):
+        return True
+    return not found.isdisjoint(get_fr_spaced_department_names())
+
+
+# Conditions which must be met by a text for a safe subdivision lookup
+# function to find anything, given the text, its safe version and the names
+# found in it by the address automaton.
+# They are cheap, so that texts only go through the relevant functions.
+safe_subdivision_lookup_condition = MappingProxyType(
+    {
+        br_postcode_to_state_code: lambda text, safe_text, found: _has_digit(text),
+        ca_postcode_to_province_code: lambda text, safe_text, found: (
+            _has_digit(safe_text)
+        ),
+        ca_province_name_to_province_code: lambda text, safe_text, found: (
+            not found.isdisjoint(data.ca_provinces)
+        ),
+        fr_dept_name_to_dept_code: _fr_dept_name_may_be_found,
+        de_hauptstadt_to_land_code: lambda text, safe_text, found: (
+            not found.isdisjoint(data.DE_HAUPTSTADT)
+        ),
+        de_land_name_to_land_code: lambda text, safe_text, found: (
+            not found.isdisjoint(data.de_landers)
+        ),
+        us_postcode_to_state_code: lambda text, safe_text, found: _has_digit(safe_text),
+        us_state_name_to_state_code: lambda text, safe_text, found: (
+            not found.isdisjoint(data.us_states)
+        ),
+    }
+)
+
+
 def address_to_subdivision_code(text, country=None):
     """
     Return the subdivision code given an address. If nothing is found,
@@ -669,27 +935,47 @@ def address_to_subdivision_code(text, country=None):
     >>> address_to_subdivision_code("29633 Munster")
     >>> address_to_subdivision_code("29633 Munster", country="US")
     """
+    text = _guarded_text(text)
+    return _observed_call(
+        address_to_subdivision_code,
+        ("address_to_subdivision_code", text, country and country.upper()),
+        lambda: _address_to_subdivision_code(text, country),
+        text,
+        country=country,
+    )
+
+
+def _address_to_subdivision_code(text, country, stages=_stages):
+    """
+    Hidden function to be used by address_to_subdivision_code
+    """
+    text = LookupText.wrap(text)
     # Find the subdivision code according to the country.
     if country:
         country = country.upper()
         if country in country_to_subdivision_lookup_function:
-            return country_to_subdivision_lookup_function[country](text)
+            return stages.lookup_subdivision(
+                country_to_subdivision_lookup_function[country], text
+            )
     else:
         # Go through all countries, one after the other, while no result
         # is found.
-        _, subdivision_code = _guess_country_and_subdivision_codes(text)
+        _, subdivision_code = _guess_country_and_subdivision_codes(text, stages=stages)
         return subdivision_code
 
 
-def _address_to_country_and_subdivision_codes(text, lang, country):
+def _address_to_country_and_subdivision_codes(text, lang, country, stages=_stages):
     """
     Hidden function to be used by address_to_country_and_subdivision_codes
     """
+    text = LookupText.wrap(text)
     if country:
         country = country.upper()
         # If a country is given, look for the subdivision of that specific country
         if country in country_to_subdivision_lookup_function:
-            subdivision_code = address_to_subdivision_code(text, country=country)
+            subdivision_code = stages.lookup_subdivision(
+                country_to_subdivision_lookup_function[country], text
+            )
             if subdivision_code:
                 # If a subdivision is found,
                 # return it with the corresponding country code
@@ -697,11 +983,11 @@ def _address_to_country_and_subdivision_codes(text, lang, country):
         # If no subdivision can be found for the given country,
         # try and look for a country code from the input text,
         # and return it if it matches the one given by the user.
-        country_code = address_to_country_code(text, lang)
+        _, country_code = _address_to_found_text_and_country_code(text, lang, stages)
         if country_code == country:
             return (country_code, None)
     else:
-        return _guess_country_and_subdivision_codes(text, lang)
+        return _guess_country_and_subdivision_codes(text, lang, stages)
 
     return (None, None)
 
@@ -781,7 +1067,27 @@ def address_to_country_and_subdivision_codes(
     'DE'
 
     """
-    result = _address_to_country_and_subdivision_codes(text, lang, country)
+    text = _guarded_text(text)
+    return _observed_call(
+        address_to_country_and_subdivision_codes,
+        (
+            "address_to_country_and_subdivision_codes",
+            text,
+            lang and lang.lower(),
+            country and country.upper(),
+            bool(iso_format),
+        ),
+        lambda: _format_country_and_subdivision_codes(
+            _address_to_country_and_subdivision_codes(text, lang, country), iso_format
+        ),
+        text,
+        lang=lang,
+        country=country,
+        iso_format=iso_format,
+    )
+
+
+def _format_country_and_subdivision_codes(result, iso_format):
     if iso_format:
         if result[1]:
             return "-".join(result)
@@ -789,52 +1095,157 @@ def address_to_country_and_subdivision_codes(
     return result
 
 
-def _guess_country_and_subdivision_codes(text, lang=None):
+def _guess_country_and_subdivision_codes(text, lang=None, stages=_stages):
     """
     Just guess the subdivision when no country is explicitly given.
     """
     # Look for NUTS code in the plain text
-    nuts_match = re.search(all_nuts_regex, text)
-    if nuts_match:
-        nuts_code = nuts_match.group().upper()
-        return nuts_code[:2], ALL_NUTS_CODES.get(nuts_code)
-
-    country_code, subdivision_code = _guess_country_then_subdivision_codes(text, lang)
-    if country_code is not None:
-        return country_code, subdivision_code
+    nuts_code = stages.find_nuts_code(text)
+    if nuts_code is not None:
+        return nuts_code[:2], data.ALL_NUTS_CODES.get(nuts_code)
 
-    return _guess_subdivision_then_country_codes(text)
+    # The subdivision is also guessed without country when no country
+    # is found in plain text.
+    return _guess_country_then_subdivision_codes(text, lang, stages)
 
 
-def _guess_country_then_subdivision_codes(text, lang=None):
+def _guess_country_then_subdivision_codes(text, lang=None, stages=_stages):
     """
     Guess the country code from the input text first,
     then look for the subdivision code for that country.
     """
-    country_code = address_to_country_code(text, lang)
+    _, country_code = _address_to_found_text_and_country_code(text, lang, stages)
     if country_code:
-        return country_code, address_to_subdivision_code(text, country=country_code)
+        return country_code, _address_to_subdivision_code(text, country_code, stages)
 
     return (None, None)
 
 
-def _guess_subdivision_then_country_codes(text):
+def _guess_subdivision_then_country_codes(text, safe_text, found, stages=_stages):
     """
     If no countries are found in plain text, just guess the
     subdivision by looping through all available countries.
     Stop at the first subdivision code found.
+
+    found is the set of names found by the address automaton in safe_text.
     """
     for (
         country_code,
         safe_subdivision_lookup_function,
     ) in country_to_safe_subdivision_lookup_function:
-        subdivision_code = safe_subdivision_lookup_function(text)
+        condition = safe_subdivision_lookup_condition[safe_subdivision_lookup_function]
+        if not condition(text, safe_text, found):
+            continue
+        subdivision_code = stages.lookup_safe_subdivision(
+            country_code, safe_subdivision_lookup_function, text, safe_text
+        )
         if subdivision_code:
             return (country_code, subdivision_code)
 
     return (None, None)
 
 
+@build_once
+def get_country_mention_finder(lang=None):
+    """
+    Return the finder of country and capital name mentions for the given
+    (lower case) language, built on first use.
+
+    Country names come first, then capital names, each in the order of
+    the languages: the first language a name is found in is kept.
+    """
+    names = {}
+    for gazetteers in (get_country_gazetteers(), get_capital_gazetteers()):
+        for name_lang, gazetteer in gazetteers.for_lang(lang):
+            for name, code in gazetteer.names.items():
+                names.setdefault(name, (name_lang, code))
+    return MentionFinder(names, get_address_automaton())
+
+
+def find_country_mentions(text, lang=None, max_results=None, spans=False):
+    """
+    Return the country and capital names mentioned in the text, in order
+    of appearance, found in a single scan. Names shared by several languages
+    are given with the first one, languages being used in the same order
+    as in address_to_country_code.
+
+    Mentions do not overlap: the longest names are preferred.
+    >>> for mention in find_country_mentions("Papouasie-Nouvelle-Guinée et Guinée"):
+    ...     print(mention.country_code, mention.name, mention.lang)
+    PG papouasie nouvelle guinee fr
+    GN guinee fr
+
+    Set spans=True to get where the names are in the text:
+    >>> [(mention.start, mention.end) for mention in find_country_mentions(
+    ...     "Bienvenue à Kinshasa, Congo", spans=True
+    ... )]
+    [(12, 20), (22, 27)]
+
+    The text is only gone through until max_results mentions are found:
+    >>> find_country_mentions("china france spain", max_results=1)
+    [CountryMention(country_code='CN', name='china', lang='en', start=None, end=None)]
+    """
+    finder = get_country_mention_finder(lang and lang.lower())
+    if spans:
+        safe_text, offsets = safe_string_with_offsets(text)
+    else:
+        safe_text = safe_string(text)
+    mentions = islice(finder.finditer(safe_text), max_results)
+    if spans:
+        return [
+            CountryMention(code, name, name_lang, offsets[start], offsets[end - 1] + 1)
+            for start, end, name, name_lang, code in mentions
+        ]
+    return [
+        CountryMention(code, name, name_lang, None, None)
+        for _, _, name, name_lang, code in mentions
+    ]
+
+
+def count_countries(text, lang=None):
+    """
+    Return how many times each country is mentioned in the text,
+    by its name or its capital name.
+
+    >>> count_countries("Kinshasa, Congo, Egypt, République démocratique du Congo")
+    Counter({'CD': 2, 'CG': 1, 'EG': 1})
+    """
+    return Counter(
+        code
+        for _, _, _, _, code in get_country_mention_finder(
+            lang and lang.lower()
+        ).finditer(safe_string(text))
+    )
+
+
+def _first_country_name(names, lang):
+    """
+    Return the (name, country code) of names which
+    _address_to_found_text_and_country_code would find first in a text
+    where they are found, or None.
+    """
+    for gazetteers in (get_country_gazetteers(), get_capital_gazetteers()):
+        for _, gazetteer in gazetteers.for_lang(lang):
+            name = gazetteer.pick(name for name in names if name in gazetteer.names)
+            # A name without country code hides the others of its language
+            if name is not None and gazetteer.names[name]:
+                return (name, gazetteer.names[name])
+
+
+def _select_country_names(overlaps, lang=None):
+    """
+    Return the (name, country code) pairs find_countries finds, in order,
+    from the NameOverlaps of the text: the first name found, then the first
+    one in what is left once its occurrences are removed, and so on.
+    """
+    selected = []
+    removed = set()
+    while country := _first_country_name(overlaps.left(removed), lang):
+        selected.append(country)
+        removed.add(country[0])
+    return selected
+
+
 def find_countries(text, lang=None, enable_ambiguous_detection=False):
     """
     Detect countries from a given text.
@@ -848,16 +1259,33 @@ def find_countries(text, lang=None, enable_ambiguous_detection=False):
     ['DE', 'GA']
     >>> find_countries('FR In Gabon and Germany, CH', enable_ambiguous_detection=True)
     ['CH', 'DE', 'FR', 'GA']
-    """
 
+    Names are looked for like address_to_country_code does, languages one
+    after the other, so find_country_mentions, where the longest name wins
+    whatever its language, may find other countries:
+    >>> find_countries('Port of Spain')
+    ['ES']
+    >>> [mention.country_code for mention in find_country_mentions('Port of Spain')]
+    ['TT']
+    """
     # Remove countries found in text gradually.
     # "France and trinidad y tobago" -> "France and" -> "and"
     # "Congo, Congo, Democratic Republic of the" -> "Congo" -> ""
+    # All names are found in a single scan, then removed in the order they
+    # would be found one after the other.
     safe_text = safe_string(text)
+    finder = get_country_mention_finder(lang and lang.lower())
     countries = set()
-    # Find countries from addresses
+    for name, country_code in _select_country_names(
+        finder.name_overlaps(safe_text), lang
+    ):
+        countries.add(country_code)
+        safe_text = safe_text.replace(name, "")
+
+    # Look at what remains, to guess a country from a subdivision, and find
+    # the names which removing the others may have revealed
     while (
-        country := address_to_found_text_and_country_code(safe_text, lang)
+        country := _address_to_found_text_and_country_code(safe_text, lang)
     ) and country[1]:
         countries.add(country[1])
         # Check if found text is detectable, else break to avoid infinite loop
@@ -869,7 +1297,7 @@ def find_countries(text, lang=None, enable_ambiguous_detection=False):
     if enable_ambiguous_detection:
         two_letter_codes = re.findall(r"\b([A-Z]{2})\b", text)
         for two_letter_code in two_letter_codes:
-            if two_letter_code in ALL_COUNTRY_CODES:
+            if two_letter_code in data.ALL_COUNTRY_CODES:
                 countries.add(two_letter_code)
 
     return sorted(list(countries))
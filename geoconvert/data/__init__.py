@@ -1,58 +1,121 @@
-from .capitals import capitals_de, capitals_en, capitals_fr, language_to_capital_names
-from .countries import (
-    ambiguous_country_names,
-    countries_de,
-    countries_en,
-    countries_fr,
-    countries_pt,
-    country_territories,
-    language_to_country_names,
-    territory_to_country,
-)
-from .subdivisions.brazil import (
-    BR_POSTCODES_RANGE,
-    br_postcode_regex,
-    br_state_code_regex,
-    br_state_name_regex,
-    br_states,
-)
-from .subdivisions.canada import (
-    CA_POSTCODE_FIRST_LETTER_TO_PROVINCE_CODE,
-    ca_postcode_regex,
-    ca_province_code_regex,
-    ca_province_name_regex,
-    ca_provinces,
-)
-from .subdivisions.france import (
-    corse_du_sud_special_zipcodes,
-    fr_department_name_regex,
-    fr_departments,
-    fr_postcode_regex,
-    fr_principal_places,
-    fr_region_name_regex,
-    fr_regions,
-)
-from .subdivisions.germany import (
-    DE_HAUPTSTADT,
-    DE_POSTCODE_RANGE,
-    de_land_code_regex,
-    de_land_hauptstadt_regex,
-    de_land_name_regex,
-    de_landers,
-    de_postcode_regex,
-)
-from .subdivisions.nuts import (
-    ALL_NUTS_CODES,
-    NUTS_CODES_BY_COUNTRY,
-    all_nuts_regex,
-    nuts_regexes_by_country,
-)
-from .subdivisions.united_states import (
-    us_postcode_regex,
-    us_state_code_regex,
-    us_state_name_regex,
-    us_states,
+import sys
+from functools import partial
+from importlib import import_module
+
+from ..lazy import lazy_attributes
+
+# Names available from geoconvert.data, by module defining them.
+# A module is only imported (and its regexes compiled) when one of its names
+# is first used, so that importing geoconvert stays fast.
+names_by_module = {
+    ".capitals": [
+        "capitals_de",
+        "capitals_en",
+        "capitals_fr",
+        "language_to_capital_names",
+    ],
+    ".countries": [
+        "ALL_COUNTRY_CODES",
+        "KNOWN_LANGUAGES_FOR_COUNTRY",
+        "ambiguous_country_names",
+        "countries_de",
+        "countries_en",
+        "countries_fr",
+        "countries_pt",
+        "country_territories",
+        "language_to_country_names",
+        "territory_to_country",
+    ],
+    ".subdivisions.brazil": [
+        "BR_POSTCODES_RANGE",
+        "BR_POSTCODES_TABLE",
+        "br_postcode_regex",
+        "br_state_code_backend_regex",
+        "br_state_code_regex",
+        "br_state_name_backend_regex",
+        "br_state_name_regex",
+        "br_states",
+    ],
+    ".subdivisions.canada": [
+        "CA_POSTCODE_FIRST_LETTER_TO_PROVINCE_CODE",
+        "ca_postcode_regex",
+        "ca_province_code_backend_regex",
+        "ca_province_code_regex",
+        "ca_province_name_backend_regex",
+        "ca_province_name_regex",
+        "ca_provinces",
+    ],
+    ".subdivisions.france": [
+        "corse_du_sud_special_zipcodes",
+        "fr_department_name_backend_regex",
+        "fr_department_name_regex",
+        "fr_departments",
+        "fr_postcode_regex",
+        "fr_principal_places",
+        "fr_region_name_backend_regex",
+        "fr_region_name_regex",
+        "fr_regions",
+    ],
+    ".subdivisions.germany": [
+        "DE_HAUPTSTADT",
+        "DE_POSTCODE_RANGE",
+        "DE_POSTCODE_TABLE",
+        "de_land_code_backend_regex",
+        "de_land_code_regex",
+        "de_land_hauptstadt_backend_regex",
+        "de_land_hauptstadt_regex",
+        "de_land_name_backend_regex",
+        "de_land_name_regex",
+        "de_landers",
+        "de_postcode_regex",
+    ],
+    ".subdivisions.nuts": [
+        "ALL_NUTS_CODES",
+        "NUTS_CODES_BY_COUNTRY",
+        "all_nuts_index",
+        "all_nuts_regex",
+        "nuts_indexes_by_country",
+        "nuts_regexes_by_country",
+    ],
+    ".subdivisions.united_states": [
+        "us_postcode_regex",
+        "us_state_code_backend_regex",
+        "us_state_code_regex",
+        "us_state_name_backend_regex",
+        "us_state_name_regex",
+        "us_states",
+    ],
+}
+
+
+def load(module_name, name):
+    return getattr(import_module(module_name, __name__), name)
+
+
+__all__ = [name for names in names_by_module.values() for name in names]
+
+__getattr__ = lazy_attributes(
+    globals(),
+    {
+        name: partial(load, module_name, name)
+        for module_name, names in names_by_module.items()
+        for name in names
+    },
 )
 
-KNOWN_LANGUAGES_FOR_COUNTRY = set(language_to_country_names.keys())
-ALL_COUNTRY_CODES = list(set(val for _, val in countries_en.items() if val))
+
+# Kept for backward compatibility only, and not worth loading in advance
+unused_names = {"all_nuts_regex", "nuts_regexes_by_country"}
+
+
+def load_all():
+    """
+    Import every data module and build every regex and index now rather than
+    on first use, for instance to warm up a worker process before its first task.
+    """
+    module = sys.modules[__name__]
+    for name in __all__:
+        if name not in unused_names:
+            getattr(module, name)
+    for country in module.NUTS_CODES_BY_COUNTRY:
+        module.nuts_indexes_by_country[country]
@@ -1351,3 +1351,7 @@ territory_to_country = {
     for country, territories in country_territories.items()
     for territory in territories
 }
+
+
+KNOWN_LANGUAGES_FOR_COUNTRY = set(language_to_country_names.keys())
+ALL_COUNTRY_CODES = list(set(val for _, val in countries_en.items() if val))
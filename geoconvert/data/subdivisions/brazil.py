@@ -1,4 +1,9 @@
 import re
+from functools import partial
+
+from ...lazy import lazy_attributes
+from ...ranges import RangeTable
+from ...regex_backend import BackendRegex
 
 br_states = {
     "acre": "AC",
@@ -65,13 +70,24 @@ BR_POSTCODES_RANGE = {
     899: "SC",
     999: "RS",
 }
+# The same ranges, for binary searches
+BR_POSTCODES_TABLE = RangeTable(BR_POSTCODES_RANGE)
 
-# Regexes
+# Regexes, compiled on first use
 
 names = r"\b|\b".join(name.replace(" ", r"\s") for name in br_states)
-br_state_name_regex = re.compile(rf"(?P<state>\b{names}\b)", re.I)
-
 codes = r"\b|\b".join(code for code in BR_STATES_CODES)
-br_state_code_regex = re.compile(rf"(?P<code>\b{codes}\b)")
+name_pattern = rf"(?P<state>\b{names}\b)"
+code_pattern = rf"(?P<code>\b{codes}\b)"
 
-br_postcode_regex = re.compile(r"\b(?P<postcode>\d{3})\d{2}-\d{3}\b")
+__getattr__ = lazy_attributes(
+    globals(),
+    {
+        "br_state_name_regex": partial(re.compile, name_pattern, re.I),
+        "br_state_code_regex": partial(re.compile, code_pattern),
+        "br_postcode_regex": partial(re.compile, r"\b(?P<postcode>\d{3})\d{2}-\d{3}\b"),
+        # The same regexes, searched with the regex backend in use
+        "br_state_name_backend_regex": partial(BackendRegex, name_pattern, re.I),
+        "br_state_code_backend_regex": partial(BackendRegex, code_pattern),
+    },
+)
@@ -1,4 +1,8 @@
 import re
+from functools import partial
+
+from ...lazy import lazy_attributes
+from ...regex_backend import BackendRegex
 
 ca_provinces = {
     "yukon": "YT",
@@ -48,12 +52,23 @@ CA_POSTCODE_FIRST_LETTER_TO_PROVINCE_CODE = {
 }
 
 
-# Regexes
+# Regexes, compiled on first use
 
 names = r"\b|\b".join(name.replace(" ", r"\s") for name in ca_provinces)
-ca_province_name_regex = re.compile(rf"(?P<province>\b{names}\b)", re.I)
-
 codes = r"\b|\b".join(code for code in CA_PROVINCES_CODES)
-ca_province_code_regex = re.compile(rf"(?P<code>\b{codes}\b)")
+name_pattern = rf"(?P<province>\b{names}\b)"
+code_pattern = rf"(?P<code>\b{codes}\b)"
 
-ca_postcode_regex = re.compile(r"(?P<postcode>\b\w\d\w\s?\d\w\d\b)", re.I)
+__getattr__ = lazy_attributes(
+    globals(),
+    {
+        "ca_province_name_regex": partial(re.compile, name_pattern, re.I),
+        "ca_province_code_regex": partial(re.compile, code_pattern),
+        "ca_postcode_regex": partial(
+            re.compile, r"(?P<postcode>\b\w\d\w\s?\d\w\d\b)", re.I
+        ),
+        # The same regexes, searched with the regex backend in use
+        "ca_province_name_backend_regex": partial(BackendRegex, name_pattern, re.I),
+        "ca_province_code_backend_regex": partial(BackendRegex, code_pattern),
+    },
+)
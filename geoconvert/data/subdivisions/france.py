@@ -1,5 +1,8 @@
 import re
+from functools import partial
 
+from ...lazy import lazy_attributes
+from ...regex_backend import BackendRegex
 from .united_states import US_STATES_CODES
 
 fr_regions = {
@@ -255,17 +258,31 @@ corse_du_sud_special_zipcodes = ajaccio_zipcodes + porto_vecchio_zipcodes
 # Keep backward compatibility
 departments = fr_departments
 
-# Regexes
-names = r"\b|\b".join(name for name in fr_departments)
-fr_department_name_regex = re.compile(rf"(?P<dept>\b{names}\b)", re.I)
-
-names = r"\b|\b".join(name for name in fr_regions)
-fr_region_name_regex = re.compile(rf"(?P<region>\b{names}\b)", re.I)
-
+# Regexes, compiled on first use
+department_names = r"\b|\b".join(name for name in fr_departments)
+region_names = r"\b|\b".join(name for name in fr_regions)
 us_states_codes = r"\b|\b".join(code for code in US_STATES_CODES)
-fr_postcode_regex = re.compile(
-    r"(?<!TSA)(?<!BP)(?<!B.P.)(?<!CS)(?:[^\d]|^)(?<!TSA)(?<!BP)(?<!B.P.)(?<!CS)"
-    + rf"(?<!(\b{us_states_codes}\b)\s)"
-    + r"(?P<postcode>\d{2}\s?\d{3})\s*([^\d\s]|$)",
-    re.I,
+department_name_pattern = rf"(?P<dept>\b{department_names}\b)"
+region_name_pattern = rf"(?P<region>\b{region_names}\b)"
+
+__getattr__ = lazy_attributes(
+    globals(),
+    {
+        "fr_department_name_regex": partial(re.compile, department_name_pattern, re.I),
+        "fr_region_name_regex": partial(re.compile, region_name_pattern, re.I),
+        "fr_postcode_regex": partial(
+            re.compile,
+            r"(?<!TSA)(?<!BP)(?<!B.P.)(?<!CS)(?:[^\d]|^)(?<!TSA)(?<!BP)(?<!B.P.)(?<!CS)"
+            + rf"(?<!(\b{us_states_codes}\b)\s)"
+            + r"(?P<postcode>[0-9]{2}\s?[0-9]{3})\s*([^\d\s]|$)",
+            re.I,
+        ),
+        # The same regexes, searched with the regex backend in use
+        "fr_department_name_backend_regex": partial(
+            BackendRegex, department_name_pattern, re.I
+        ),
+        "fr_region_name_backend_regex": partial(
+            BackendRegex, region_name_pattern, re.I
+        ),
+    },
 )
@@ -1,4 +1,9 @@
 import re
+from functools import partial
+
+from ...lazy import lazy_attributes
+from ...ranges import RangeTable
+from ...regex_backend import BackendRegex
 
 de_landers = {
     "baden wurttemberg": "BW",
@@ -114,16 +119,28 @@ DE_POSTCODE_RANGE = {
     95999: "BY",
     99999: "TH",
 }
+# The same ranges, for binary searches
+DE_POSTCODE_TABLE = RangeTable(DE_POSTCODE_RANGE)
 
 
-# Regexes
+# Regexes, compiled on first use
 names = r"\b|\b".join(code for code in de_landers.keys())
-de_land_name_regex = re.compile(rf"(?P<land>\b{names}\b)", re.I)
-
 codes = r"\b|\b".join(code for code in DE_LANDERS_CODES)
-de_land_code_regex = re.compile(rf"(?P<code>\b{codes}\b)")
-
 hauptstadt = r"\b|\b".join(code for code in DE_HAUPTSTADT.keys())
-de_land_hauptstadt_regex = re.compile(rf"(?P<hauptstadt>\b{hauptstadt}\b)")
+name_pattern = rf"(?P<land>\b{names}\b)"
+code_pattern = rf"(?P<code>\b{codes}\b)"
+hauptstadt_pattern = rf"(?P<hauptstadt>\b{hauptstadt}\b)"
 
-de_postcode_regex = re.compile(r"\b(?P<postcode>\d{5})")
+__getattr__ = lazy_attributes(
+    globals(),
+    {
+        "de_land_name_regex": partial(re.compile, name_pattern, re.I),
+        "de_land_code_regex": partial(re.compile, code_pattern),
+        "de_land_hauptstadt_regex": partial(re.compile, hauptstadt_pattern),
+        "de_postcode_regex": partial(re.compile, r"\b(?P<postcode>\d{5})"),
+        # The same regexes, searched with the regex backend in use
+        "de_land_name_backend_regex": partial(BackendRegex, name_pattern, re.I),
+        "de_land_code_backend_regex": partial(BackendRegex, code_pattern),
+        "de_land_hauptstadt_backend_regex": partial(BackendRegex, hauptstadt_pattern),
+    },
+)
@@ -1,4 +1,8 @@
 import re
+from functools import partial
+
+from ...lazy import LazyMapping, lazy_attributes
+from ...token_index import TokenIndex
 
 NUTS_CODES_BY_COUNTRY = {
     "DE": {
@@ -785,12 +789,28 @@ ALL_NUTS_CODES = {
     for nuts_code, subdivision in nuts_by_country.items()
 }
 
-# Regexes
-nuts_regexes_by_country = {
-    country: re.compile(r"|".join(rf"\b{code}\b" for code in nuts_codes.keys()), re.I)
-    for country, nuts_codes in NUTS_CODES_BY_COUNTRY.items()
-}
-all_nuts_regex = re.compile(
-    r"|".join(rf"\b{code}\b" for code in ALL_NUTS_CODES.keys()),
-    re.I,
+
+# NUTS codes index of each country, built when the country is first looked up
+nuts_indexes_by_country = LazyMapping(
+    NUTS_CODES_BY_COUNTRY, lambda country: TokenIndex(NUTS_CODES_BY_COUNTRY[country])
+)
+
+
+# Regexes, compiled on first use.
+# Keep backward compatibility: NUTS codes are found with the indexes.
+def nuts_pattern(nuts_codes):
+    return r"|".join(rf"\b{code}\b" for code in nuts_codes)
+
+
+nuts_regexes_by_country = LazyMapping(
+    NUTS_CODES_BY_COUNTRY,
+    lambda country: re.compile(nuts_pattern(NUTS_CODES_BY_COUNTRY[country]), re.I),
+)
+
+__getattr__ = lazy_attributes(
+    globals(),
+    {
+        "all_nuts_index": partial(TokenIndex, ALL_NUTS_CODES),
+        "all_nuts_regex": partial(re.compile, nuts_pattern(ALL_NUTS_CODES), re.I),
+    },
 )
@@ -1,4 +1,8 @@
 import re
+from functools import partial
+
+from ...lazy import lazy_attributes
+from ...regex_backend import BackendRegex
 
 us_states = {
     "alabama": "AL",
@@ -59,16 +63,26 @@ us_states = {
 US_STATES_CODES = set(us_states.values())
 
 
-# Regexes
+# Regexes, compiled on first use
 
 names = r"\b|\b".join(name.replace(" ", r"\s") for name in us_states)
-us_state_name_regex = re.compile(rf"(?P<state>\b{names}\b)", re.I)
-
 codes = r"\b|\b".join(code for code in US_STATES_CODES)
-us_state_code_regex = re.compile(rf"(?P<code>\b{codes}\b)")
+name_pattern = rf"(?P<state>\b{names}\b)"
+code_pattern = rf"(?P<code>\b{codes}\b)"
 
-us_postcode_regex = re.compile(
-    rf"(?P<state_code>\b{codes}\b)"  # Positive lookbehind for a state code
-    + r"\s+(?P<postcode>\b\d{5}\b)",
-    re.I,
+__getattr__ = lazy_attributes(
+    globals(),
+    {
+        "us_state_name_regex": partial(re.compile, name_pattern, re.I),
+        "us_state_code_regex": partial(re.compile, code_pattern),
+        "us_postcode_regex": partial(
+            re.compile,
+            rf"(?P<state_code>\b{codes}\b)"  # Positive lookbehind for a state code
+            + r"\s+(?P<postcode>\b\d{5}\b)",
+            re.I,
+        ),
+        # The same regexes, searched with the regex backend in use
+        "us_state_name_backend_regex": partial(BackendRegex, name_pattern, re.I),
+        "us_state_code_backend_regex": partial(BackendRegex, code_pattern),
+    },
 )
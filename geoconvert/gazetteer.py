@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+from types import MappingProxyType
+
+from .automaton import Automaton
+
+
+class Gazetteer:
+    """
+    Read-only table of names (country or capital names of a language)
+    to country codes, along with the automaton finding them in a text.
+
+    >>> gazetteer = Gazetteer({"niger": "NE", "nigeria": "NG"})
+    >>> gazetteer.find("welcome to nigeria")
+    ('nigeria', 'NG')
+    >>> gazetteer.without(["nigeria"]).find("welcome to nigeria")
+    (None, None)
+    """
+
+    __slots__ = ("names", "_ranks", "_automaton", "_shared_with")
+
+    def __init__(self, names, automaton=None, ranks=None):
+        self.names = MappingProxyType(dict(names))
+        # Rank of each name, breaking ties between names as long as the
+        # automaton does, without building it
+        if ranks is None:
+            ranks = {name: rank for rank, name in enumerate(self.names)}
+        self._ranks = ranks
+        self._automaton = automaton
+        self._shared_with = None
+
+    @property
+    def automaton(self):
+        """
+        Automaton finding the names, built on first use.
+        """
+        if self._automaton is None:
+            if self._shared_with is not None:
+                self._automaton = self._shared_with.automaton
+            else:
+                self._automaton = Automaton(self.names)
+        return self._automaton
+
+    def without(self, excluded_names):
+        """
+        Return the same gazetteer without the given names.
+        Both gazetteers share the same automaton and ranks.
+        """
+        names = {
+            name: code
+            for name, code in self.names.items()
+            if name not in excluded_names
+        }
+        gazetteer = Gazetteer(names, self._automaton, self._ranks)
+        gazetteer._shared_with = self
+        return gazetteer
+
+    def find(self, text, delimited=None):
+        """
+        Return the longest name found in the (safe) text and its code.
+
+        delimited may be given when the names found in the text are already
+        known (for instance from a scan with a bigger automaton): the
+        automaton of the gazetteer is then not needed, nor built.
+        """
+        # Quickly reach conclusion if possible
+        if text in self.names:
+            return (text, self.names[text])
+
+        # Otherwise find all names in a single scan
+        if delimited is None:
+            name = self.automaton.longest(text, self.names)
+        else:
+            name = self.pick(name for name in delimited if name in self.names)
+        if name is not None:
+            return (name, self.names[name])
+        return (None, None)
+
+    def pick(self, names):
+        """
+        Return the longest of the given names of the gazetteer, the first one
+        of the gazetteer on ties, or None when there are none.
+
+        >>> gazetteer = Gazetteer({"mali": "ML", "niger": "NE", "congo": "CG"})
+        >>> gazetteer.pick(["mali", "congo", "niger"])
+        'niger'
+        """
+        ranks = self._ranks
+        return max(names, key=lambda name: (len(name), -ranks[name]), default=None)
+
+
+class Gazetteers:
+    """
+    Gazetteers of every language, with and without ambiguous names,
+    built once and shared by all lookups.
+
+    The automaton of each language is only built when the language is used.
+    """
+
+    def __init__(self, language_to_full_names, ambiguous_names):
+        self.by_language = MappingProxyType(
+            {
+                lang: Gazetteer(full_names)
+                for lang, full_names in language_to_full_names.items()
+            }
+        )
+        # When no language is set, ambiguous names are not used.
+        self.unambiguous = tuple(
+            (lang, gazetteer.without(ambiguous_names))
+            for lang, gazetteer in self.by_language.items()
+        )
+
+    def for_lang(self, lang):
+        """
+        Return the (language, gazetteer) pairs to use for the given language.
+
+        There are no errors when the language is unknown: no gazetteer is used.
+        """
+        if lang is None:
+            return self.unambiguous
+        lang = lang.lower()
+        if lang in self.by_language:
+            return ((lang, self.by_language[lang]),)
+        return ()
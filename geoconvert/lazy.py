@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import threading
+from collections.abc import Mapping
+from functools import wraps
+
+
+def lazy_attributes(module_globals, factories):
+    """
+    Return a module __getattr__ function computing the attributes named in
+    factories on first access only, then storing them in the module like any
+    other attribute.
+
+    This keeps the module fast to import when some of its attributes (big
+    regexes, data from other modules) are costly to build and not always used.
+    Two threads may compute the same attribute at the same time: both get an
+    equivalent value and one of them is kept.
+
+    >>> module_globals = {"__name__": "example"}
+    >>> __getattr__ = lazy_attributes(module_globals, {"answer": lambda: 42})
+    >>> __getattr__("answer")
+    42
+    >>> module_globals["answer"]
+    42
+    >>> __getattr__("question")
+    Traceback (most recent call last):
+    ...
+    AttributeError: module 'example' has no attribute 'question'
+    """
+    module_name = module_globals["__name__"]
+
+    def __getattr__(name):
+        try:
+            factory = factories[name]
+        except KeyError:
+            raise AttributeError(
+                f"module {module_name!r} has no attribute {name!r}"
+            ) from None
+        value = module_globals[name] = factory()
+        return value
+
+    return __getattr__
+
+
+def build_once(function):
+    """
+    Decorate a function building a shared read-only object (table, automaton)
+    from hashable arguments, so that the object is built only once for the
+    same arguments, even when threads ask for it at the same time.
+
+    Once built, the object is returned without taking any lock (unlike
+    functools.lru_cache, which locks on every call on free-threaded Python),
+    so that threads using it do not wait for each other.
+
+    >>> @build_once
+    ... def table(size):
+    ...     print("building", size)
+    ...     return tuple(range(size))
+    >>> table(3)
+    building 3
+    (0, 1, 2)
+    >>> table(3) is table(3)
+    True
+    """
+    built = {}
+    lock = threading.Lock()
+
+    @wraps(function)
+    def wrapper(*args):
+        try:
+            return built[args]
+        except KeyError:
+            pass
+        with lock:
+            if args not in built:
+                built[args] = function(*args)
+        return built[args]
+
+    return wrapper
+
+
+class LazyMapping(Mapping):
+    """
+    Read-only mapping of the given keys to values built by factory(key) when
+    the key is first looked up, then kept.
+
+    Iterating, len() and ``in`` only use the keys, so that they work as with
+    a dict of all the values without building any of them.
+
+    >>> def square(number):
+    ...     print("building", number)
+    ...     return number * number
+    >>> squares = LazyMapping((1, 2, 3), square)
+    >>> len(squares), list(squares), 2 in squares, 4 in squares
+    (3, [1, 2, 3], True, False)
+    >>> squares[2]
+    building 2
+    4
+    >>> squares[2]
+    4
+    >>> squares[4]
+    Traceback (most recent call last):
+    ...
+    KeyError: 4
+    """
+
+    def __init__(self, keys, factory):
+        self._keys = dict.fromkeys(keys)
+        self._build = build_once(factory)
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        return self._build(key)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
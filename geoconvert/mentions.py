@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+from collections import namedtuple
+
+from .automaton import Automaton, is_delimited
+
+CountryMention = namedtuple(
+    "CountryMention", ["country_code", "name", "lang", "start", "end"]
+)
+
+
+def _overlaps(match, other):
+    return match[0] < other[1] and other[0] < match[1]
+
+
+def _resolve(component):
+    """
+    Return the matches of a group of overlapping matches to keep,
+    ordered by start: the best ones first, as long as they do not overlap.
+    """
+    selected = []
+    for match in sorted(component, key=lambda match: (match[2], match[0])):
+        if not any(_overlaps(match, other) for other in selected):
+            selected.append(match)
+    return sorted(selected)
+
+
+class NonOverlappingSelector:
+    """
+    Select non-overlapping matches as they come: matches are (start, end,
+    priority, value) tuples, given ordered by end and no longer than
+    max_length. When matches overlap, the one with the lowest priority
+    is kept (the first one on ties).
+
+    Selected matches are returned, ordered by start, as soon as no later match
+    can overlap them, so that only a few matches are kept at any time.
+
+    >>> selector = NonOverlappingSelector(max_length=16)
+    >>> selector.add((0, 6, 1, "guinea"))
+    []
+    >>> selector.add((0, 16, 0, "papua new guinea"))
+    []
+    >>> selector.add((21, 27, 1, "guinea"))
+    []
+    >>> selector.advance(50)
+    [(0, 16, 0, 'papua new guinea'), (21, 27, 1, 'guinea')]
+    """
+
+    def __init__(self, max_length):
+        self.max_length = max_length
+        # Matches which may still be overlapped, ordered by end
+        self._pending = []
+        # Later matches cannot start before it
+        self._bound = 0
+
+    @property
+    def frontier(self):
+        """
+        Position before which no more matches will be selected.
+        """
+        return min([self._bound] + [match[0] for match in self._pending])
+
+    def add(self, match):
+        """
+        Add a match, and return the matches which are now known to be selected.
+        """
+        self._pending.append(match)
+        return self.advance(match[1])
+
+    def advance(self, position):
+        """
+        Tell that no more matches end before position, and return
+        the matches which are now known to be selected.
+        """
+        self._bound = max(self._bound, position - self.max_length)
+        if self._pending and self._pending[0][1] <= self._bound:
+            return self._flush(self._bound)
+        return []
+
+    def close(self):
+        """
+        Tell that there are no more matches, and return the last selected ones.
+        """
+        return self._flush(None)
+
+    def _flush(self, bound):
+        """
+        Return the selected matches of the groups of overlapping pending
+        matches which end before bound (all of them if bound is None),
+        and forget them.
+        """
+        components = []
+        for match in sorted(self._pending):
+            if components and match[0] < components[-1][1]:
+                components[-1][0].append(match)
+                components[-1][1] = max(components[-1][1], match[1])
+            else:
+                components.append([[match], match[1]])
+        selected = []
+        pending = []
+        for component, end in components:
+            # Groups are ordered by start, and a group which may still grow
+            # cannot be followed by a complete one.
+            if bound is not None and end > bound:
+                pending.extend(component)
+            else:
+                selected.extend(_resolve(component))
+        self._pending = sorted(pending, key=lambda match: match[1])
+        return selected
+
+
+def select_non_overlapping(matches, max_length):
+    """
+    Lazily yield the non-overlapping matches to keep, ordered by start,
+    selected by a NonOverlappingSelector.
+
+    >>> list(select_non_overlapping(
+    ...     [(0, 6, 1, "guinea"), (0, 16, 0, "papua new guinea"), (21, 27, 1, "guinea")],
+    ...     max_length=16,
+    ... ))
+    [(0, 16, 0, 'papua new guinea'), (21, 27, 1, 'guinea')]
+    """
+    selector = NonOverlappingSelector(max_length)
+    for match in matches:
+        yield from selector.add(match)
+    yield from selector.close()
+
+
+class NameOverlaps:
+    """
+    Collect, for each name found at least once without being part of a bigger
+    word, the sets of the other names overlapping each of its occurrences, so
+    that what removing names from the text would leave is known without the
+    text: an occurrence is gone once a name overlapping it is removed.
+
+    Occurrences are given ordered by end, and no longer than max_length.
+
+    >>> overlaps = NameOverlaps(max_length=7)
+    >>> overlaps.add(0, 5, "niger")
+    >>> overlaps.add(0, 7, "nigeria")
+    >>> overlaps.delimit(0, "nigeria")
+    >>> overlaps.add(8, 13, "niger")
+    >>> overlaps.delimit(8, "niger")
+    >>> overlaps.close()
+    >>> overlaps.by_name
+    {'nigeria': {frozenset({'niger'})}, 'niger': {frozenset()}}
+    >>> overlaps.left({"niger"})
+    []
+    """
+
+    def __init__(self, max_length):
+        self.max_length = max_length
+        # The distinct sets of names overlapping the occurrences of each name
+        self.by_name = {}
+        # [end, delimited, overlapping names] per (start, name) of the
+        # occurrences which may still be overlapped, ordered by end
+        self._pending = {}
+
+    def add(self, start, end, name):
+        """
+        Add an occurrence of name, delimited or not.
+        """
+        bound = end - self.max_length
+        pending = self._pending
+        while pending:
+            key = next(iter(pending))
+            if pending[key][0] > bound:
+                break
+            self._keep(key[1], pending.pop(key))
+        overlapping = set()
+        for (_, other), occurrence in pending.items():
+            if occurrence[0] > start and other != name:
+                occurrence[2].add(name)
+                overlapping.add(other)
+        pending[(start, name)] = [end, False, overlapping]
+
+    def delimit(self, start, name):
+        """
+        Tell that the occurrence of name at start is not part of a bigger word.
+        """
+        self._pending[(start, name)][1] = True
+
+    def close(self):
+        """
+        Tell that there are no more occurrences.
+        """
+        for (_, name), occurrence in self._pending.items():
+            self._keep(name, occurrence)
+        self._pending = {}
+
+    def _keep(self, name, occurrence):
+        _, delimited, overlapping = occurrence
+        if delimited:
+            self.by_name.setdefault(name, set()).add(frozenset(overlapping))
+
+    def left(self, removed):
+        """
+        Return the names of which an occurrence is left once every occurrence
+        of the removed names is removed from the text.
+        """
+        return [
+            name
+            for name, overlapping in self.by_name.items()
+            if name not in removed
+            and any(removed.isdisjoint(names) for names in overlapping)
+        ]
+
+
+class MentionFinder:
+    """
+    Find the non-overlapping mentions of names in safe texts, the longest
+    names being preferred, then the first given ones.
+
+    names maps each name to its language and code. Names without code are
+    never mentioned, but prevent the names they contain from being mentioned.
+
+    >>> finder = MentionFinder(
+    ...     {"guinea": ("en", "GN"), "papua new guinea": ("en", "PG")}
+    ... )
+    >>> list(finder.finditer("papua new guinea and guinea"))
+    [(0, 16, 'papua new guinea', 'en', 'PG'), (21, 27, 'guinea', 'en', 'GN')]
+    """
+
+    def __init__(self, names, automaton=None):
+        self.names = names
+        self.max_length = max(map(len, names), default=0)
+        self._ranks = {name: rank for rank, name in enumerate(names)}
+        self.automaton = Automaton(names) if automaton is None else automaton
+
+    def finditer(self, text, found=None):
+        """
+        Lazily yield (start, end, name, lang, code) for each mention in text.
+
+        When found is a set, every keyword found by the automaton is added
+        to it while going through the text.
+        """
+        for item in self.scan_chunks((text,), found):
+            if type(item) is tuple:
+                yield item
+
+    def scan_chunks(self, chunks, found=None, overlaps=None):
+        """
+        Lazily go through the safe text made of the given chunks, and yield
+        in order its mentions ((start, end, name, lang, code) tuples) and
+        the pieces of text between them (strings).
+
+        Only the end of the text which may still be part of a mention is kept,
+        so that texts of any size can be gone through.
+
+        When overlaps is a NameOverlaps, every occurrence of a name is added
+        to it while going through the text.
+
+        >>> finder = MentionFinder({"trinidad y tobago": ("es", "TT")})
+        >>> list(finder.scan_chunks(["a trinidad y", " tobago b"]))
+        ['a ', (2, 19, 'trinidad y tobago', 'es', 'TT'), ' b']
+        """
+        return _Scan(self, found, overlaps).run(chunks)
+
+    def name_overlaps(self, text):
+        """
+        Return the NameOverlaps of the names in the safe text.
+        """
+        names = self.names
+        overlaps = NameOverlaps(self.max_length)
+        for start, keyword in self.automaton.finditer(text):
+            if keyword in names:
+                end = start + len(keyword)
+                overlaps.add(start, end, keyword)
+                if is_delimited(text, start, end):
+                    overlaps.delimit(start, keyword)
+        overlaps.close()
+        return overlaps
+
+
+class _Scan:
+    """
+    State of a MentionFinder going through chunks of text.
+    """
+
+    def __init__(self, finder, found, overlaps=None):
+        self.finder = finder
+        self.found = found
+        self.overlaps = overlaps
+        self.selector = NonOverlappingSelector(finder.max_length)
+        # The end of the text, from text_start to text_end
+        self.text = ""
+        self.text_start = 0
+        self.text_end = 0
+        # The text before it has been yielded
+        self.emitted = 0
+        # Matches at the very end of the text, which may be followed
+        # by word characters in the next chunk
+        self.deferred = []
+
+    def read(self, chunks):
+        for chunk in chunks:
+            if chunk:
+                self.text += chunk
+                self.text_end += len(chunk)
+                yield chunk
+
+    def run(self, chunks):
+        names = self.finder.names
+        ranks = self.finder._ranks
+        selector = self.selector
+        overlaps = self.overlaps
+        for position, keyword in self.finder.automaton.finditer_chunks(
+            self.read(chunks)
+        ):
+            if self.deferred and self.deferred[0][1] < self.text_end:
+                yield from self.resolve_deferred()
+            if keyword is None:
+                # End of a chunk: go on with the next one, keeping only
+                # the text which may still be needed.
+                yield from self.emit(selector.advance(position))
+                yield from self.emit_text(selector.frontier)
+                self.trim(position - self.finder.max_length - 1)
+                continue
+            if self.found is not None:
+                self.found.add(keyword)
+            if keyword not in names:
+                continue
+            end = position + len(keyword)
+            match = (position, end, (-len(keyword), ranks[keyword]), keyword)
+            if overlaps is not None:
+                overlaps.add(position, end, keyword)
+            if end == self.text_end:
+                self.deferred.append(match)
+            elif self.is_delimited(match):
+                yield from self.add(match)
+        yield from self.resolve_deferred()
+        if overlaps is not None:
+            overlaps.close()
+        yield from self.emit(selector.close())
+        yield from self.emit_text(self.text_end)
+
+    def add(self, match):
+        """
+        Add a delimited match, and yield what is now known to be selected.
+        """
+        if self.overlaps is not None:
+            self.overlaps.delimit(match[0], match[3])
+        yield from self.emit(self.selector.add(match))
+
+    def is_delimited(self, match):
+        return is_delimited(
+            self.text, match[0] - self.text_start, match[1] - self.text_start
+        )
+
+    def resolve_deferred(self):
+        deferred, self.deferred = self.deferred, []
+        for match in deferred:
+            if self.is_delimited(match):
+                yield from self.add(match)
+
+    def emit(self, selected):
+        """
+        Yield the text before each selected mention, then the mention.
+        """
+        names = self.finder.names
+        for start, end, _, name in selected:
+            lang, code = names[name]
+            if code is None:
+                continue
+            yield from self.emit_text(start)
+            yield (start, end, name, lang, code)
+            self.emitted = end
+
+    def emit_text(self, position):
+        if position > self.emitted:
+            yield self.text[self.emitted - self.text_start : position - self.text_start]
+            self.emitted = position
+
+    def trim(self, position):
+        start = min(position, self.emitted)
+        if start > self.text_start:
+            self.text = self.text[start - self.text_start :]
+            self.text_start = start
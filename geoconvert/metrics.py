@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+Counters and latency histograms of the main address functions, by resolution
+path, for monitoring (disabled by default).
+
+The resolution path of a call is the stage which gave its result, as named by
+explain: "NUTS code", "country name (en)", "capital name (de)",
+"fr_dept_name_to_dept_code (FR)", "us_address_to_state_code"... or "miss"
+when nothing was found, "cache" for results taken from the result cache, and
+"unknown" when explain failed (the call itself still returns its result).
+
+Every call is counted, in counters of its own thread so that no lock is
+taken, but only a sample of them (sample_rate) is timed and has its path
+found, with explain, which costs about as much as the call itself: with the
+default sample rate of 0.01 (up to 0.05), the overhead stays within a few
+percent.
+"""
+
+import bisect
+import logging
+import random
+import threading
+import time
+import weakref
+from collections import Counter, namedtuple
+from itertools import accumulate
+
+from . import cache as _cache_module, convert
+from .trace import explain, resolution_path
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the latency histogram buckets (a last bucket
+# holds the slower calls)
+LATENCY_BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+)
+
+# The sampled calls of a function taking a resolution path: their number,
+# their total time in seconds, and their cumulative histogram, as
+# (upper bound, number of calls at most that long) pairs, the last upper bound
+# being infinite.
+PathStats = namedtuple("PathStats", ["count", "total_time", "buckets"])
+# The sample rate, the calls per function name, and the PathStats per
+# (function name, resolution path).
+MetricsSnapshot = namedtuple("MetricsSnapshot", ["sample_rate", "calls", "paths"])
+
+_missing = object()
+
+
+class Metrics:
+    """
+    Thread-safe counters and latency histograms of calls, by function and
+    resolution path.
+
+    >>> metrics = Metrics(buckets=(0.001, 0.01))
+    >>> metrics.record("address_to_country_code", "capital name (de)", 0.002)
+    >>> metrics.snapshot().paths
+    {('address_to_country_code', 'capital name (de)'): PathStats(count=1, total_time=0.002, buckets=((0.001, 0), (0.01, 1), (inf, 1)))}
+    """
+
+    def __init__(self, sample_rate=0.01, buckets=LATENCY_BUCKETS):
+        if not 0 < sample_rate <= 1:
+            raise ValueError("sample_rate must be greater than 0 and at most 1")
+        self.sample_rate = sample_rate
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # Calls per function name of each thread, only updated by the thread
+        # itself, with a weak reference to the thread; the calls of finished
+        # threads, added up; and the totals when last reset
+        self._local = threading.local()
+        self._thread_calls = []
+        self._finished_calls = Counter()
+        self._reset_calls = Counter()
+        # [count, total time, count per bucket] per (function name, path)
+        self._paths = {}
+
+    def observe(self, function, key, compute, text, **options):
+        """
+        Return compute(), the result of function(text, **options) cached
+        under key, counting the call and, when sampled, recording its
+        resolution path and how long it took.
+        """
+        name = function.__name__
+        try:
+            calls = self._local.calls
+        except AttributeError:
+            calls = self._local.calls = {}
+            thread = weakref.ref(threading.current_thread())
+            with self._lock:
+                # Pruned here too, so that threads which come and go are not
+                # kept forever when no snapshot is taken
+                self._prune_finished_threads()
+                self._thread_calls.append((thread, calls))
+        calls[name] = calls.get(name, 0) + 1
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return _cache_module.cached_call(key, compute)
+
+        cache = _cache_module._cache
+        start = time.perf_counter()
+        result = _missing if cache is None else cache.get(key, _missing)
+        if result is _missing:
+            result = compute()
+            elapsed = time.perf_counter() - start
+            if cache is not None:
+                cache.set(key, result)
+            path = _resolution_path(function, text, options)
+        else:
+            elapsed = time.perf_counter() - start
+            path = "cache"
+        self.record(name, path, elapsed)
+        return result
+
+    def record(self, name, path, elapsed):
+        """
+        Record a sampled call of the function named name, which took elapsed
+        seconds to resolve its text through path.
+        """
+        bucket = bisect.bisect_left(self.buckets, elapsed)
+        with self._lock:
+            stats = self._paths.get((name, path))
+            if stats is None:
+                stats = self._paths[(name, path)] = [
+                    0,
+                    0.0,
+                    [0] * (len(self.buckets) + 1),
+                ]
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2][bucket] += 1
+
+    def snapshot(self):
+        """
+        Return a MetricsSnapshot of the calls recorded so far.
+        """
+        with self._lock:
+            calls = self._total_calls() - self._reset_calls
+            paths = {
+                key: (count, total_time, list(counts))
+                for key, (count, total_time, counts) in self._paths.items()
+            }
+        bounds = self.buckets + (float("inf"),)
+        return MetricsSnapshot(
+            self.sample_rate,
+            dict(calls),
+            {
+                key: PathStats(
+                    count, total_time, tuple(zip(bounds, accumulate(counts)))
+                )
+                for key, (count, total_time, counts) in sorted(paths.items())
+            },
+        )
+
+    def reset(self):
+        """
+        Forget the calls recorded so far.
+        """
+        with self._lock:
+            self._reset_calls = self._total_calls()
+            self._paths.clear()
+
+    def _total_calls(self):
+        """
+        Return the calls per function name of all threads.
+        """
+        self._prune_finished_threads()
+        total = self._finished_calls.copy()
+        for _thread, calls in self._thread_calls:
+            # Copied at once, as its thread may be counting a call
+            total.update(dict(calls))
+        return total
+
+    def _prune_finished_threads(self):
+        """
+        Add the calls of the finished threads to the finished calls, and stop
+        keeping them one by one.
+        """
+        running = []
+        for thread, calls in self._thread_calls:
+            thread_object = thread()
+            if thread_object is not None and thread_object.is_alive():
+                running.append((thread, calls))
+            else:
+                # A finished thread no longer counts calls
+                self._finished_calls.update(calls)
+        self._thread_calls = running
+
+
+def _resolution_path(function, text, options):
+    # Monitoring must never break the call it observes
+    try:
+        return resolution_path(explain(function, text, **options))
+    except Exception:
+        logger.exception("cannot explain %s(%r)", function.__name__, text)
+        return "unknown"
+
+
+def enable_metrics(sample_rate=0.01, buckets=LATENCY_BUCKETS):
+    """
+    Count the calls of the main address functions and record the resolution
+    path and latency of a sample_rate share of them (1% by default), in
+    histograms with the given bucket upper bounds (in seconds).
+
+    Calling it again replaces the metrics with empty ones.
+    """
+    convert._metrics = Metrics(sample_rate, buckets)
+
+
+def disable_metrics():
+    """
+    Stop recording metrics and forget the recorded ones.
+    """
+    convert._metrics = None
+
+
+def metrics_snapshot():
+    """
+    Return a MetricsSnapshot of the calls recorded since metrics were enabled
+    or reset, or None when metrics are disabled.
+    """
+    metrics = convert._metrics
+    if metrics is not None:
+        return metrics.snapshot()
+
+
+def reset_metrics():
+    """
+    Forget the recorded calls, keeping metrics enabled.
+    """
+    metrics = convert._metrics
+    if metrics is not None:
+        metrics.reset()
+
+
+def export_metrics(prefix="geoconvert"):
+    """
+    Return the recorded metrics in the Prometheus text format, an empty
+    string when metrics are disabled: the calls counter per function, and
+    the latency histogram per function and resolution path of the sampled
+    calls.
+    """
+    snapshot = metrics_snapshot()
+    if snapshot is None:
+        return ""
+
+    lines = [
+        f"# HELP {prefix}_sample_rate Share of the calls timed by resolution path.",
+        f"# TYPE {prefix}_sample_rate gauge",
+        f"{prefix}_sample_rate {snapshot.sample_rate}",
+        f"# HELP {prefix}_calls_total Calls of the main address functions.",
+        f"# TYPE {prefix}_calls_total counter",
+    ]
+    for name, calls in sorted(snapshot.calls.items()):
+        lines.append(f"{prefix}_calls_total{_labels(function=name)} {calls}")
+    lines += [
+        f"# HELP {prefix}_resolution_seconds Latency of the sampled calls"
+        " by resolution path.",
+        f"# TYPE {prefix}_resolution_seconds histogram",
+    ]
+    for (name, path), stats in snapshot.paths.items():
+        for bound, count in stats.buckets:
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            labels = _labels(function=name, path=path, le=le)
+            lines.append(f"{prefix}_resolution_seconds_bucket{labels} {count}")
+        labels = _labels(function=name, path=path)
+        lines.append(f"{prefix}_resolution_seconds_sum{labels} {stats.total_time!r}")
+        lines.append(f"{prefix}_resolution_seconds_count{labels} {stats.count}")
+    return "\n".join(lines) + "\n"
+
+
+def _labels(**labels):
+    """
+    Return labels in the Prometheus format, their values escaped.
+    """
+    return (
+        "{"
+        + ",".join(
+            '{}="{}"'.format(
+                name,
+                value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+            )
+            for name, value in labels.items()
+        )
+        + "}"
+    )
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+pandas accessor resolving each distinct value of a Series only once.
+
+    >>> import pandas
+    >>> import geoconvert.pandas_accessor
+    >>> addresses = pandas.Series(["14467 Potsdam", "Kairo", "14467 Potsdam", None])
+    >>> addresses.geoconvert.country_and_subdivision()
+      country_code subdivision_code
+    0           DE               BB
+    1           EG              NaN
+    2           DE               BB
+    3          NaN              NaN
+"""
+
+try:
+    import numpy
+    import pandas
+except ImportError:
+    raise ImportError(
+        "pandas is needed for the geoconvert accessor: pip install geoconvert[pandas]"
+    ) from None
+
+from .convert import (
+    address_to_country_and_subdivision_codes,
+    address_to_country_code,
+    address_to_subdivision_code,
+)
+
+
+@pandas.api.extensions.register_series_accessor("geoconvert")
+class GeoconvertAccessor:
+    """
+    Series.geoconvert: the values of the Series are factorized, only the
+    distinct ones are resolved, and the results are scattered back as
+    categorical Series. Missing values give missing results.
+    """
+
+    def __init__(self, series):
+        self._series = series
+
+    def country_and_subdivision(self, lang=None, country=None, iso_format=False):
+        """
+        Return address_to_country_and_subdivision_codes for each value, as
+        a DataFrame with categorical country_code and subdivision_code columns
+        (or as a categorical iso_code Series with iso_format=True).
+        """
+        codes, results = self._resolve(
+            address_to_country_and_subdivision_codes,
+            lang=lang,
+            country=country,
+            iso_format=iso_format,
+        )
+        if iso_format:
+            return self._categorical(codes, results, "iso_code")
+        country_codes, subdivision_codes = zip(*results) if results else ((), ())
+        return pandas.concat(
+            [
+                self._categorical(codes, country_codes, "country_code"),
+                self._categorical(codes, subdivision_codes, "subdivision_code"),
+            ],
+            axis=1,
+        )
+
+    def country_code(self, lang=None):
+        """
+        Return address_to_country_code for each value, as a categorical Series.
+        """
+        codes, results = self._resolve(address_to_country_code, lang=lang)
+        return self._categorical(codes, results, "country_code")
+
+    def subdivision_code(self, country=None):
+        """
+        Return address_to_subdivision_code for each value,
+        as a categorical Series.
+        """
+        codes, results = self._resolve(address_to_subdivision_code, country=country)
+        return self._categorical(codes, results, "subdivision_code")
+
+    def _resolve(self, function, **options):
+        """
+        Return the index of each value among the distinct values (-1 for
+        missing values), and the result of function for each distinct value.
+        """
+        codes, uniques = pandas.factorize(self._series)
+        return codes, [function(str(value), **options) for value in uniques]
+
+    def _categorical(self, codes, results, name):
+        """
+        Return the categorical Series of the results of each value.
+        """
+        result_codes, categories = pandas.factorize(
+            numpy.array(results, dtype=object), sort=True
+        )
+        # Index -1 (missing values) takes the extra -1 (missing result)
+        value_codes = numpy.append(result_codes, -1)[codes]
+        return pandas.Series(
+            pandas.Categorical.from_codes(value_codes, categories),
+            index=self._series.index,
+            name=name,
+        )
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from . import data
+from .batch import batch
+from .convert import address_to_country_and_subdivision_codes, find_countries
+
+# Texts touching every lookup (NUTS codes, country, capital and subdivision
+# names, postcodes), so that a worker has built the gazetteers and automatons
+# (which are only built on first use) before its first task
+_WARM_UP_TEXTS = (
+    "DE2",
+    "Welcome to Cyprus, Kairo",
+    "Montréal, Québec H3T 1X6",
+    "1800 W Erie Ave, Lorain, OH 44052",
+    "Luz, 01120-010",
+    "Straße 3 53119 Bonn, Potsdam, Thüringen",
+    "2 rue de Paris, 44000 Nantes, Pays de la Loire, Loire-Atlantique",
+)
+
+
+def _warm_up():
+    data.load_all()
+    for text in _WARM_UP_TEXTS:
+        for country in (None, "BR", "CA", "DE", "FR", "US"):
+            address_to_country_and_subdivision_codes(text, country=country)
+        find_countries(text)
+
+
+def _resolve_chunk(function, texts, options):
+    return batch(function, texts, **options)
+
+
+class WorkerPool:
+    """
+    Pool of worker processes resolving batches of texts in parallel.
+
+    Workers are started once and warmed up (data loaded, regexes compiled)
+    before their first task, so the pool should be reused between batches.
+
+    Batches with fewer than min_parallel_size distinct texts are resolved in
+    the current process, as sending them to workers would cost more than
+    it saves.
+    """
+
+    def __init__(self, processes=None, min_parallel_size=1000, mp_context=None):
+        self.processes = processes or os.cpu_count() or 1
+        self.min_parallel_size = min_parallel_size
+        self._mp_context = mp_context
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=self._mp_context,
+                    initializer=_warm_up,
+                )
+            return self._executor
+
+    def chunk_size(self, distinct_count):
+        """
+        Give each worker a few chunks, so that they are kept busy until the end,
+        but big enough for the inter-process communication not to dominate.
+        """
+        return max(64, min(4096, distinct_count // (self.processes * 4) or 1))
+
+    def batch(self, function, texts, chunk_size=None, **options):
+        """
+        Return the list of function(text, **options) for each text, in the
+        same order, each distinct text being computed only once.
+
+        function must be importable by workers (a module-level function).
+        """
+        texts = list(texts)
+        distinct_texts = list(dict.fromkeys(texts))
+        if len(distinct_texts) < self.min_parallel_size:
+            return batch(function, texts, **options)
+
+        chunk_size = chunk_size or self.chunk_size(len(distinct_texts))
+        chunks = [
+            distinct_texts[start : start + chunk_size]
+            for start in range(0, len(distinct_texts), chunk_size)
+        ]
+        executor = self._get_executor()
+        futures = [
+            executor.submit(_resolve_chunk, function, chunk, options)
+            for chunk in chunks
+        ]
+        results = {}
+        for chunk, future in zip(chunks, futures):
+            results.update(zip(chunk, future.result()))
+        return [results[text] for text in texts]
+
+    def close(self):
+        """
+        Stop the workers. The pool starts new ones if used again.
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Shared pools by number of processes: a pool is never replaced, as other
+# threads may be using it
+_default_pools = {}
+_default_pools_lock = threading.Lock()
+
+
+def parallel_batch(function, texts, processes=None, chunk_size=None, **options):
+    """
+    Return the list of function(text, **options) for each text, like batch,
+    but using a shared pool of warm worker processes for big batches (one
+    per number of processes).
+
+    Pools are started on first use and stopped when the program exits
+    (or with close_parallel_pool).
+    """
+    processes = processes or os.cpu_count() or 1
+    with _default_pools_lock:
+        pool = _default_pools.get(processes)
+        if pool is None:
+            pool = _default_pools[processes] = WorkerPool(processes)
+    return pool.batch(function, texts, chunk_size=chunk_size, **options)
+
+
+def parallel_addresses_to_country_and_subdivision_codes(
+    texts, lang=None, country=None, iso_format=False, processes=None
+):
+    """
+    Return address_to_country_and_subdivision_codes for each text, in the
+    same order, using a pool of worker processes for big batches.
+    """
+    return parallel_batch(
+        address_to_country_and_subdivision_codes,
+        texts,
+        processes=processes,
+        lang=lang,
+        country=country,
+        iso_format=iso_format,
+    )
+
+
+@atexit.register
+def close_parallel_pool():
+    """
+    Stop the worker processes of the shared pools.
+    """
+    with _default_pools_lock:
+        pools = list(_default_pools.values())
+        _default_pools.clear()
+    for pool in pools:
+        pool.close()
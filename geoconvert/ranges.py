@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+from bisect import bisect_left
+
+
+class RangeTable:
+    """
+    Consecutive ranges of integers (like postcodes) and their codes, built
+    from upper bounds to codes: a value belongs to the first range, in the
+    given order, whose upper bound is not lower than the value.
+
+    Ranges are sorted once, so that looking a value up is a binary search.
+    A bound lower than a previous one can never be reached, and is dropped.
+
+    >>> table = RangeTable({199: "SP", 289: "RJ", 250: "XX", 299: "ES"})
+    >>> table.get(0), table.get(199), table.get(200), table.get(299)
+    ('SP', 'SP', 'RJ', 'ES')
+
+    Values above the last bound have no code:
+    >>> table.get(300)
+    """
+
+    __slots__ = ("bounds", "codes")
+
+    def __init__(self, upper_bound_to_code):
+        bounds = []
+        codes = []
+        for bound, code in upper_bound_to_code.items():
+            if not bounds or bound > bounds[-1]:
+                bounds.append(bound)
+                codes.append(code)
+        self.bounds = tuple(bounds)
+        self.codes = tuple(codes)
+
+    def get(self, value):
+        """
+        Return the code of the range of value, or None.
+        """
+        index = bisect_left(self.bounds, value)
+        if index < len(self.bounds):
+            return self.codes[index]
+
+    def get_many(self, values):
+        """
+        Return the NumPy array of the codes of the ranges of each value
+        (None when there is none), all computed in one call.
+
+        values is a NumPy array (or a sequence) of integers.
+        NumPy must be installed.
+        """
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError(
+                "NumPy is needed to look up many values at once: pip install numpy"
+            ) from None
+
+        indexes = numpy.searchsorted(self.bounds, values, side="left")
+        # Values above the last bound get the extra None
+        codes = numpy.array(self.codes + (None,), dtype=object)
+        return codes[indexes]
+
+
+class DenseTable:
+    """
+    Codes of all the integers from 0 to size - 1 (like five-digit postcodes),
+    stored as one byte per integer (the index of its code), so that looking
+    a value up is a single indexing.
+
+    >>> table = DenseTable(100)
+    >>> table.set(10, 20, "A")
+    >>> table.set(15, 16, "B")
+    >>> table.get(9), table.get(10), table.get(15), table.get(19), table.get(100)
+    (None, 'A', 'B', 'A', None)
+    """
+
+    __slots__ = ("indexes", "codes", "_code_to_index")
+
+    # An index is a byte, and the index 0 means no code
+    MAX_CODES = 255
+
+    def __init__(self, size):
+        self.indexes = bytearray(size)
+        self.codes = [None]
+        self._code_to_index = {None: 0}
+
+    def set(self, start, stop, code):
+        """
+        Set the code of the integers from start (included) to stop (excluded).
+        """
+        index = self._code_to_index.get(code)
+        if index is None:
+            if len(self.codes) > self.MAX_CODES:
+                raise ValueError(f"A DenseTable has at most {self.MAX_CODES} codes")
+            index = self._code_to_index[code] = len(self.codes)
+            self.codes.append(code)
+        self.indexes[start:stop] = bytes((index,)) * (stop - start)
+
+    def get(self, value):
+        """
+        Return the code of value, or None.
+        """
+        if 0 <= value < len(self.indexes):
+            return self.codes[self.indexes[value]]
+
+    def get_many(self, values):
+        """
+        Return the NumPy array of the codes of each value (None when there is
+        none), all computed in one call.
+
+        values is a NumPy array (or a sequence) of integers.
+        NumPy must be installed.
+        """
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError(
+                "NumPy is needed to look up many values at once: pip install numpy"
+            ) from None
+
+        values = numpy.asarray(values)
+        indexes = numpy.zeros(values.shape, dtype=numpy.uint8)
+        known = (values >= 0) & (values < len(self.indexes))
+        indexes[known] = numpy.frombuffer(self.indexes, dtype=numpy.uint8)[
+            values[known]
+        ]
+        return numpy.array(self.codes, dtype=object)[indexes]
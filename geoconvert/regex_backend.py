@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Regex engines searching the big alternations of geoconvert.data (names and
+codes of subdivisions) for the lookups: the standard re module, RE2, a
+linear-time engine which is much faster on long alternations
+(pip install geoconvert[re2]), or the regex module
+(pip install geoconvert[regex]). The lookups search the *_backend_regex
+versions of these regexes, the *_regex ones staying re.Pattern objects.
+
+The backend is chosen with the GEOCONVERT_REGEX_BACKEND environment variable
+when geoconvert is imported, or with set_regex_backend. "auto", the default,
+uses RE2 when it is installed, re otherwise.
+
+Every backend finds the same matches: RE2 only knows ASCII word boundaries,
+word characters and spaces (not "\\v"), so texts which are not ASCII are still
+searched with re. Texts are mostly normalized by safe_string beforehand, which
+makes them ASCII.
+"""
+
+import os
+import re
+from importlib import import_module
+from importlib.util import find_spec
+
+BACKENDS = ("re", "re2", "regex")
+
+# Shorter texts are searched with re even with the RE2 backend: the cost of
+# calling RE2 from Python outweighs its faster search on them
+RE2_MIN_LENGTH = 20
+
+
+def _compile_re(pattern, flags):
+    return re.compile(pattern, flags)
+
+
+def _compile_re2(pattern, flags):
+    re2 = import_module("re2")
+    options = re2.Options()
+    options.case_sensitive = not flags & re.I
+    return re2.compile(pattern, options)
+
+
+def _compile_regex(pattern, flags):
+    regex = import_module("regex")
+    return regex.compile(pattern, flags & re.I and regex.I)
+
+
+_compilers = {"re": _compile_re, "re2": _compile_re2, "regex": _compile_regex}
+
+
+def available_regex_backends():
+    """
+    Return the backends which can be used, re being always available.
+    """
+    return [backend for backend in BACKENDS if backend == "re" or find_spec(backend)]
+
+
+def _resolve(backend):
+    if backend == "auto":
+        return "re2" if find_spec("re2") else "re"
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"regex backend must be 'auto' or one of {', '.join(BACKENDS)}, "
+            f"not {backend!r}"
+        )
+    if backend != "re" and not find_spec(backend):
+        raise ImportError(
+            f"the {backend!r} regex backend needs {backend}:"
+            f" pip install geoconvert[{backend}]"
+        )
+    return backend
+
+
+# The backend in use, resolved on first search
+_requested_backend = os.environ.get("GEOCONVERT_REGEX_BACKEND", "auto")
+_backend = None
+
+
+def set_regex_backend(backend="auto"):
+    """
+    Search the big alternations of geoconvert.data with backend: "re", "re2",
+    "regex", or "auto" for RE2 when it is installed, re otherwise.
+
+    Raise ImportError when the backend is not installed.
+
+    >>> previous_backend = get_regex_backend()
+    >>> set_regex_backend("re")
+    >>> get_regex_backend()
+    're'
+    >>> set_regex_backend(previous_backend)
+    """
+    global _requested_backend, _backend
+    _backend = _resolve(backend)
+    _requested_backend = backend
+
+
+def get_regex_backend():
+    """
+    Return the backend in use: "re", "re2" or "regex".
+    """
+    global _backend
+    if _backend is None:
+        _backend = _resolve(_requested_backend)
+    return _backend
+
+
+class BackendRegex:
+    """
+    Regex searched with the backend in use, compiled by each backend on
+    first use. Anything else than search (sub, finditer, pattern...) is
+    done with re.
+
+    >>> regex = BackendRegex(r"\\b(?P<name>bonn|berlin)\\b", re.I)
+    >>> regex.search("Welcome to Berlin").group("name")
+    'Berlin'
+    >>> regex.sub("B.", "Bonn")
+    'B.'
+    """
+
+    __slots__ = ("pattern", "flags", "_compiled")
+
+    def __init__(self, pattern, flags=0):
+        self.pattern = pattern
+        self.flags = flags
+        self._compiled = {}
+
+    def _compile(self, backend):
+        try:
+            return self._compiled[backend]
+        except KeyError:
+            pass
+        # Threads may compile the same regex at the same time: one is kept
+        compiled = self._compiled[backend] = _compilers[backend](
+            self.pattern, self.flags
+        )
+        return compiled
+
+    def search(self, text):
+        """
+        Return the first match in text, or None.
+        """
+        backend = _backend or get_regex_backend()
+        if backend == "re2" and not (
+            len(text) >= RE2_MIN_LENGTH and text.isascii() and "\v" not in text
+        ):
+            backend = "re"
+        return self._compile(backend).search(text)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._compile("re"), name)
+
+    def __repr__(self):
+        return f"<BackendRegex {self.pattern[:40]!r}...>"
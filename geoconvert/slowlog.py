@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+Record the calls of the main address functions going over a time threshold
+(disabled by default), to find the inputs behind the slowest calls.
+
+Calls are timed when their result is computed (results taken from the result
+cache are not). Only the calls over the threshold are explained, to tell
+their resolution path and slowest stage, which costs about as much as the call
+itself again: not in the thread of the call, but when the log is read, or in
+a background thread passing them to the callback. Failures to explain them,
+or of the callback, are logged, and never break the calls.
+
+Memory stays bounded whatever the calls: only max_text_length characters of
+each text are kept, and the calls waiting for the callback are kept in a
+queue of at most maxlen calls, the oldest ones being dropped (and counted)
+when the callback cannot keep up.
+"""
+
+import logging
+import threading
+import time
+from collections import deque, namedtuple
+
+from . import convert
+from .trace import explain, resolution_path
+from .utils import address_window
+
+logger = logging.getLogger(__name__)
+
+# A call over the threshold: the function name, the text (truncated to
+# max_text_length characters) and its length, the other arguments, the
+# resolution path of the result and the stage which took the longest, as
+# named by explain ("unknown" and None when explain failed), how long the call
+# took in seconds, and when it ended (time.time()). Longer texts are explained
+# from their most address-like max_text_length characters (see
+# utils.address_window).
+SlowCall = namedtuple(
+    "SlowCall",
+    [
+        "function",
+        "text",
+        "length",
+        "options",
+        "path",
+        "slowest_stage",
+        "elapsed",
+        "timestamp",
+    ],
+)
+
+
+class SlowCallLog:
+    """
+    Thread-safe log of the last maxlen calls over threshold seconds, each one
+    passed to callback (when given) from a background thread once explained.
+    When more than maxlen calls wait for the callback, the oldest ones are
+    not passed to it, and counted in dropped_calls.
+
+    >>> log = SlowCallLog(threshold=0, maxlen=2)
+    >>> compute = log.watch(convert.address_to_country_code, lambda: "EG", "Kairo", {})
+    >>> compute()
+    'EG'
+    >>> [(call.function, call.text, call.path) for call in log.calls()]
+    [('address_to_country_code', 'Kairo', 'capital name (de)')]
+    """
+
+    def __init__(self, threshold=0.01, maxlen=100, callback=None, max_text_length=200):
+        if threshold < 0:
+            raise ValueError("threshold must be positive or zero")
+        self.threshold = threshold
+        self.callback = callback
+        self.max_text_length = max_text_length
+        self.dropped_calls = 0
+        self._calls = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        # The calls waiting for the callback, and the thread passing them to it
+        self._pending = deque(maxlen=maxlen)
+        self._pending_added = threading.Condition(self._lock)
+        self._closed = False
+        self._worker = None
+        if callback is not None:
+            self._worker = threading.Thread(
+                target=self._call_back_pending, name="geoconvert-slow-log", daemon=True
+            )
+            self._worker.start()
+
+    def watch(self, function, compute, text, options):
+        """
+        Return a function calling compute(), the result of
+        function(text, **options), and recording the call when it takes
+        longer than the threshold.
+        """
+
+        def timed_compute():
+            start = time.perf_counter()
+            result = compute()
+            elapsed = time.perf_counter() - start
+            if elapsed > self.threshold:
+                self.record(function, text, options, elapsed)
+            return result
+
+        return timed_compute
+
+    def record(self, function, text, options, elapsed):
+        """
+        Record the call function(text, **options), which took elapsed seconds,
+        to be explained later.
+        """
+        call = _UnexplainedCall(
+            function, text, options, elapsed, time.time(), self.max_text_length
+        )
+        with self._lock:
+            self._calls.append(call)
+            if self._worker is not None and not self._closed:
+                if len(self._pending) == self._pending.maxlen:
+                    self.dropped_calls += 1
+                self._pending.append(call)
+                self._pending_added.notify()
+
+    def _call_back_pending(self):
+        """
+        Pass the pending calls to the callback, until the log is closed and
+        none is left.
+        """
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._pending_added.wait()
+                if not self._pending:
+                    return
+                call = self._pending.popleft()
+            call = call.explained()
+            try:
+                self.callback(call)
+            except Exception:
+                logger.exception("slow call callback failed on %r", call)
+
+    def calls(self):
+        """
+        Return the recorded calls, oldest first, explaining the ones which
+        were not yet.
+        """
+        with self._lock:
+            calls = list(self._calls)
+        return [call.explained() for call in calls]
+
+    def clear(self):
+        """
+        Forget the recorded calls.
+        """
+        with self._lock:
+            self._calls.clear()
+
+    def close(self):
+        """
+        Wait until the callback was given the recorded calls, and stop passing
+        it the next ones.
+        """
+        with self._lock:
+            self._closed = True
+            self._pending_added.notify()
+        if self._worker is not None:
+            self._worker.join()
+
+
+class _UnexplainedCall:
+    """
+    A call over the threshold, explained the first time it is needed.
+    """
+
+    def __init__(self, function, text, options, elapsed, timestamp, max_text_length):
+        self.function = function
+        if max_text_length is None:
+            self.text = self.explained_text = text
+        else:
+            self.text = str(text)[:max_text_length]
+            self.explained_text = address_window(text, max_text_length)
+        self.length = len(text)
+        self.options = options
+        self.elapsed = elapsed
+        self.timestamp = timestamp
+        self.call = None
+
+    def explained(self):
+        """
+        Return the SlowCall, explaining it when not done yet. Two threads may
+        both explain it, to the same result.
+        """
+        # The text is only forgotten once the SlowCall is known
+        text = self.explained_text
+        if self.call is None:
+            self.call = self._explain(text)
+            self.explained_text = None
+        return self.call
+
+    def _explain(self, text):
+        function, options = self.function, self.options
+        try:
+            explanation = explain(function, text, **options)
+        except Exception:
+            logger.exception("cannot explain %s(%r)", function.__name__, text)
+            path, slowest_stage = "unknown", None
+        else:
+            path = resolution_path(explanation)
+            slowest_stage = max(
+                explanation.stages, key=lambda stage: stage.elapsed, default=None
+            )
+        return SlowCall(
+            function.__name__,
+            str(self.text),
+            self.length,
+            options,
+            path,
+            slowest_stage and slowest_stage.name,
+            self.elapsed,
+            self.timestamp,
+        )
+
+
+def enable_slow_log(threshold=0.01, maxlen=100, callback=None, max_text_length=200):
+    """
+    Record the last maxlen calls of the main address functions which take
+    longer than threshold seconds, passing each one to callback(slow_call)
+    when given, for instance to log it.
+
+    Calling it again replaces the log with an empty one.
+    """
+    disable_slow_log()
+    convert._slow_log = SlowCallLog(threshold, maxlen, callback, max_text_length)
+
+
+def disable_slow_log():
+    """
+    Stop recording slow calls, wait until the callback was given the recorded
+    ones, and forget them.
+    """
+    log, convert._slow_log = convert._slow_log, None
+    if log is not None:
+        log.close()
+
+
+def slow_calls():
+    """
+    Return the recorded SlowCalls, oldest first, or None when the slow call
+    log is disabled.
+    """
+    log = convert._slow_log
+    if log is not None:
+        return log.calls()
+
+
+def dropped_slow_calls():
+    """
+    Return the number of slow calls which were not passed to the callback
+    because it could not keep up, or None when the slow call log is disabled.
+    """
+    log = convert._slow_log
+    if log is not None:
+        return log.dropped_calls
+
+
+def clear_slow_calls():
+    """
+    Forget the recorded slow calls, keeping the log enabled.
+    """
+    log = convert._slow_log
+    if log is not None:
+        log.clear()
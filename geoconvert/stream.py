@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+import codecs
+import re
+
+from . import data
+from .convert import (
+    _select_country_names,
+    country_to_safe_subdivision_lookup_function,
+    get_country_mention_finder,
+    safe_subdivision_lookup_condition,
+)
+from .mentions import CountryMention, NameOverlaps
+from .utils import SafeText, iter_safe_chunks, iter_squeezed_chunks
+
+CHUNK_SIZE = 1 << 16
+# What remains of the text once country names are removed is looked through
+# for subdivisions by windows of WINDOW_SIZE characters, overlapping by at
+# least WINDOW_OVERLAP characters, which is more than any postcode or
+# subdivision name.
+WINDOW_SIZE = 1 << 16
+WINDOW_OVERLAP = 256
+
+# Mentions are masked between two private use characters, with another one
+# instead of their spaces, to stay whole words in windows.
+_MASK = "\ue000"
+_MASKED_SPACE = "\ue001"
+_masked_name_re = re.compile(f" ?{_MASK}([^{_MASK}]*){_MASK}")
+_country_code_re = re.compile(r"\b([A-Z]{2})\b")
+_last_word_re = re.compile(r"\w*\Z")
+
+
+def iter_text_chunks(source, chunk_size=CHUNK_SIZE):
+    """
+    Lazily yield the text of source by chunks.
+
+    source may be a text, an iterable of texts, a file object opened in text
+    or binary mode, or a memory-mapped file, which is read chunk_size
+    characters (or bytes) at a time. Bytes are decoded as UTF-8, even when
+    a character is split between two chunks.
+
+    >>> list(iter_text_chunks([b"C\\xc3", b"\\xb4te d", "’Ivoire"]))
+    ['C', 'ôte d', '’Ivoire']
+    """
+    if isinstance(source, (str, bytes)):
+        source = (source,)
+    elif hasattr(source, "read"):
+        source = _read_chunks(source, chunk_size)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for chunk in source:
+        if not isinstance(chunk, str):
+            chunk = decoder.decode(chunk)
+        yield chunk
+    decoder.decode(b"", final=True)
+
+
+def _read_chunks(file, chunk_size):
+    while chunk := file.read(chunk_size):
+        yield chunk
+
+
+def iter_country_mentions(source, lang=None, chunk_size=CHUNK_SIZE):
+    """
+    Lazily yield the country and capital names mentioned in source, like
+    find_country_mentions, reading it by chunks (see iter_text_chunks) so
+    that texts of any size can be gone through with little memory.
+
+    Names are found even when they are split between two chunks:
+    >>> for mention in iter_country_mentions(["Trinidad y To", "bago & Kairo"]):
+    ...     print(mention.country_code, mention.name)
+    TT trinidad y tobago
+    EG kairo
+    """
+    finder = get_country_mention_finder(lang and lang.lower())
+    safe_chunks = iter_safe_chunks(iter_text_chunks(source, chunk_size))
+    for item in finder.scan_chunks(safe_chunks):
+        if type(item) is tuple:
+            _, _, name, name_lang, code = item
+            yield CountryMention(code, name, name_lang, None, None)
+
+
+def find_countries_in_stream(
+    source, lang=None, enable_ambiguous_detection=False, chunk_size=CHUNK_SIZE
+):
+    """
+    Detect countries from source, like find_countries, reading it by chunks
+    (see iter_text_chunks) so that texts of any size can be gone through
+    with little memory.
+
+    >>> import io
+    >>> file = io.StringIO("Bienvenue à Kinshasa. " * 10000 + "Welcome to Cyprus")
+    >>> find_countries_in_stream(file, chunk_size=1000)
+    ['CD', 'CY']
+
+    Names are found like find_countries does, languages one after the other
+    ("Port of Spain" is ES), but from what was found in a single scan. The
+    subdivisions used to guess a country when none is named are looked for
+    in windows of WINDOW_SIZE characters of the text, one after the other,
+    without the country and capital names mentioned.
+    """
+    text_chunks = iter_text_chunks(source, chunk_size)
+    codes = set()
+    if enable_ambiguous_detection:
+        text_chunks = _find_country_codes(text_chunks, codes)
+    finder = get_country_mention_finder(lang and lang.lower())
+    found = set()
+    overlaps = NameOverlaps(finder.max_length)
+    remaining_chunks = iter_squeezed_chunks(
+        _remaining_text(
+            finder.scan_chunks(iter_safe_chunks(text_chunks), found, overlaps)
+        )
+    )
+    index, indexes_by_name = _guess_subdivision_lookup(
+        _iter_windows(remaining_chunks, WINDOW_SIZE, WINDOW_OVERLAP), found
+    )
+    selected = _select_country_names(overlaps, lang)
+    countries = {code for _, code in selected}
+    # The names find_countries removes nothing from stay in the text it
+    # looks through for subdivisions
+    removed = {name for name, _ in selected}
+    indexes = [
+        i
+        for name, i in indexes_by_name.items()
+        if removed.isdisjoint(finder.name_overlaps(name).by_name)
+    ]
+    if index is not None:
+        indexes.append(index)
+    if indexes:
+        countries.add(country_to_safe_subdivision_lookup_function[min(indexes)][0])
+    countries.update(codes)
+    return sorted(countries)
+
+
+def _remaining_text(scanned):
+    """
+    Yield the text scanned by a MentionFinder, each mention being masked
+    (see _unmasked_text) so that it can be left out or kept later.
+    """
+    for item in scanned:
+        if type(item) is tuple:
+            yield f" {_MASK}{item[2].replace(' ', _MASKED_SPACE)}{_MASK} "
+        else:
+            yield item
+
+
+def _unmasked_text(text, kept=()):
+    """
+    Return text without its masked mentions, except those of the kept names.
+
+    >>> mention = (2, 10, "new york", "en", None)
+    >>> text = "".join(iter_squeezed_chunks(_remaining_text(["a ", mention, " b"])))
+    >>> _unmasked_text(text), _unmasked_text(text, {"new york"})
+    ('a b', 'a new york b')
+    """
+
+    def unmask(match):
+        name = match[1].replace(_MASKED_SPACE, " ")
+        return f" {name}" if name in kept else ""
+
+    return _masked_name_re.sub(unmask, text)
+
+
+def _find_country_codes(text_chunks, codes):
+    """
+    Yield text_chunks, and add the country codes written in capital letters
+    in them to codes, like find_countries with enable_ambiguous_detection.
+    """
+    rest = ""
+    for chunk in text_chunks:
+        yield chunk
+        text = rest + chunk
+        # The last word may go on in the next chunk. Only its last three
+        # characters are searched: searching the whole text would retry from
+        # every character of a long word
+        end = _last_word_re.search(text, max(len(text) - 3, 0)).start()
+        if len(text) - end > 2:
+            # Too long for a code: only keep that a word goes on
+            codes.update(_country_codes(text))
+            rest = "_"
+        else:
+            codes.update(_country_codes(text[:end]))
+            rest = text[end:]
+    codes.update(_country_codes(rest))
+
+
+def _country_codes(text):
+    return (
+        code
+        for code in _country_code_re.findall(text)
+        if code in data.ALL_COUNTRY_CODES
+    )
+
+
+def _iter_windows(safe_chunks, size, overlap):
+    """
+    Lazily yield windows of the safe text made of safe_chunks, made of whole
+    words, of about size characters, each one starting at least overlap
+    characters before the end of the previous one.
+    """
+    window = ""
+    for chunk in safe_chunks:
+        window += chunk
+        while len(window) >= size:
+            end = window.rfind(" ")
+            if end <= overlap:
+                # A single word would be longer than the window
+                end = len(window)
+            yield window[:end]
+            start = window.rfind(" ", 0, end - overlap) + 1 or end - overlap
+            window = window[start:]
+    yield window
+
+
+def _guess_subdivision_lookup(windows, found):
+    """
+    Look for subdivisions in each window of the text with masked mentions
+    (see _remaining_text), like _guess_subdivision_then_country_codes on the
+    whole text once find_countries removed the names it found.
+
+    Return the index in country_to_safe_subdivision_lookup_function of the
+    first lookup finding something without any of the mentions (or None),
+    and by name, the index of the first lookup finding something before it
+    when only the mentions of that name are kept.
+    """
+    lookups = country_to_safe_subdivision_lookup_function
+    found_index = None
+    indexes_by_name = {}
+    for window in windows:
+        index = _first_lookup(_unmasked_text(window), found, lookups)
+        if index is not None:
+            lookups = lookups[:index]
+            found_index = index
+        # The names find_countries does not remove are known at the end only
+        names = {
+            match.replace(_MASKED_SPACE, " ")
+            for match in _masked_name_re.findall(window)
+        }
+        if (
+            not names
+            or _first_lookup(_unmasked_text(window, names), found, lookups) is None
+        ):
+            continue
+        for name in names:
+            index = _first_lookup(_unmasked_text(window, {name}), found, lookups)
+            if index is not None and index < indexes_by_name.get(name, len(lookups)):
+                indexes_by_name[name] = index
+    return found_index, indexes_by_name
+
+
+def _first_lookup(text, found, lookups):
+    """
+    Return the index of the first of lookups finding a subdivision in text,
+    or None.
+    """
+    text = SafeText(text)
+    for index, (_, lookup_function) in enumerate(lookups):
+        condition = safe_subdivision_lookup_condition[lookup_function]
+        if condition(text, text, found) and lookup_function(text):
+            return index
+    return None
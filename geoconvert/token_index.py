@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+import re
+
+
+class TokenIndex:
+    """
+    Codes (like NUTS codes) to find in texts as whole words, whatever their
+    case. Only the words which have the length of a code are looked up in a
+    set, so that finding a code costs the same however many codes there are.
+
+    >>> index = TokenIndex(["DE1", "DE11", "FR101"])
+    >>> index.find("Regions fr101 and DE1")
+    'FR101'
+    >>> index.find("DE111 or xDE11")
+    """
+
+    __slots__ = ("codes", "_word_regex")
+
+    def __init__(self, codes):
+        self.codes = frozenset(code.upper() for code in codes)
+        lengths = [len(code) for code in self.codes]
+        # A code is a whole word, like with rf"\b{code}\b"
+        self._word_regex = (
+            re.compile(rf"\b\w{{{min(lengths)},{max(lengths)}}}\b") if lengths else None
+        )
+
+    def find(self, text):
+        """
+        Return the first code found in text (upper-cased), or None.
+        """
+        if self._word_regex is None:
+            return None
+        for match in self._word_regex.finditer(text):
+            word = match.group().upper()
+            if word in self.codes:
+                return word
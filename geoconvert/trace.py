@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+Explain how the main address functions come to their result.
+
+explain runs the hidden functions of convert behind the function it
+explains, with stages which time and record each lookup they go through.
+"""
+
+import re
+import time
+from collections import namedtuple
+
+from . import data
+from .convert import (
+    _address_to_country_and_subdivision_codes,
+    _address_to_found_text_and_country_code,
+    _address_to_subdivision_code,
+    _format_country_and_subdivision_codes,
+    _fr_dept_name_text,
+    _guarded_text,
+    _Stages,
+    address_to_country_and_subdivision_codes,
+    address_to_country_code,
+    address_to_subdivision_code,
+    br_postcode_to_state_code,
+    br_state_code_to_state_code,
+    br_state_name_to_state_code,
+    ca_postcode_to_province_code,
+    ca_province_code_to_province_code,
+    ca_province_name_to_province_code,
+    de_hauptstadt_to_land_code,
+    de_land_code_to_land_code,
+    de_land_name_to_land_code,
+    de_postcode_to_land_code,
+    fr_dept_name_to_dept_code,
+    fr_postcode_to_dept_code,
+    fr_region_name_to_dept_code,
+    get_address_automaton,
+    us_postcode_to_state_code,
+    us_state_code_to_state_code,
+    us_state_name_to_state_code,
+)
+from .utils import LookupText, safe_string, safe_string_with_offsets
+
+# A stage attempted to resolve a text: its name, the code it gave (or None),
+# the name or code it matched and its (start, end) span in the text when
+# known, and how long the stage took in seconds (without the stages it went
+# through, recorded after it).
+Stage = namedtuple("Stage", ["name", "result", "matched", "span", "elapsed"])
+Explanation = namedtuple("Explanation", ["result", "stages", "elapsed"])
+
+# What the subdivision lookups and their steps match: the regex they use,
+# its group, and whether they look into the safe text (or the text itself)
+_lookup_regexes = {
+    br_postcode_to_state_code: ("br_postcode_regex", 0, False),
+    br_state_name_to_state_code: ("br_state_name_regex", "state", True),
+    br_state_code_to_state_code: ("br_state_code_regex", "code", False),
+    ca_postcode_to_province_code: ("ca_postcode_regex", "postcode", True),
+    ca_province_name_to_province_code: ("ca_province_name_regex", "province", True),
+    ca_province_code_to_province_code: ("ca_province_code_regex", "code", False),
+    fr_postcode_to_dept_code: ("fr_postcode_regex", "postcode", False),
+    fr_region_name_to_dept_code: ("fr_region_name_regex", "region", True),
+    fr_dept_name_to_dept_code: ("fr_department_name_regex", "dept", True),
+    de_hauptstadt_to_land_code: ("de_land_hauptstadt_regex", "hauptstadt", True),
+    de_land_name_to_land_code: ("de_land_name_regex", "land", True),
+    de_postcode_to_land_code: ("de_postcode_regex", "postcode", False),
+    de_land_code_to_land_code: ("de_land_code_regex", "code", False),
+    us_postcode_to_state_code: ("us_postcode_regex", 0, True),
+    us_state_name_to_state_code: ("us_state_name_regex", "state", True),
+    us_state_code_to_state_code: ("us_state_code_regex", "code", False),
+}
+
+
+def explain(function, text, **options):
+    """
+    Return the result of function(text, **options), function being
+    address_to_country_code, address_to_subdivision_code or
+    address_to_country_and_subdivision_codes, along with the stages
+    attempted to get it, in order. The result cache is not used.
+
+    >>> explanation = explain(address_to_country_and_subdivision_codes, "14467 Potsdam")
+    >>> explanation.result
+    ('DE', 'BB')
+    >>> for stage in explanation.stages:
+    ...     if stage.result:
+    ...         print(stage.name, stage.result, stage.matched, stage.span)
+    de_hauptstadt_to_land_code (DE) BB potsdam (6, 13)
+    de_address_to_land_code BB potsdam (6, 13)
+    de_hauptstadt_to_land_code (DE) BB potsdam (6, 13)
+    """
+    try:
+        explained_function = _explained_functions[function]
+    except KeyError:
+        raise ValueError(f"{function!r} cannot be explained") from None
+    trace = _Trace(_guarded_text(text))
+    start = time.perf_counter()
+    result = explained_function(trace, **options)
+    return Explanation(result, trace.stages, time.perf_counter() - start)
+
+
+def resolution_path(explanation):
+    """
+    Return the name of the first stage of explanation which gave a code,
+    or "miss" when nothing was found.
+
+    >>> resolution_path(explain(address_to_country_code, "Kairo"))
+    'capital name (de)'
+    >>> resolution_path(explain(address_to_subdivision_code, "Wonderland"))
+    'miss'
+    """
+    if explanation.result in (None, (None, None)):
+        return "miss"
+    return next(stage.name for stage in explanation.stages if stage.result)
+
+
+class _Trace(_Stages):
+    """
+    The stages attempted to resolve a text, timed and recorded as the hidden
+    functions of convert go through them.
+    """
+
+    def __init__(self, text):
+        self.text = LookupText.wrap(text)
+        self.stages = []
+
+    def scan(self, text):
+        result, elapsed = _timed(super().scan, text)
+        self.stages.append(Stage("scan names", None, None, None, elapsed))
+        return result
+
+    def find_name(self, kind, lang, gazetteer, safe_text, delimited):
+        (name, country_code), elapsed = _timed(
+            super().find_name, kind, lang, gazetteer, safe_text, delimited
+        )
+        stage = Stage(f"{kind} ({lang})", country_code, None, None, elapsed)
+        if country_code:
+            stage = stage._replace(
+                matched=name, span=self._safe_name_span(safe_text, name)
+            )
+        self.stages.append(stage)
+        return (name, country_code)
+
+    def find_nuts_code(self, text, country=None):
+        nuts_code, elapsed = _timed(super().find_nuts_code, text, country)
+        name = "NUTS code" if country is None else f"NUTS code ({country})"
+        stage = Stage(name, nuts_code, None, None, elapsed)
+        if nuts_code is not None:
+            match = re.search(rf"\b{nuts_code}\b", text, re.I)
+            stage = stage._replace(matched=match.group(), span=match.span())
+        self.stages.append(stage)
+        return nuts_code
+
+    def lookup_subdivision(self, function, text):
+        index = len(self.stages)
+        subdivision_code, elapsed = _timed(super().lookup_subdivision, function, text)
+        steps = self.stages[index:]
+        stage = Stage(
+            function.__name__,
+            subdivision_code,
+            None,
+            None,
+            elapsed - sum(step.elapsed for step in steps),
+        )
+        if subdivision_code:
+            # The last step gave the code
+            stage = stage._replace(matched=steps[-1].matched, span=steps[-1].span)
+        self.stages.insert(index, stage)
+        return subdivision_code
+
+    def lookup_subdivision_step(self, country_code, function, text):
+        subdivision_code, elapsed = _timed(
+            super().lookup_subdivision_step, country_code, function, text
+        )
+        self._add_lookup_stage(
+            country_code, function, safe_string(text), subdivision_code, elapsed
+        )
+        return subdivision_code
+
+    def lookup_safe_subdivision(self, country_code, function, text, safe_text):
+        subdivision_code, elapsed = _timed(
+            super().lookup_safe_subdivision, country_code, function, text, safe_text
+        )
+        self._add_lookup_stage(
+            country_code, function, safe_text, subdivision_code, elapsed
+        )
+        return subdivision_code
+
+    def _add_lookup_stage(
+        self, country_code, function, safe_text, subdivision_code, elapsed
+    ):
+        stage = Stage(
+            f"{function.__name__} ({country_code})",
+            subdivision_code,
+            None,
+            None,
+            elapsed,
+        )
+        if subdivision_code:
+            matched, span = self._lookup_match(safe_text, function)
+            stage = stage._replace(matched=matched, span=span)
+        self.stages.append(stage)
+
+    def _safe_span(self, start, end):
+        """
+        Return the span in the text of a span of its safe version.
+        """
+        offsets = safe_string_with_offsets(self.text)[1]
+        return (offsets[start], offsets[end - 1] + 1)
+
+    def _safe_name_span(self, safe_text, name):
+        """
+        Return the span in the text of the first occurrence of a name
+        found in its safe version as a whole word.
+        """
+        start = next(
+            start
+            for start, keyword in get_address_automaton().finditer_delimited(safe_text)
+            if keyword == name
+        )
+        return self._safe_span(start, start + len(name))
+
+    def _lookup_match(self, safe_text, function):
+        """
+        Return what a subdivision lookup matched in the text, and where.
+        """
+        regex_name, group, in_safe_text = _lookup_regexes[function]
+        if function is fr_dept_name_to_dept_code:
+            # Department names are looked for in the same cleaned text
+            subject = _fr_dept_name_text(self.text)
+        else:
+            subject = safe_text if in_safe_text else self.text
+        # The regex matches whenever the lookup finds something
+        match = getattr(data, regex_name).search(subject)
+        start, end = match.span(group)
+        matched = match.group(group)
+        if not in_safe_text:
+            return (matched, (start, end))
+        if function is fr_dept_name_to_dept_code:
+            # Street and town names removed from the text shift the name
+            match = re.search(rf"\b{re.escape(matched)}\b", safe_text.replace(" ", "-"))
+            if match is None:
+                # The name only appears once they are removed
+                return (matched, None)
+            start, end = match.span()
+        return (matched, self._safe_span(start, end))
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def _explain_country_code(trace, lang=None):
+    return _address_to_found_text_and_country_code(trace.text, lang, trace)[1]
+
+
+def _explain_subdivision_code(trace, country=None):
+    return _address_to_subdivision_code(trace.text, country, trace)
+
+
+def _explain_country_and_subdivision_codes(
+    trace, lang=None, country=None, iso_format=False
+):
+    return _format_country_and_subdivision_codes(
+        _address_to_country_and_subdivision_codes(trace.text, lang, country, trace),
+        iso_format,
+    )
+
+
+_explained_functions = {
+    address_to_country_code: _explain_country_code,
+    address_to_subdivision_code: _explain_subdivision_code,
+    address_to_country_and_subdivision_codes: _explain_country_and_subdivision_codes,
+}
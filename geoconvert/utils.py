@@ -1,20 +1,107 @@
 # -*- coding: utf8 -*-
 import re
 import unicodedata
+from functools import cached_property
+
+
+class _CharacterTable(dict):
+    """
+    str.translate table mapping each character to its replacement,
+    computed on first use for characters which are not known yet.
+    """
+
+    def __init__(self, translate_character):
+        super().__init__()
+        self._translate_character = translate_character
+        # Precompute ASCII characters, which are the most common ones
+        for code in range(128):
+            self[code]
+
+    def __missing__(self, code):
+        # An empty replacement is stored as None to keep
+        # the fast path of str.translate for ASCII characters.
+        self[code] = self._translate_character(chr(code)) or None
+        return self[code]
+
+
+def _remove_accents_from_character(char):
+    char = char.replace("’", "'")  # accent used as apostrophe
+    return unicodedata.normalize("NFKD", char).encode("ascii", "ignore").decode()
+
+
+def _safe_character(char):
+    # Replace "-", ":", "/" and "<>" with a whitespace
+    char = re.sub(r"[-:/<>]", " ", char)
+    # Only keep word or space characters as well as "_", and "'".
+    char = re.sub(r"[^\w\s']", "", char)
+    return char.lower()
+
+
+# NFKD normalization only reorders combining marks, which are not ASCII,
+# so removing accents (and anything else) character by character gives the
+# same result as doing it on the whole text.
+_remove_accents_table = _CharacterTable(_remove_accents_from_character)
+_safe_string_table = _CharacterTable(
+    lambda char: "".join(
+        _safe_character(ascii_char)
+        for ascii_char in _remove_accents_from_character(char)
+    )
+)
+# ASCII texts, the most common ones, are translated as bytes, which is faster.
+_safe_ascii_table = bytes(
+    ord(_safe_string_table[code] or chr(code)) for code in range(128)
+) + bytes(range(128, 256))
+_safe_ascii_deleted_characters = bytes(
+    code for code in range(128) if _safe_string_table[code] is None
+)
 
 
 def remove_accents(text):
     """
     Remove accents from a string
+    >>> remove_accents("Côte d’Ivoire")
+    "Cote d'Ivoire"
     """
     try:
         text = text.decode("utf-8")
     except (UnicodeEncodeError, AttributeError):
         pass
-    text = text.replace("’", "'")  # accent used as apostrophe
-    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore")
-    text = text.decode()
-    return text
+    if text.isascii():
+        return text
+    return text.translate(_remove_accents_table)
+
+
+class SafeText(str):
+    """
+    Text returned by safe_string: making it safe again does nothing,
+    so it can be given to any lookup function without being normalized twice.
+    """
+
+
+class LookupText(str):
+    """
+    Text going through several lookup functions: its safe version is
+    computed once, the first time it is needed.
+
+    >>> text = LookupText("Côte d’Ivoire")
+    >>> text
+    'Côte d’Ivoire'
+    >>> safe_string(text) is safe_string(text)
+    True
+    """
+
+    @cached_property
+    def safe(self):
+        return safe_string(str(self))
+
+    @classmethod
+    def wrap(cls, text):
+        """
+        Return text as a LookupText, unless it already knows its safe version.
+        """
+        if type(text) is str:
+            return cls(text)
+        return text
 
 
 def safe_string(text):
@@ -46,14 +133,146 @@ def safe_string(text):
     'li congo li'
     >>> safe_string('Loire Atlanti)que')
     'loire atlantique'
+
+    Safe strings are not normalized again:
+    >>> text = safe_string('Loire-Atlantique')
+    >>> safe_string(text) is text
+    True
     """
-    text = remove_accents(text)
-    # Replace "-", ":", "/" and "<>" with a whitespace
-    text = re.sub(r"[-:/<>]", " ", text)
-    # Replace weird '
-    text = re.sub(r"[ʼ]", "'", text)
-    # Only keep word or space characters as well as "_", and "'".
-    text = re.sub(r"[^\w\s']", "", text)
-    # Always remove multiple whitespaces at the very last minute
-    text = re.sub(r"\s+", " ", text)
-    return text.strip().lower()
+    if isinstance(text, SafeText):
+        return text
+    if isinstance(text, LookupText):
+        return text.safe
+    return SafeText(_safe_string(text))
+
+
+def _safe_string(text):
+    try:
+        text = text.decode("utf-8")
+    except (UnicodeEncodeError, AttributeError):
+        pass
+    # Remove accents and unwanted characters in a single pass,
+    # then remove multiple whitespaces.
+    return " ".join(_translate(text).split())
+
+
+def _translate(text):
+    """
+    Remove accents and unwanted characters, character by character.
+    """
+    if text.isascii():
+        return (
+            text.encode()
+            .translate(_safe_ascii_table, _safe_ascii_deleted_characters)
+            .decode()
+        )
+    return text.translate(_safe_string_table)
+
+
+def iter_squeezed_chunks(chunks):
+    """
+    Lazily yield chunks of the text made of the given chunks, without leading
+    nor trailing whitespaces, and with a single space instead of each
+    sequence of whitespaces, like " ".join("".join(chunks).split()).
+
+    >>> list(iter_squeezed_chunks([" a", "b  ", "  ", "c "]))
+    ['a', 'b', ' c']
+    """
+    started = False
+    space = False
+    for chunk in chunks:
+        words = chunk.split()
+        if not words:
+            space = space or bool(chunk)
+            continue
+        squeezed = " ".join(words)
+        if started and (space or chunk[0].isspace()):
+            squeezed = " " + squeezed
+        started = True
+        space = chunk[-1].isspace()
+        yield squeezed
+
+
+def iter_safe_chunks(chunks):
+    """
+    Lazily yield chunks of safe_string("".join(chunks)), the given chunks
+    being texts (not bytes).
+
+    >>> "".join(iter_safe_chunks(["Trinidad-y-", "To", "bago !  ", " Fr"]))
+    'trinidad y tobago fr'
+    """
+    return iter_squeezed_chunks(map(_translate, chunks))
+
+
+def safe_string_with_offsets(text):
+    """
+    Return safe_string(text), along with the index in text of the character
+    each of its characters comes from.
+
+    >>> safe_text, offsets = safe_string_with_offsets("  Côte d’Ivoire !")
+    >>> safe_text
+    "cote d'ivoire"
+    >>> offsets[5:8]
+    [7, 8, 9]
+    """
+    try:
+        text = text.decode("utf-8")
+    except (UnicodeEncodeError, AttributeError):
+        pass
+    characters = []
+    offsets = []
+    # Index of the first whitespace of the run to replace with a single space
+    space_offset = None
+    for index, char in enumerate(text):
+        for safe_char in _safe_string_table[ord(char)] or "":
+            if safe_char.isspace():
+                if space_offset is None and characters:
+                    space_offset = index
+                continue
+            if space_offset is not None:
+                characters.append(" ")
+                offsets.append(space_offset)
+                space_offset = None
+            characters.append(safe_char)
+            offsets.append(index)
+    return SafeText("".join(characters)), offsets
+
+
+# Addresses usually stand on their own line or between HTML tags. Tags may
+# not contain "<", so that a text full of unclosed tags is split in linear time.
+_segment_separator_re = re.compile(r"<[^<>]*>|[\r\n|;]+")
+# Postcodes and commas tell a segment looks like an address
+_address_clue_re = re.compile(r"\d{4,}|,")
+
+
+def address_window(text, max_length):
+    """
+    Return at most max_length characters of text: its segments (lines, or
+    texts between HTML tags) with the most postcodes and commas, then the
+    shortest ones, which fit, in their original order, the best one being
+    cut to fit if need be.
+
+    >>> address_window("<p>Lorem ipsum</p><p>2 rue de Paris, 44000 Nantes</p>", 30)
+    '2 rue de Paris, 44000 Nantes'
+    >>> address_window("Berlin\\nLorem ipsum dolor\\nPotsdam, 14467", 25)
+    'Berlin\\nPotsdam, 14467'
+    """
+    if len(text) <= max_length:
+        return text
+    segments = [segment.strip() for segment in _segment_separator_re.split(text)]
+    ranked = sorted(
+        (index for index, segment in enumerate(segments) if segment),
+        key=lambda index: (
+            -len(_address_clue_re.findall(segments[index])),
+            len(segments[index]),
+            index,
+        ),
+    )
+    kept = {}
+    room = max_length
+    for index in ranked:
+        segment = segments[index] if kept else segments[index][:room]
+        if len(segment) <= room:
+            kept[index] = segment
+            room -= len(segment) + 1
+    return "\n".join(kept[index] for index in sorted(kept))
@@ -23,4 +23,11 @@ setup(
     version=get_version(),
     license="MIT",
     packages=["geoconvert", "geoconvert/data", "geoconvert/data/subdivisions"],
+    extras_require={
+        "arrow": ["pyarrow"],
+        "numpy": ["numpy"],
+        "pandas": ["pandas"],
+        "re2": ["google-re2"],
+        "regex": ["regex"],
+    },
 )
@@ -0,0 +1,266 @@
+import asyncio
+import concurrent.futures
+import sys
+import threading
+
+import mock
+import pytest
+
+from geoconvert import (
+    address_to_country_and_subdivision_codes,
+    address_to_country_code,
+    address_to_subdivision_code,
+    find_countries,
+)
+from geoconvert.aio import (
+    AsyncResolver,
+    async_address_to_country_and_subdivision_codes,
+    async_address_to_country_code,
+    async_address_to_subdivision_code,
+    async_find_countries,
+)
+
+
+class Blocking:
+    """
+    Function blocking until released, recording its calls and the number
+    of calls running at the same time.
+    """
+
+    def __init__(self):
+        self.released = threading.Event()
+        self.lock = threading.Lock()
+        self.calls = []
+        self.running = self.max_running = 0
+
+    def __call__(self, text, **options):
+        with self.lock:
+            self.calls.append(text)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        self.released.wait(5)
+        with self.lock:
+            self.running -= 1
+        if text == "error":
+            raise ValueError(text)
+        return text.upper()
+
+
+async def release_later(function, delay=0.05):
+    await asyncio.sleep(delay)
+    function.released.set()
+
+
+class TestAsyncFunctions:
+    @pytest.mark.parametrize(
+        "async_function, function, options",
+        [
+            (async_address_to_country_code, address_to_country_code, {"lang": "de"}),
+            (
+                async_address_to_subdivision_code,
+                address_to_subdivision_code,
+                {"country": "CA"},
+            ),
+            (
+                async_address_to_country_and_subdivision_codes,
+                address_to_country_and_subdivision_codes,
+                {"iso_format": True},
+            ),
+            (
+                async_find_countries,
+                find_countries,
+                {"lang": "fr", "enable_ambiguous_detection": True},
+            ),
+        ],
+    )
+    def test_same_result(self, async_function, function, options):
+        texts = ["14467 Potsdam", "Montréal, Québec", "Kairo, FR", "Wonderland"]
+
+        async def main():
+            return await asyncio.gather(
+                *(async_function(text, **options) for text in texts)
+            )
+
+        assert asyncio.run(main()) == [function(text, **options) for text in texts]
+
+
+class TestAsyncResolver:
+    def test_methods(self):
+        async def main():
+            async with AsyncResolver("thread", max_workers=2) as resolver:
+                return [
+                    await resolver.address_to_country_code("Welcome to Cyprus"),
+                    await resolver.address_to_subdivision_code("44000 Nantes", "FR"),
+                    await resolver.address_to_country_and_subdivision_codes(
+                        "Montréal, Québec"
+                    ),
+                    await resolver.find_countries("Bienvenue à Kinshasa"),
+                ]
+
+        assert asyncio.run(main()) == ["CY", "44", ("CA", "QC"), ["CD"]]
+
+    def test_coalescing(self):
+        function = Blocking()
+        resolver = AsyncResolver()
+
+        async def main():
+            return await asyncio.gather(
+                *(resolver.run(function, "a", lang="fr") for _ in range(5)),
+                resolver.run(function, "a", lang="de"),
+                resolver.run(function, "b", lang="fr"),
+                release_later(function),
+            )
+
+        assert asyncio.run(main()) == ["A"] * 5 + ["A", "B", None]
+        assert sorted(function.calls) == ["a", "a", "b"]
+        assert resolver._in_flight == {}
+
+    def test_finished_computations_are_not_shared(self):
+        function = Blocking()
+        function.released.set()
+        resolver = AsyncResolver()
+
+        async def main():
+            return [await resolver.run(function, "a") for _ in range(2)]
+
+        assert asyncio.run(main()) == ["A", "A"]
+        assert function.calls == ["a", "a"]
+
+    def test_errors_are_shared(self):
+        function = Blocking()
+        resolver = AsyncResolver()
+
+        async def main():
+            return await asyncio.gather(
+                resolver.run(function, "error"),
+                resolver.run(function, "error"),
+                release_later(function),
+                return_exceptions=True,
+            )
+
+        first, second, _ = asyncio.run(main())
+        assert isinstance(first, ValueError) and isinstance(second, ValueError)
+        assert function.calls == ["error"]
+        assert resolver._in_flight == {}
+
+    def test_cancelled_caller(self):
+        function = Blocking()
+        resolver = AsyncResolver()
+
+        async def main():
+            first = asyncio.ensure_future(resolver.run(function, "a"))
+            second = asyncio.ensure_future(resolver.run(function, "a"))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            await release_later(function)
+            assert await second == "A"
+            return first
+
+        assert asyncio.run(main()).cancelled()
+        assert function.calls == ["a"]
+
+    def test_max_concurrency(self):
+        function = Blocking()
+        resolver = AsyncResolver("thread", max_concurrency=2, max_workers=8)
+        texts = [str(index) for index in range(8)]
+
+        async def main():
+            return await asyncio.gather(
+                *(resolver.run(function, text) for text in texts),
+                release_later(function),
+            )
+
+        try:
+            assert asyncio.run(main()) == texts + [None]
+        finally:
+            resolver.close()
+        assert function.max_running == 2
+
+    def test_max_concurrency_in_several_loops(self):
+        resolver = AsyncResolver("thread", max_concurrency=1)
+        texts = ["Kairo", "Kinshasa", "Berlin"]
+
+        async def main():
+            return await asyncio.gather(
+                *(resolver.address_to_country_code(text) for text in texts)
+            )
+
+        try:
+            # The resolver is built outside any loop, and used by two of them
+            assert asyncio.run(main()) == asyncio.run(main()) == ["EG", "CD", "DE"]
+        finally:
+            resolver.close()
+
+    def test_shared_results_are_copied(self):
+        function = mock.Mock(return_value=["FR"])
+        resolver = AsyncResolver()
+
+        async def main():
+            return await asyncio.gather(
+                resolver.run(function, "France"), resolver.run(function, "France")
+            )
+
+        first, second = asyncio.run(main())
+        first.append("DE")
+        assert second == ["FR"]
+        function.assert_called_once_with("France")
+
+    def test_event_loop_not_blocked(self):
+        resolver = AsyncResolver("thread")
+        started = threading.Event()
+        released = threading.Event()
+        ticks = []
+
+        def job(text):
+            started.set()
+            # Only released by the loop running while the job blocks
+            return released.wait(5)
+
+        async def tick():
+            while not started.is_set():
+                await asyncio.sleep(0.001)
+            for index in range(5):
+                ticks.append(index)
+                await asyncio.sleep(0)
+            released.set()
+
+        async def main():
+            return await asyncio.gather(resolver.run(job, "text"), tick())
+
+        try:
+            assert asyncio.run(main()) == [True, None]
+        finally:
+            resolver.close()
+        assert ticks == [0, 1, 2, 3, 4]
+
+    def test_given_executor_is_not_closed(self):
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            resolver = AsyncResolver(executor)
+            resolver.close()
+            assert asyncio.run(resolver.address_to_country_code("Kairo")) == "EG"
+
+    def test_process_executor(self):
+        async def main():
+            async with AsyncResolver("process", max_workers=1) as resolver:
+                return await resolver.address_to_country_and_subdivision_codes(
+                    "14467 Potsdam", iso_format=True
+                )
+
+        assert asyncio.run(main()) == "DE-BB"
+
+    def test_interpreter_executor(self):
+        with mock.patch(
+            "concurrent.futures.InterpreterPoolExecutor", create=True
+        ) as executor_class:
+            resolver = AsyncResolver("interpreter", max_workers=3)
+        assert resolver.executor is executor_class.return_value
+        assert executor_class.call_args.args == (3,)
+
+    @pytest.mark.skipif(sys.version_info >= (3, 14), reason="interpreter pools exist")
+    def test_interpreter_executor_missing(self):
+        with pytest.raises(ValueError, match="Python 3.14"):
+            AsyncResolver("interpreter")
+
+    def test_invalid_executor(self):
+        with pytest.raises(ValueError, match="one of"):
+            AsyncResolver("fiber")
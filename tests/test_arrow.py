@@ -0,0 +1,173 @@
+import importlib
+import sys
+
+import mock
+import pytest
+
+from geoconvert import (
+    address_to_country_and_subdivision_codes,
+    address_to_country_code,
+    address_to_subdivision_code,
+)
+
+pyarrow = pytest.importorskip("pyarrow")
+arrow = pytest.importorskip("geoconvert.arrow")
+
+ADDRESSES = ["14467 Potsdam", "Kairo", "Montréal, Québec", "Wonderland", None] * 3
+CODES_TYPE = pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+
+
+def inputs():
+    """
+    The same addresses as arrays and chunked arrays, plain or dictionary-encoded.
+    """
+    array = pyarrow.array(ADDRESSES)
+    yield array
+    yield array.cast(pyarrow.large_string())
+    yield array.dictionary_encode()
+    yield pyarrow.chunked_array([array[:4], array[4:4], array[4:]])
+    # Chunks with their own dictionaries, with null and repeated entries
+    yield pyarrow.chunked_array(
+        [
+            pyarrow.DictionaryArray.from_arrays(
+                pyarrow.array([0, 1, 2, 3], pyarrow.int8()),
+                pyarrow.array(ADDRESSES[:4]),
+            ),
+            pyarrow.DictionaryArray.from_arrays(
+                pyarrow.array([3, 1, 2, 5, 0, None, 1, 4, 5, 0, 3], pyarrow.int8()),
+                pyarrow.array(
+                    [
+                        "Wonderland",
+                        "14467 Potsdam",
+                        "Kairo",
+                        None,
+                        "Kairo",
+                        "Montréal, Québec",
+                    ]
+                ),
+            ),
+        ]
+    )
+
+
+def expected(function, **options):
+    return [
+        None if address is None else function(address, **options)
+        for address in ADDRESSES
+    ]
+
+
+def check(result, addresses):
+    assert type(result) is type(addresses.dictionary_encode())
+    assert result.type == CODES_TYPE
+    return result.to_pylist()
+
+
+class TestArrowBatches:
+    def test_inputs(self):
+        # Every input holds the addresses, in the same order
+        for addresses in inputs():
+            assert addresses.to_pylist() == ADDRESSES
+
+    @pytest.mark.parametrize(
+        "lang, country", [(None, None), ("de", None), (None, "CA")]
+    )
+    def test_country_and_subdivision_codes(self, lang, country):
+        codes = expected(
+            address_to_country_and_subdivision_codes, lang=lang, country=country
+        )
+        for addresses in inputs():
+            country_codes, subdivision_codes = (
+                arrow.arrow_addresses_to_country_and_subdivision_codes(
+                    addresses, lang=lang, country=country
+                )
+            )
+            assert check(country_codes, addresses) == [
+                code and code[0] for code in codes
+            ]
+            assert check(subdivision_codes, addresses) == [
+                code and code[1] for code in codes
+            ]
+
+    def test_iso_format(self):
+        codes = expected(address_to_country_and_subdivision_codes, iso_format=True)
+        for addresses in inputs():
+            assert (
+                check(
+                    arrow.arrow_addresses_to_country_and_subdivision_codes(
+                        addresses, iso_format=True
+                    ),
+                    addresses,
+                )
+                == codes
+            )
+
+    @pytest.mark.parametrize("lang", [None, "de"])
+    def test_country_codes(self, lang):
+        codes = expected(address_to_country_code, lang=lang)
+        for addresses in inputs():
+            assert (
+                check(
+                    arrow.arrow_addresses_to_country_codes(addresses, lang), addresses
+                )
+                == codes
+            )
+
+    @pytest.mark.parametrize("country", [None, "DE"])
+    def test_subdivision_codes(self, country):
+        codes = expected(address_to_subdivision_code, country=country)
+        for addresses in inputs():
+            assert (
+                check(
+                    arrow.arrow_addresses_to_subdivision_codes(addresses, country),
+                    addresses,
+                )
+                == codes
+            )
+
+    def test_distinct_values_resolved_once(self):
+        for addresses in inputs():
+            with mock.patch(
+                "geoconvert.arrow.address_to_country_code",
+                side_effect=address_to_country_code,
+            ) as function:
+                arrow.arrow_addresses_to_country_codes(addresses)
+            assert sorted(call.args[0] for call in function.call_args_list) == sorted(
+                ["14467 Potsdam", "Kairo", "Montréal, Québec", "Wonderland"]
+            )
+
+    def test_shared_dictionary(self):
+        addresses = pyarrow.chunked_array([ADDRESSES[:7], ADDRESSES[7:]])
+        country_codes = arrow.arrow_addresses_to_country_codes(addresses)
+        assert [chunk.dictionary.to_pylist() for chunk in country_codes.chunks] == [
+            ["DE", "EG", "CA"]
+        ] * 2
+
+    @pytest.mark.parametrize(
+        "addresses",
+        [
+            pyarrow.array([], pyarrow.string()),
+            pyarrow.array([], pyarrow.string()).dictionary_encode(),
+            pyarrow.chunked_array([], pyarrow.string()),
+            pyarrow.chunked_array([], CODES_TYPE),
+        ],
+    )
+    def test_empty(self, addresses):
+        country_codes, subdivision_codes = (
+            arrow.arrow_addresses_to_country_and_subdivision_codes(addresses)
+        )
+        assert country_codes.to_pylist() == subdivision_codes.to_pylist() == []
+        assert country_codes.type == subdivision_codes.type == CODES_TYPE
+
+    def test_values_which_are_not_texts(self):
+        addresses = pyarrow.array([44000, 29000, 44000])
+        assert arrow.arrow_addresses_to_subdivision_codes(
+            addresses, country="FR"
+        ).to_pylist() == ["44", "29", "44"]
+
+    def test_missing_pyarrow(self):
+        # sys.modules is restored as it was when leaving patch.dict
+        with mock.patch.dict(sys.modules, {"pyarrow": None}):
+            del sys.modules["geoconvert.arrow"]
+            with pytest.raises(ImportError, match=r"geoconvert\[arrow\]"):
+                importlib.import_module("geoconvert.arrow")
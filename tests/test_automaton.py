@@ -0,0 +1,88 @@
+import re
+
+import pytest
+
+from geoconvert.automaton import Automaton, is_delimited
+from geoconvert.data import language_to_capital_names, language_to_country_names
+from geoconvert.utils import safe_string
+
+
+def regex_longest(text, full_names):
+    """
+    Reference implementation: one regex per name.
+    """
+    items_found = []
+    for name, code in full_names.items():
+        if re.search(rf"(\s|[^\w\s]|\b){name}(\s|[^\w\s]|\b)", text):
+            items_found.append((name, code))
+    if items_found:
+        return max(items_found, key=lambda item: len(item[0]))[0]
+
+
+class TestAutomaton:
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("", []),
+            ("he is here", [(0, "he"), (3, "is"), (6, "he"), (6, "here")]),
+            ("hers", [(0, "he"), (0, "hers")]),
+            ("ushers", [(2, "he"), (1, "she"), (2, "hers")]),
+        ],
+    )
+    def test_finditer(self, text, expected):
+        automaton = Automaton(["he", "she", "his", "hers", "is", "here"])
+        assert sorted(automaton.finditer(text)) == sorted(expected)
+
+    @pytest.mark.parametrize(
+        "text, start, end, expected",
+        [
+            ("sudan", 0, 5, True),
+            ("south sudan", 6, 11, True),
+            ("sudanese", 0, 5, False),
+            ("xsudan", 1, 6, False),
+            ("l'ocean indien", 2, 7, True),
+            ("cote d'ivoire", 5, 13, True),
+        ],
+    )
+    def test_is_delimited(self, text, start, end, expected):
+        assert is_delimited(text, start, end) is expected
+
+    def test_longest_breaks_ties_with_insertion_order(self):
+        automaton = Automaton(["mali", "chad", "oman"])
+        assert automaton.longest("oman chad mali") == "mali"
+        assert automaton.longest("oman chad mali", {"chad", "oman"}) == "chad"
+        assert automaton.longest("omani chadian") is None
+
+    def test_duplicate_and_empty_keywords_are_ignored(self):
+        automaton = Automaton(["", "peru", "peru"])
+        assert len(automaton) == 1
+        assert "peru" in automaton
+        assert "" not in automaton
+
+    @pytest.mark.parametrize(
+        "language_to_full_names",
+        [language_to_country_names, language_to_capital_names],
+    )
+    def test_same_result_as_regexes(self, language_to_full_names):
+        texts = [
+            "Welcome to Cyprus",
+            "Congo, the Democratic Republic of the",
+            "Les Pays-Bas et la Nouvelle-Zélande",
+            "Fiji/Pacific Island",
+            "Prince Edward Island, Canada",
+            "Saint John's, Antigua & Barbuda",
+            "Territoire britannique de l'océan Indien",
+            "Haute-Vienne, Limoges",
+            "Nigerian nationals in Niger",
+            "2 pl. Saint-Pierre, 44000 Nantes",
+            "Av. Pres. Castelo Branco, Portão 3 - Maracanã",
+        ]
+        for full_names in language_to_full_names.values():
+            names = list(full_names)
+            # Embed every name in various contexts
+            texts += [f"{names[i]} {names[i - 1]}" for i in range(0, len(names), 7)]
+            texts += [f"x{name}, {name}s" for name in names[::11]]
+            automaton = Automaton(full_names)
+            for text in texts:
+                text = safe_string(text)
+                assert automaton.longest(text) == regex_longest(text, full_names)
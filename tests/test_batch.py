@@ -0,0 +1,91 @@
+import mock
+import pytest
+
+from geoconvert import (
+    address_to_country_code,
+    addresses_to_country_and_subdivision_codes,
+    batch,
+    iter_addresses_to_country_and_subdivision_codes,
+    iter_batch,
+)
+
+ADDRESSES = [
+    "14467 Potsdam",
+    "Kairo",
+    "Montréal, QC",
+    "14467 Potsdam",
+    "Wonderland",
+    "Kairo",
+    "Wonderland",
+]
+
+
+class TestBatch:
+    def test_results_are_in_input_order(self):
+        assert addresses_to_country_and_subdivision_codes(ADDRESSES) == [
+            ("DE", "BB"),
+            ("EG", None),
+            (None, None),
+            ("DE", "BB"),
+            (None, None),
+            ("EG", None),
+            (None, None),
+        ]
+
+    @pytest.mark.parametrize(
+        "kwargs, expected",
+        [
+            ({"iso_format": True}, ["DE-BB", "EG", None, "DE-BB", None, "EG", None]),
+            (
+                {"country": "CA"},
+                [(None, None)] * 2 + [("CA", "QC")] + [(None, None)] * 4,
+            ),
+            (
+                {"lang": "en"},
+                [("DE", "BB")]
+                + [(None, None)] * 2
+                + [("DE", "BB")]
+                + [(None, None)] * 3,
+            ),
+        ],
+    )
+    def test_options(self, kwargs, expected):
+        assert (
+            addresses_to_country_and_subdivision_codes(ADDRESSES, **kwargs) == expected
+        )
+        assert (
+            list(iter_addresses_to_country_and_subdivision_codes(ADDRESSES, **kwargs))
+            == expected
+        )
+
+    def test_distinct_texts_are_resolved_once(self):
+        function = mock.Mock(wraps=address_to_country_code)
+        assert batch(function, ADDRESSES, lang="de") == [
+            "DE",
+            "EG",
+            None,
+            "DE",
+            None,
+            "EG",
+            None,
+        ]
+        assert function.call_count == 4
+        function.assert_any_call("Kairo", lang="de")
+
+    def test_iter_batch_is_lazy(self):
+        function = mock.Mock(wraps=address_to_country_code)
+        results = iter_batch(function, iter(ADDRESSES))
+        assert not function.called
+        assert next(results) == "DE"
+        assert next(results) == "EG"
+        assert function.call_count == 2
+
+    @pytest.mark.parametrize(
+        "cache_size, expected_calls",
+        [(None, 4), (3, 5), (2, 6), (1, 7)],
+    )
+    def test_iter_batch_cache_size(self, cache_size, expected_calls):
+        function = mock.Mock(wraps=address_to_country_code)
+        results = list(iter_batch(function, ADDRESSES, cache_size=cache_size))
+        assert results == [address_to_country_code(text) for text in ADDRESSES]
+        assert function.call_count == expected_calls
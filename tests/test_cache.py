@@ -0,0 +1,172 @@
+import threading
+
+import mock
+import pytest
+
+from geoconvert import (
+    address_to_country_and_subdivision_codes,
+    address_to_country_code,
+    address_to_subdivision_code,
+    cache_clear,
+    cache_info,
+    disable_cache,
+    enable_cache,
+)
+from geoconvert.cache import LRUCache, ShardedLRUCache, default_shards
+
+
+@pytest.fixture
+def cache():
+    enable_cache(maxsize=3)
+    yield
+    disable_cache()
+
+
+class TestLRUCache:
+    def test_maxsize_must_be_positive(self):
+        with pytest.raises(ValueError):
+            LRUCache(maxsize=0)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+        assert cache.get("b", "missing") == "missing"
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.info() == (3, 1, 1, 2, 2)
+        cache.clear()
+        assert cache.info() == (0, 0, 0, 2, 0)
+
+    def test_concurrent_access(self):
+        cache = LRUCache(maxsize=50)
+
+        def worker(offset):
+            for i in range(1000):
+                key = (offset + i) % 100
+                if cache.get(key) is None:
+                    cache.set(key, key)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        info = cache.info()
+        assert info.hits + info.misses == 8000
+        assert info.currsize == 50
+
+
+class TestShardedLRUCache:
+    def test_maxsize_must_be_positive(self):
+        with pytest.raises(ValueError):
+            ShardedLRUCache(maxsize=0)
+
+    @pytest.mark.parametrize("maxsize, shards", [(10, 4), (3, 16), (100, 1)])
+    def test_shard_sizes(self, maxsize, shards):
+        cache = ShardedLRUCache(maxsize, shards)
+        assert len(cache._shards) == min(maxsize, shards)
+        assert sum(shard.maxsize for shard in cache._shards) == maxsize
+        for key in range(1000):
+            cache.set(key, key)
+        assert cache.info() == (0, 0, 1000 - maxsize, maxsize, maxsize)
+
+    def test_least_recently_used_entries_of_a_shard_are_evicted(self):
+        cache = ShardedLRUCache(maxsize=4, shards=2)
+        # Small integers are their own hash: even keys go to the first shard
+        cache.set(0, "a")
+        cache.set(2, "b")
+        cache.set(1, "c")
+        assert cache.get(0) == "a"
+        cache.set(4, "d")
+        assert cache.get(2, "missing") == "missing"
+        assert [cache.get(key) for key in (0, 1, 4)] == ["a", "c", "d"]
+        assert cache.info() == (4, 1, 1, 4, 3)
+        cache.clear()
+        assert cache.info() == (0, 0, 0, 4, 0)
+
+    def test_concurrent_access(self):
+        cache = ShardedLRUCache(maxsize=50, shards=4)
+
+        def worker(offset):
+            for i in range(1000):
+                key = (offset + i) % 100
+                if cache.get(key) is None:
+                    cache.set(key, key)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        info = cache.info()
+        assert info.hits + info.misses == 8000
+        assert info.currsize == 50
+
+
+class TestDefaultShards:
+    def test_gil(self):
+        with mock.patch("sys._is_gil_enabled", create=True, return_value=True):
+            assert default_shards() == 1
+
+    def test_before_python_3_13(self):
+        with mock.patch("sys._is_gil_enabled", None, create=True):
+            assert default_shards() == 1
+
+    def test_free_threaded(self):
+        with mock.patch(
+            "sys._is_gil_enabled", create=True, return_value=False
+        ), mock.patch("os.cpu_count", return_value=8):
+            assert default_shards() == 32
+
+
+class TestResultCache:
+    def test_disabled_by_default(self):
+        assert cache_info() is None
+        # No errors when clearing a disabled cache
+        cache_clear()
+
+    def test_results_are_cached(self, cache):
+        assert address_to_country_code("Welcome to Cyprus") == "CY"
+        with mock.patch(
+            "geoconvert.convert._address_to_found_text_and_country_code"
+        ) as lookup:
+            assert address_to_country_code("Welcome to Cyprus") == "CY"
+            assert not lookup.called
+        assert cache_info() == (1, 1, 0, 3, 1)
+
+    def test_not_found_results_are_cached(self, cache):
+        assert address_to_subdivision_code("Wonderland") is None
+        assert address_to_subdivision_code("Wonderland") is None
+        assert address_to_country_and_subdivision_codes("Wonderland") == (None, None)
+        assert address_to_country_and_subdivision_codes("Wonderland") == (None, None)
+        assert cache_info().hits == 2
+
+    def test_options_are_part_of_the_key(self, cache):
+        assert address_to_country_and_subdivision_codes("14467 Potsdam") == ("DE", "BB")
+        assert (
+            address_to_country_and_subdivision_codes("14467 Potsdam", iso_format=True)
+            == "DE-BB"
+        )
+        assert address_to_country_code("Kairo", lang="de") == "EG"
+        assert address_to_country_code("Kairo", lang="DE") == "EG"
+        assert address_to_country_code("Kairo", lang="en") is None
+        assert cache_info() == (1, 4, 1, 3, 3)
+
+    def test_shards(self):
+        enable_cache(maxsize=100, shards=4)
+        try:
+            for text in ["Kairo", "Welcome to Cyprus", "14467 Potsdam", "Kairo"]:
+                address_to_country_code(text)
+            assert cache_info() == (1, 3, 0, 100, 3)
+        finally:
+            disable_cache()
+
+    def test_cache_clear(self, cache):
+        address_to_subdivision_code("Montréal, QC", country="ca")
+        address_to_subdivision_code("Montréal, QC", country="CA")
+        cache_clear()
+        assert cache_info() == (0, 0, 0, 3, 0)
+        assert address_to_subdivision_code("Montréal, QC", country="CA") == "QC"
@@ -0,0 +1,192 @@
+import io
+import json
+import runpy
+
+import mock
+import pytest
+
+from geoconvert import address_to_country_and_subdivision_codes
+from geoconvert.cli import Converter, Report, main
+
+CSV = (
+    "id,address\n"
+    "1,14467 Potsdam\n"
+    "2,Kairo\n"
+    "3,14467 Potsdam\n"
+    "4,\n"
+    '5,"Montréal, Québec"\n'
+)
+
+
+def set_stdin(monkeypatch, text):
+    monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(text.encode())))
+
+
+def run(monkeypatch, argv, stdin=""):
+    set_stdin(monkeypatch, stdin)
+    return main(argv)
+
+
+class TestCli:
+    def test_csv(self, monkeypatch, capsys):
+        assert run(monkeypatch, ["-c", "address"], CSV) == 0
+        out, err = capsys.readouterr()
+        assert out == (
+            "id,address,country_code,subdivision_code\n"
+            "1,14467 Potsdam,DE,BB\n"
+            "2,Kairo,EG,\n"
+            "3,14467 Potsdam,DE,BB\n"
+            "4,,,\n"
+            '5,"Montréal, Québec",CA,QC\n'
+        )
+        assert err.startswith("5 rows (4 resolved, 1 from cache) in ")
+
+    def test_options(self, monkeypatch, capsys):
+        argv = ["-c", "address", "-f", "csv", "--iso-format", "--country", "ca", "-q"]
+        assert run(monkeypatch, argv, CSV) == 0
+        out, err = capsys.readouterr()
+        assert out.splitlines()[0] == "id,address,iso_code"
+        assert out.splitlines()[-1] == '5,"Montréal, Québec",CA-QC'
+        assert err == ""
+
+    def test_find_countries(self, monkeypatch, capsys):
+        stdin = "text;id\nFrance et Allemagne;1\nUngarn FR;2\n"
+        argv = ["-c", "text", "--find-countries", "--delimiter", ";"]
+        argv += ["--lang", "de", "--enable-ambiguous-detection", "-q"]
+        assert run(monkeypatch, argv, stdin) == 0
+        assert capsys.readouterr().out == (
+            "text;id;countries\nFrance et Allemagne;1;\nUngarn FR;2;FR,HU\n"
+        )
+
+    def test_newlines_in_quoted_fields(self, monkeypatch, capsys):
+        stdin = 'id,address\r\n1,"Kairo\r\nÄgypten"\r\n2,"Potsdam\n14467"\r\n'
+        assert run(monkeypatch, ["-c", "address", "-q"], stdin) == 0
+        assert capsys.readouterr().out == (
+            "id,address,country_code,subdivision_code\n"
+            '1,"Kairo\r\nÄgypten",EG,\n'
+            '2,"Potsdam\n14467",DE,BB\n'
+        )
+
+    def test_csv_files_with_other_columns(self, tmp_path):
+        paths = [tmp_path / "1.csv", tmp_path / "2.csv", tmp_path / "3.csv"]
+        paths[0].write_text("id,address\n1,Kairo\n")
+        paths[1].write_text("address,zone,id\nPotsdam 14467,B,2\n")
+        paths[2].write_text('address\n"Montréal, Québec"\n')
+        output = tmp_path / "out.csv"
+        argv = ["-c", "address", "-q", "-o", str(output)]
+        assert main(argv + [str(path) for path in paths]) == 0
+        assert output.read_text() == (
+            "id,address,zone,country_code,subdivision_code\n"
+            "1,Kairo,,EG,\n"
+            "2,Potsdam 14467,B,DE,BB\n"
+            ',"Montréal, Québec",,CA,QC\n'
+        )
+
+    def test_jsonl_files(self, tmp_path, capsys):
+        paths = [tmp_path / "1.jsonl", tmp_path / "2.jsonl"]
+        paths[0].write_text('{"text": "Kairo", "id": 1}\n\n{"id": 2}\n')
+        paths[1].write_text('{"text": "Bienvenue à Kinshasa", "id": 3}\n')
+        output = tmp_path / "out.jsonl"
+        argv = [
+            "-c",
+            "text",
+            "--find-countries",
+            "-o",
+            str(output),
+            "--batch-size",
+            "1",
+        ]
+        assert main(argv + [str(path) for path in paths]) == 0
+        assert [json.loads(line) for line in output.read_text().splitlines()] == [
+            {"text": "Kairo", "id": 1, "countries": ["EG"]},
+            {"id": 2, "countries": []},
+            {"text": "Bienvenue à Kinshasa", "id": 3, "countries": ["CD"]},
+        ]
+        assert "3 rows (3 resolved, 0 from cache)" in capsys.readouterr().err
+
+    def test_missing_column(self, tmp_path):
+        path = tmp_path / "addresses.csv"
+        path.write_text(CSV)
+        with pytest.raises(SystemExit, match="no 'street' column"):
+            main(["-c", "street", str(path)])
+
+    def test_invalid_options(self, capsys):
+        with pytest.raises(SystemExit):
+            main(["-c", "text", "--find-countries", "--iso-format"])
+        assert "only apply to address codes" in capsys.readouterr().err
+
+    @pytest.mark.parametrize("option", ["--processes", "--batch-size"])
+    @pytest.mark.parametrize("value", ["0", "-1"])
+    def test_invalid_sizes(self, capsys, option, value):
+        with pytest.raises(SystemExit):
+            main(["-c", "text", option, value])
+        assert f"{option} must be at least 1" in capsys.readouterr().err
+
+    @pytest.mark.parametrize(
+        "line, message",
+        [
+            ('"foo"', "line 2 of .* is not a JSON object"),
+            ("[1]", "line 2 of .* is not a JSON object"),
+            ('{"text": ', "invalid JSON on line 2 of .*: Expecting value"),
+        ],
+    )
+    def test_invalid_jsonl_lines(self, tmp_path, line, message):
+        path = tmp_path / "in.jsonl"
+        path.write_text('{"text": "Kairo"}\n' + line + "\n")
+        with pytest.raises(SystemExit, match=message):
+            main(["-c", "text", "-q", "-o", str(tmp_path / "out.jsonl"), str(path)])
+
+    def test_empty_input(self, monkeypatch, capsys):
+        assert run(monkeypatch, ["-c", "address"]) == 0
+        out, err = capsys.readouterr()
+        assert out == ""
+        assert err.startswith("0 rows (0 resolved, 0 from cache)")
+
+    def test_module(self, monkeypatch, capsys):
+        monkeypatch.setattr("sys.argv", ["geoconvert", "-c", "address", "-q"])
+        set_stdin(monkeypatch, CSV)
+        with pytest.raises(SystemExit) as exc_info:
+            runpy.run_module("geoconvert", run_name="__main__")
+        assert exc_info.value.code == 0
+        assert capsys.readouterr().out.startswith("id,address,country_code")
+
+
+class TestConverter:
+    def test_cache_across_batches(self):
+        function = mock.Mock(side_effect=str.upper)
+        converter = Converter(function, {}, cache_size=2)
+        assert converter.convert(["a", "b", "a"]) == ["A", "B", "A"]
+        assert converter.convert(["b", "c"]) == ["B", "C"]
+        # "a" was forgotten to keep the 2 last distinct texts
+        assert converter.convert(["a"]) == ["A"]
+        assert [call.args[0] for call in function.call_args_list] == [
+            "a",
+            "b",
+            "c",
+            "a",
+        ]
+        assert (converter.rows, converter.resolved) == (6, 4)
+
+    def test_processes(self):
+        texts = ["14467 Potsdam", "Kairo", "Wonderland"] * 10
+        converter = Converter(address_to_country_and_subdivision_codes, {}, 2)
+        converter.pool.min_parallel_size = 0
+        try:
+            assert converter.convert(texts) == [
+                address_to_country_and_subdivision_codes(text) for text in texts
+            ]
+        finally:
+            converter.close()
+
+
+class TestReport:
+    def test_progress(self, capsys):
+        converter = Converter(str.upper, {})
+        report = Report(converter, progress=True, interval=0)
+        converter.convert(["a", "a"])
+        report.update()
+        report.finish()
+        lines = capsys.readouterr().err.splitlines()
+        assert len(lines) == 2
+        assert lines[0].startswith("2 rows (1 resolved, 1 from cache) in ")
+        assert lines[0].endswith(" rows/s")
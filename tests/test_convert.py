@@ -1,6 +1,125 @@
+import random
+import re
+
 import pytest
 
-from geoconvert import find_countries
+from geoconvert import (
+    address_to_country_and_subdivision_codes,
+    address_to_country_code,
+    address_to_subdivision_code,
+    count_countries,
+    explain,
+    find_countries,
+    find_country_mentions,
+    set_max_text_length,
+)
+from geoconvert.convert import (
+    address_to_found_text_and_country_code,
+    capital_name_to_country_name_and_code,
+    country_name_to_country_name_and_code,
+    country_to_safe_subdivision_lookup_function,
+    fr_town_name_cleaning_re,
+    get_capital_gazetteers,
+    get_country_gazetteers,
+)
+from geoconvert.utils import safe_string
+
+ADDRESSES = [
+    "",
+    "   ",
+    "Welcome to Cyprus",
+    "Bienvenue à Londres",
+    "Willkommen bei Kairo",
+    "Fiji/Pacific Island",
+    "Prince Edward Island",
+    "Montréal, Québec",
+    "Toronto, ON",
+    "1800 W Erie Ave, Lorain, OH 44052",
+    "Los Angeles, CA 90068",
+    "Sunnyvale, New Hampshire",
+    "659 Ocean Ave, Lakewood, New Jersey 08701",
+    "H3T 1X6",
+    "Luz, 01120-010",
+    "14467 Potsdam",
+    "Thüringen",
+    "Straße 3 53119 Bonn",
+    "2 pl. Saint-Pierre, 44000 Nantes",
+    "2 rue de Paris, Nantes, Loire-Atlantique",
+    "Rue de la Loire, Ville-sur-Mer, Atlantique",
+    "Châlons-en-Champagne, Marne",
+    "LOIRE    -    ATLANTIQUE",
+    "Av. Pres. Castelo Branco, Portão 3 - Maracanã",
+    "٣٤٥ Arabic digits",
+    "① circled digit",
+]
+
+
+def sequential_found_text_and_country_code(text, lang=None):
+    """
+    Reference implementation: every lookup one after the other.
+    """
+    if country := country_name_to_country_name_and_code(text, lang):
+        return country
+    if country := capital_name_to_country_name_and_code(text, lang):
+        return country
+    for country_code, lookup_function in country_to_safe_subdivision_lookup_function:
+        if lookup_function(text):
+            return (None, country_code)
+    return (None, None)
+
+
+LANGUAGES = [None, "de", "en", "fr", "pt", "es"]
+
+
+def overlapping_names(seed, count=300):
+    """
+    Yield texts made of three country or capital names, in any language,
+    which often overlap or contain one another.
+    """
+    names = sorted(
+        name
+        for gazetteers in (get_country_gazetteers(), get_capital_gazetteers())
+        for gazetteer in gazetteers.by_language.values()
+        for name in gazetteer.names
+    )
+    rng = random.Random(seed)
+    for _ in range(count):
+        separator = rng.choice(["", " ", "-", ", ", "\n"])
+        yield separator.join(rng.sample(names, 3)), rng.choice(LANGUAGES)
+
+
+def iterative_find_countries(text, lang=None):
+    """
+    Reference implementation: find the best name, remove it from the text,
+    and start again until nothing is found.
+    """
+    safe_text = safe_string(text)
+    countries = set()
+    while (
+        country := address_to_found_text_and_country_code(safe_text, lang)
+    ) and country[1]:
+        countries.add(country[1])
+        if country[0] is None:
+            break
+        safe_text = safe_text.replace(country[0], "")
+    return sorted(countries)
+
+
+TEXTS = ADDRESSES + [
+    "In france and trinidad y tobago",
+    "espagne, antigua et barbuda et france",
+    "nouvelle Zélande, kyrgyz republic, weirussland",
+    "Papua New Guinea and Guinea",
+    "South Sudan and Sudan",
+    "République démocratique du Congo, République du Congo",
+    "congo, République démocratique du, congo, république du ",
+    "<li>Country: République du Congo</li><li/>Country: Congo<li/>",
+    "Rue de la Kinshasa, 75000 Paris",
+    "Fiji/Pacific Island",
+    "Bienvenue à Kinshasa, 2 pl. Saint-Pierre, 44000 Nantes",
+    "Welcome to Cyprus, 1800 W Erie Ave, Lorain, OH 44052",
+    "Kairo, Berlin, Wien und Bern",
+]
 
 
 class TestConvert:
@@ -244,3 +363,153 @@ class TestConvert:
         """
         result = find_countries(input_data)
         assert result == expected
+
+
+class TestCountryMentions:
+    @pytest.mark.parametrize("lang", [None, "de", "en", "fr"])
+    @pytest.mark.parametrize("text", TEXTS)
+    def test_same_result_as_iterative_lookups(self, text, lang):
+        assert find_countries(text, lang) == iterative_find_countries(text, lang)
+
+    def test_same_result_as_iterative_lookups_with_overlapping_names(self):
+        for text, lang in overlapping_names(0):
+            assert find_countries(text, lang) == iterative_find_countries(text, lang), (
+                text,
+                lang,
+            )
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            # Names without country hide the other countries
+            ("France, océan Indien", []),
+            ("Russland, Pacific Island, Ägypten", []),
+            # The first language wins, whatever the length of the names
+            ("samoa americana, rwanda", ["RW", "WS"]),
+            ("ultramarinas menores de los estados unidos", ["US"]),
+            ("Port of Spain", ["ES"]),
+        ],
+    )
+    def test_overlapping_names(self, text, expected):
+        assert find_countries(text) == expected
+        assert find_countries(text) == iterative_find_countries(text)
+
+    @pytest.mark.parametrize(
+        "text, expected, found",
+        [
+            # The longest name wins for find_country_mentions, the first
+            # language for find_countries and address_to_country_code
+            ("France, océan Indien", ["FR"], []),
+            ("Samoa Americana", ["AS"], ["WS"]),
+            ("ultramarinas menores de los estados unidos", ["UM"], ["US"]),
+            ("Port of Spain", ["TT"], ["ES"]),
+            # They agree when names do not overlap
+            ("Trinidad y Tobago", ["TT"], ["TT"]),
+        ],
+    )
+    def test_differences_with_find_country_mentions(self, text, expected, found):
+        mentions = find_country_mentions(text)
+        assert [mention.country_code for mention in mentions] == expected
+        assert find_countries(text) == found
+        assert [address_to_country_code(text)] == (found or [None])
+
+    def test_mentions(self):
+        text = "Kairo, Ägypten – Welcome to Côte d’Ivoire! Kairo"
+        mentions = find_country_mentions(text, spans=True)
+        assert [
+            (mention.country_code, mention.name, text[mention.start : mention.end])
+            for mention in mentions
+        ] == [
+            ("EG", "kairo", "Kairo"),
+            ("EG", "agypten", "Ägypten"),
+            ("CI", "cote d'ivoire", "Côte d’Ivoire"),
+            ("EG", "kairo", "Kairo"),
+        ]
+        assert [mention.lang for mention in mentions] == ["de", "de", "en", "de"]
+        assert find_country_mentions(text) == [
+            mention._replace(start=None, end=None) for mention in mentions
+        ]
+
+    @pytest.mark.parametrize("max_results", [0, 1, 3, 10, None])
+    def test_max_results(self, max_results):
+        text = "china, france, spain, china"
+        expected = ["CN", "FR", "ES", "CN"][:max_results]
+        assert [
+            mention.country_code
+            for mention in find_country_mentions(text, max_results=max_results)
+        ] == expected
+
+    def test_lang(self):
+        assert find_country_mentions("Ungarn", lang="de")[0].country_code == "HU"
+        assert find_country_mentions("Ungarn", lang="EN") == []
+        assert find_country_mentions("Ungarn", lang="it") == []
+
+    def test_count_countries(self):
+        assert count_countries("Kairo, Ägypten, Tunisie, Egypt") == {"EG": 3, "TN": 1}
+        assert count_countries("") == {}
+
+
+class TestSinglePass:
+    @pytest.mark.parametrize("lang", [None, "de", "en", "fr", "pt", "es", "it"])
+    @pytest.mark.parametrize("text", ADDRESSES)
+    def test_same_result_as_sequential_lookups(self, text, lang):
+        assert address_to_found_text_and_country_code(
+            text, lang
+        ) == sequential_found_text_and_country_code(text, lang)
+
+
+class TestLongTexts:
+    @pytest.fixture
+    def max_text_length(self):
+        set_max_text_length(50)
+        yield
+        set_max_text_length(None)
+
+    @pytest.mark.parametrize("text", ["a" * 100000, "1" * 100000])
+    def test_long_words(self, text):
+        assert address_to_subdivision_code(text) is None
+
+    def test_town_name_cleaning_only_tries_word_starts(self):
+        # Unanchored, \w+ is retried from every character of long words, which
+        # takes quadratic time (measured by benchmarks.worst_case)
+        assert fr_town_name_cleaning_re.pattern.startswith(r"\b")
+
+    @pytest.mark.parametrize(
+        "text",
+        ADDRESSES
+        + [
+            "Saint-Martin-sur-Loire",
+            "12 rue de Verdun, Ville-sous-Anjou",
+            "Villers-Val-de-Saire, Manche",
+            "x sur",
+            "Montaigu sur Loire-Atlantique",
+        ],
+    )
+    def test_town_name_cleaning_matches_at_word_starts(self, text):
+        unanchored_re = re.compile(r"\w+.\b(sous|sur|val\Wde)\b.(\w+)", flags=re.I)
+        assert fr_town_name_cleaning_re.sub("", text) == unanchored_re.sub("", text)
+
+    @pytest.mark.usefixtures("max_text_length")
+    def test_max_text_length(self):
+        text = "<p>" + "Lorem ipsum " * 1000 + "</p><p>Welcome to Cyprus</p>"
+        assert address_to_country_and_subdivision_codes(text) == ("CY", None)
+        assert explain(address_to_country_and_subdivision_codes, text).result == (
+            "CY",
+            None,
+        )
+        assert address_to_found_text_and_country_code(text) == ("cyprus", "CY")
+        # Like address_to_country_code, it only looks at the most address-like
+        # part of long texts
+        text = "Welcome to Cyprus " + "Lorem ipsum " * 1000 + "<p>2 rue X</p>"
+        assert address_to_found_text_and_country_code(text) == (None, None)
+        assert address_to_country_code(text) is None
+        # The first 50 characters only
+        assert (
+            address_to_subdivision_code("Lorem ipsum " * 10 + "Maine-et-Loire") is None
+        )
+        # Short texts are not changed
+        assert address_to_subdivision_code("Lorem ipsum, Maine-et-Loire") == "49"
+
+    def test_invalid_max_text_length(self):
+        with pytest.raises(ValueError, match="max_length"):
+            set_max_text_length(0)
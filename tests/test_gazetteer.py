@@ -0,0 +1,84 @@
+import pytest
+
+from geoconvert.convert import (
+    country_name_to_country_name_and_code,
+    get_capital_gazetteers,
+    get_country_gazetteers,
+)
+from geoconvert.data import ambiguous_country_names, language_to_country_names
+from geoconvert.gazetteer import Gazetteer, Gazetteers
+from tests.test_lazy import modules_after
+
+country_gazetteers = get_country_gazetteers()
+capital_gazetteers = get_capital_gazetteers()
+
+
+class TestGazetteers:
+    def test_gazetteers_are_read_only(self):
+        gazetteer = country_gazetteers.by_language["en"]
+        with pytest.raises(TypeError):
+            gazetteer.names["atlantis"] = "AT"
+        with pytest.raises(TypeError):
+            country_gazetteers.by_language["it"] = gazetteer
+
+    @pytest.mark.parametrize("gazetteers", [country_gazetteers, capital_gazetteers])
+    def test_unambiguous_gazetteers_share_automatons(self, gazetteers):
+        for lang, gazetteer in gazetteers.unambiguous:
+            assert gazetteer.automaton is gazetteers.by_language[lang].automaton
+            assert not set(ambiguous_country_names) & set(gazetteer.names)
+
+    def test_automatons_are_built_on_first_use(self):
+        gazetteers = Gazetteers(language_to_country_names, ambiguous_country_names)
+        french, english = gazetteers.by_language["fr"], gazetteers.by_language["en"]
+        _, unambiguous_english = gazetteers.unambiguous[1]
+        assert french._automaton is None
+        assert english._automaton is None
+
+        # Building the unambiguous automaton builds the shared one
+        assert unambiguous_english.find("welcome to cyprus") == ("cyprus", "CY")
+        assert english._automaton is unambiguous_english.automaton
+        assert french._automaton is None
+
+    def test_automaton_is_not_built_with_delimited_names(self):
+        gazetteer = Gazetteer({"congo": "CG", "niger": "NE", "mali": "ML"})
+        found = ["mali", "niger", "congo", "chad"]
+        # The longest name wins, then the first one of the gazetteer
+        assert gazetteer.find("mali niger congo chad", found) == ("congo", "CG")
+        assert gazetteer.without(["congo"]).find("", found) == ("niger", "NE")
+        assert gazetteer.find("chad", ["chad"]) == (None, None)
+        assert gazetteer._automaton is None
+        assert gazetteer.find("mali niger congo chad") == ("congo", "CG")
+
+    def test_address_lookups_do_not_build_automatons(self):
+        modules_after(
+            "from geoconvert import address_to_country_code, convert; "
+            "assert address_to_country_code('Bienvenue à Kinshasa') == 'CD'; "
+            "assert address_to_country_code('Willkommen bei Kairo') == 'EG'; "
+            "gazetteers = [convert.get_country_gazetteers(), convert.get_capital_gazetteers()]; "
+            "assert all(gazetteer._automaton is None for gazetteers in gazetteers "
+            "for gazetteer in gazetteers.by_language.values())"
+        )
+
+    @pytest.mark.parametrize(
+        "lang, expected",
+        [
+            (None, list(language_to_country_names)),
+            ("fr", ["fr"]),
+            ("FR", ["fr"]),
+            ("it", []),
+            ("", []),
+        ],
+    )
+    def test_for_lang(self, lang, expected):
+        languages = [language for language, _ in country_gazetteers.for_lang(lang)]
+        assert languages == expected
+
+    def test_same_gazetteers_are_used_on_each_call(self):
+        before = country_gazetteers.for_lang(None)
+        assert country_name_to_country_name_and_code("Island") is None
+        assert country_name_to_country_name_and_code("Island", lang="de") == (
+            "island",
+            "IS",
+        )
+        assert country_gazetteers.for_lang(None) is before
+        assert get_country_gazetteers() is country_gazetteers
@@ -0,0 +1,135 @@
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import geoconvert.data
+from geoconvert import address_to_country_and_subdivision_codes, find_countries
+from geoconvert.data.subdivisions import nuts
+from geoconvert.lazy import build_once
+from tests.test_convert import ADDRESSES, TEXTS
+
+
+def modules_after(statement):
+    """
+    Return the geoconvert modules imported by statement in a new interpreter.
+    """
+    code = (
+        f"import sys; {statement}; "
+        "print(' '.join(name for name in sys.modules if name.startswith('geoconvert')))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+    return set(output.split())
+
+
+class TestLazyLoading:
+    def test_data_modules_are_not_imported_with_geoconvert(self):
+        modules = modules_after("import geoconvert")
+        assert "geoconvert.convert" in modules
+        assert not {name for name in modules if name.startswith("geoconvert.data.")}
+
+    def test_only_the_needed_data_modules_are_imported(self):
+        modules = modules_after(
+            "import geoconvert; geoconvert.br_address_to_state_code('Luz, 01120-010')"
+        )
+        assert "geoconvert.data.subdivisions.brazil" in modules
+        assert "geoconvert.data.subdivisions.nuts" not in modules
+        assert "geoconvert.data.countries" not in modules
+
+    def test_regexes_are_compiled_on_first_use(self):
+        modules = modules_after(
+            "from geoconvert.data.subdivisions import france; "
+            "assert 'fr_postcode_regex' not in vars(france); "
+            "assert france.fr_postcode_regex is france.fr_postcode_regex; "
+            "assert 'fr_postcode_regex' in vars(france)"
+        )
+        assert "geoconvert.data.subdivisions.france" in modules
+
+    def test_unknown_names_are_still_errors(self):
+        with pytest.raises(AttributeError, match="no_such_data"):
+            geoconvert.data.no_such_data
+        with pytest.raises(ImportError):
+            from geoconvert.data import no_such_data  # noqa: F401
+
+    def test_nuts_regexes_by_country(self):
+        regex = nuts.nuts_regexes_by_country["DE"]
+        assert regex.search("region de2").group() == "de2"
+        assert nuts.nuts_regexes_by_country["DE"] is regex
+        with pytest.raises(KeyError):
+            nuts.nuts_regexes_by_country["XX"]
+
+    def test_nuts_by_country_keys_are_known_before_first_use(self):
+        modules_after(
+            "from geoconvert.data.subdivisions import nuts; "
+            "regexes = nuts.nuts_regexes_by_country; "
+            "indexes = nuts.nuts_indexes_by_country; "
+            "assert set(regexes) == set(indexes) == {'DE', 'FR'}; "
+            "assert len(regexes) == len(indexes) == 2; "
+            "assert 'FR' in regexes and 'FR' in indexes; "
+            "assert 'XX' not in regexes and 'XX' not in indexes; "
+            "assert dict(regexes.items())['FR'] is regexes['FR']"
+        )
+
+    def test_load_all(self):
+        geoconvert.data.load_all()
+        loaded_names = set(geoconvert.data.__all__) - geoconvert.data.unused_names
+        assert loaded_names <= set(vars(geoconvert.data))
+        assert set(nuts.nuts_indexes_by_country) == set(nuts.NUTS_CODES_BY_COUNTRY)
+
+
+class TestBuildOnce:
+    def test_built_once_by_concurrent_threads(self):
+        calls = []
+
+        @build_once
+        def table(size):
+            calls.append(size)
+            time.sleep(0.05)
+            return list(range(size))
+
+        barrier = threading.Barrier(8)
+
+        def get(size):
+            barrier.wait()
+            return table(size)
+
+        with ThreadPoolExecutor(8) as executor:
+            tables = list(executor.map(get, [3] * 6 + [4] * 2))
+        assert all(result is tables[0] for result in tables[:6])
+        assert tables[6] is tables[7] == [0, 1, 2, 3]
+        assert sorted(calls) == [3, 4]
+
+    def test_errors_are_not_kept(self):
+        calls = []
+
+        @build_once
+        def table():
+            calls.append(None)
+            if len(calls) == 1:
+                raise ValueError("not yet")
+            return ()
+
+        with pytest.raises(ValueError):
+            table()
+        assert table() == ()
+        assert len(calls) == 2
+
+
+class TestThreads:
+    def test_same_results_from_threads(self):
+        texts = (TEXTS + ADDRESSES) * 4
+
+        def resolve(text):
+            return (
+                address_to_country_and_subdivision_codes(text),
+                find_countries(text, enable_ambiguous_detection=True),
+            )
+
+        expected = [resolve(text) for text in texts]
+        with ThreadPoolExecutor(8) as executor:
+            assert list(executor.map(resolve, texts)) == expected
@@ -0,0 +1,132 @@
+import random
+
+import pytest
+
+from geoconvert.mentions import (
+    MentionFinder,
+    NameOverlaps,
+    _Scan,
+    select_non_overlapping,
+)
+
+
+def greedy_non_overlapping(matches):
+    """
+    Reference implementation: the best matches first, once they are all known.
+    """
+    selected = []
+    for match in sorted(matches, key=lambda match: (match[2], match[0])):
+        if all(match[1] <= other[0] or other[1] <= match[0] for other in selected):
+            selected.append(match)
+    return sorted(selected)
+
+
+def random_matches(rng, max_length):
+    matches = []
+    for index in range(rng.randint(0, 30)):
+        start = rng.randrange(60)
+        end = start + rng.randint(1, max_length)
+        matches.append((start, end, rng.randrange(5), index))
+    return sorted(matches, key=lambda match: match[1])
+
+
+class TestSelectNonOverlapping:
+    @pytest.mark.parametrize("max_length", [1, 3, 10])
+    def test_same_result_as_greedy_selection(self, max_length):
+        rng = random.Random(max_length)
+        for _ in range(1000):
+            matches = random_matches(rng, max_length)
+            assert list(select_non_overlapping(matches, max_length)) == (
+                greedy_non_overlapping(matches)
+            ), matches
+
+    def test_matches_are_yielded_before_the_end(self):
+        def matches():
+            for start in range(0, 1000, 10):
+                yield (start, start + 5, 0, start)
+            raise AssertionError("too many matches read")
+
+        selected = select_non_overlapping(matches(), max_length=5)
+        assert [next(selected) for _ in range(3)] == [
+            (0, 5, 0, 0),
+            (10, 15, 0, 10),
+            (20, 25, 0, 20),
+        ]
+
+
+class TestMentionFinder:
+    def test_names_without_code_block_the_names_they_contain(self):
+        finder = MentionFinder({"island": ("de", "IS"), "pacific island": ("en", None)})
+        assert list(finder.finditer("island, pacific island")) == [
+            (0, 6, "island", "de", "IS")
+        ]
+
+    def test_longest_names_first_then_first_given(self):
+        finder = MentionFinder(
+            {
+                "congo": ("fr", "CG"),
+                "congo kinshasa": ("fr", "CD"),
+                "kinshasa": ("fr", "CD"),
+            }
+        )
+        assert list(finder.finditer("congo kinshasa")) == [
+            (0, 14, "congo kinshasa", "fr", "CD")
+        ]
+        finder = MentionFinder({"ab c": ("en", "X"), "c de": ("en", "Y")})
+        assert list(finder.finditer("ab c de")) == [(0, 4, "ab c", "en", "X")]
+
+    def test_found(self):
+        finder = MentionFinder({"iran": ("en", "IR"), "ran": ("en", None)})
+        found = set()
+        assert list(finder.finditer("iran", found)) == [(0, 4, "iran", "en", "IR")]
+        assert found == {"iran", "ran"}
+
+    def test_scan_chunks_keeps_little_text(self):
+        finder = MentionFinder({"trinidad y tobago": ("es", "TT")})
+        scan = _Scan(finder, None)
+        chunks = ["nothing ", "trinidad y", " tobago ", "to find "] * 1000
+        lengths = []
+        items = []
+        for item in scan.run(chunks):
+            items.append(item)
+            lengths.append(len(scan.text))
+        # The text kept does not grow with the number of chunks
+        assert max(lengths) <= 3 * finder.max_length
+        assert items.count((8, 25, "trinidad y tobago", "es", "TT")) == 1
+        assert "".join(item for item in items if type(item) is str) == (
+            "nothing  to find " * 1000
+        )
+
+    def test_empty(self):
+        assert list(MentionFinder({}).finditer("anything")) == []
+
+
+class TestNameOverlaps:
+    def test_removed_names_remove_the_names_they_overlap(self):
+        finder = MentionFinder({"samoa": ("de", "WS"), "samoa americana": ("es", "AS")})
+        overlaps = finder.name_overlaps("samoa americana, samoa")
+        assert sorted(overlaps.left(set())) == ["samoa", "samoa americana"]
+        assert overlaps.left({"samoa"}) == []
+        # The other "samoa" stays
+        assert overlaps.left({"samoa americana"}) == ["samoa"]
+        assert finder.name_overlaps("samoa americana").left({"samoa americana"}) == []
+
+    def test_names_in_words_are_not_left(self):
+        finder = MentionFinder({"iran": ("en", "IR"), "ran": ("en", None)})
+        assert finder.name_overlaps("iran").left(set()) == ["iran"]
+        assert finder.name_overlaps("iran").left({"iran"}) == []
+
+    def test_same_result_when_scanning_chunks(self):
+        finder = MentionFinder(
+            {
+                "congo": ("fr", "CG"),
+                "congo kinshasa": ("fr", "CD"),
+                "kinshasa": ("fr", "CD"),
+                "république du congo": ("fr", "CG"),
+            }
+        )
+        text = "république du congo kinshasa, congo, kinshasa congo " * 20
+        overlaps = NameOverlaps(finder.max_length)
+        chunks = [text[start : start + 7] for start in range(0, len(text), 7)]
+        list(finder.scan_chunks(chunks, overlaps=overlaps))
+        assert overlaps.by_name == finder.name_overlaps(text).by_name
@@ -0,0 +1,252 @@
+import threading
+
+import mock
+import pytest
+
+from geoconvert import (
+    address_to_country_and_subdivision_codes,
+    address_to_country_code,
+    address_to_subdivision_code,
+    cache_info,
+    convert,
+    disable_cache,
+    disable_metrics,
+    enable_cache,
+    enable_metrics,
+    export_metrics,
+    metrics_snapshot,
+    reset_metrics,
+)
+from geoconvert.metrics import Metrics
+from tests.test_trace import EXAMPLES
+
+
+@pytest.fixture
+def metrics():
+    enable_metrics(sample_rate=1.0, buckets=(0.5,))
+    yield
+    disable_metrics()
+
+
+def path_counts():
+    return {key: stats.count for key, stats in metrics_snapshot().paths.items()}
+
+
+class TestMetrics:
+    def test_invalid_sample_rate(self):
+        for sample_rate in (0, -0.1, 1.5):
+            with pytest.raises(ValueError, match="sample_rate"):
+                Metrics(sample_rate)
+
+    def test_default_sample_rate(self):
+        assert Metrics().sample_rate == 0.01
+        enable_metrics()
+        try:
+            assert metrics_snapshot().sample_rate == 0.01
+        finally:
+            disable_metrics()
+
+    def test_histogram(self):
+        metrics = Metrics(buckets=(0.01, 0.001))
+        for elapsed in (0.0005, 0.001, 0.002, 1):
+            metrics.record("f", "miss", elapsed)
+        metrics.record("f", "cache", 0)
+        paths = metrics.snapshot().paths
+        assert list(paths) == [("f", "cache"), ("f", "miss")]
+        assert paths[("f", "cache")] == (
+            1,
+            0,
+            ((0.001, 1), (0.01, 1), (float("inf"), 1)),
+        )
+        count, total_time, buckets = paths[("f", "miss")]
+        assert count == 4
+        assert total_time == pytest.approx(1.0035)
+        assert buckets == ((0.001, 2), (0.01, 3), (float("inf"), 4))
+
+    def test_concurrent_calls(self):
+        metrics = Metrics(sample_rate=0.5)
+
+        def worker():
+            for _ in range(1000):
+                metrics.observe(len, "key", lambda: 1, "text")
+                metrics.record("len", "miss", 0.001)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        # No call is sampled
+        with mock.patch("random.random", return_value=0.9):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        snapshot = metrics.snapshot()
+        assert snapshot.calls == {"len": 8000}
+        assert snapshot.paths[("len", "miss")].count == 8000
+        metrics.reset()
+        assert metrics.snapshot().calls == {}
+        metrics.observe(len, "key", lambda: 1, "text")
+        assert metrics.snapshot().calls == {"len": 1}
+
+    def test_finished_threads_are_not_kept(self):
+        metrics = Metrics(sample_rate=0.5)
+
+        def worker():
+            metrics.observe(len, "key", lambda: 1, "text")
+            metrics.observe(len, "key", lambda: 1, "text")
+
+        with mock.patch("random.random", return_value=0.9):
+            for _ in range(200):
+                thread = threading.Thread(target=worker)
+                thread.start()
+                thread.join()
+                assert len(metrics._thread_calls) == 1
+        assert metrics.snapshot().calls == {"len": 400}
+        assert metrics._thread_calls == []
+        metrics.reset()
+        assert metrics.snapshot().calls == {}
+
+    def test_unsampled_calls_take_no_lock(self):
+        metrics = Metrics(sample_rate=0.5)
+        with mock.patch("random.random", return_value=0.9):
+            metrics.observe(len, "key", lambda: 1, "text")
+            metrics._lock = mock.MagicMock()
+            metrics.observe(len, "key", lambda: 1, "text")
+            metrics.observe(str, "key", lambda: "", "text")
+        metrics._lock.__enter__.assert_not_called()
+        assert metrics.snapshot().calls == {"len": 2, "str": 1}
+
+
+@pytest.mark.usefixtures("metrics")
+class TestEnabledMetrics:
+    @pytest.mark.parametrize(
+        "function, options",
+        [
+            (address_to_country_code, {"lang": "fr"}),
+            (address_to_subdivision_code, {}),
+            (address_to_country_and_subdivision_codes, {"country": "CA"}),
+            (address_to_country_and_subdivision_codes, {"iso_format": True}),
+        ],
+    )
+    def test_same_results(self, function, options):
+        results = [function(text, **options) for text in EXAMPLES]
+        assert metrics_snapshot().calls == {function.__name__: len(EXAMPLES)}
+        disable_metrics()
+        assert results == [function(text, **options) for text in EXAMPLES]
+
+    def test_resolution_paths(self):
+        for text in [
+            "DE2 région",
+            "Ici, la Côte d’Ivoire",
+            "Kairo",
+            "Montréal, Québec",
+            "Wonderland",
+            "Wonderland",
+        ]:
+            address_to_country_and_subdivision_codes(text)
+        address_to_country_code("Kairo", lang="de")
+        address_to_subdivision_code("Los Angeles, CA", country="us")
+        address_to_subdivision_code("Los Angeles", country="us")
+
+        function = "address_to_country_and_subdivision_codes"
+        assert path_counts() == {
+            (function, "NUTS code"): 1,
+            (function, "capital name (de)"): 1,
+            (function, "ca_province_name_to_province_code (CA)"): 1,
+            (function, "country name (en)"): 1,
+            (function, "miss"): 2,
+            ("address_to_country_code", "capital name (de)"): 1,
+            ("address_to_subdivision_code", "miss"): 1,
+            ("address_to_subdivision_code", "us_address_to_state_code"): 1,
+        }
+        assert metrics_snapshot().calls == {
+            function: 6,
+            "address_to_country_code": 1,
+            "address_to_subdivision_code": 2,
+        }
+
+    def test_cached_results(self):
+        enable_cache()
+        try:
+            for _ in range(3):
+                assert address_to_country_code("Kairo") == "EG"
+            info = cache_info()
+        finally:
+            disable_cache()
+        assert path_counts() == {
+            ("address_to_country_code", "cache"): 2,
+            ("address_to_country_code", "capital name (de)"): 1,
+        }
+        assert (info.hits, info.misses, info.currsize) == (2, 1, 1)
+
+    @pytest.mark.parametrize("random, sampled", [(0.2, True), (0.3, False)])
+    def test_sample_rate(self, random, sampled):
+        enable_metrics(sample_rate=0.25)
+        with mock.patch("random.random", return_value=random):
+            assert address_to_country_code("Kairo") == "EG"
+        snapshot = metrics_snapshot()
+        assert snapshot.sample_rate == 0.25
+        assert snapshot.calls == {"address_to_country_code": 1}
+        assert bool(snapshot.paths) is sampled
+
+    def test_unsampled_cached_results(self):
+        enable_metrics(sample_rate=0.25)
+        enable_cache()
+        try:
+            with mock.patch("random.random", return_value=0.5):
+                address_to_country_code("Kairo")
+                address_to_country_code("Kairo")
+            info = cache_info()
+        finally:
+            disable_cache()
+        assert (info.hits, info.misses) == (1, 1)
+
+    def test_explain_errors_do_not_break_calls(self, caplog):
+        with mock.patch("geoconvert.metrics.explain", side_effect=AttributeError):
+            assert address_to_country_code("Kairo") == "EG"
+        assert path_counts() == {("address_to_country_code", "unknown"): 1}
+        assert "cannot explain address_to_country_code('Kairo')" in caplog.text
+
+    def test_reset(self):
+        address_to_country_code("Kairo")
+        reset_metrics()
+        assert metrics_snapshot() == (1.0, {}, {})
+        address_to_country_code("Kairo")
+        assert metrics_snapshot().calls == {"address_to_country_code": 1}
+
+    def test_export(self):
+        address_to_subdivision_code("Los Angeles, CA", country="us")
+        with mock.patch("geoconvert.metrics.time") as time:
+            time.perf_counter.side_effect = [1.0, 2.5]
+            address_to_country_code("Kairo", lang="de")
+
+        lines = export_metrics().splitlines()
+        assert lines[:7] == [
+            "# HELP geoconvert_sample_rate Share of the calls timed by resolution path.",
+            "# TYPE geoconvert_sample_rate gauge",
+            "geoconvert_sample_rate 1.0",
+            "# HELP geoconvert_calls_total Calls of the main address functions.",
+            "# TYPE geoconvert_calls_total counter",
+            'geoconvert_calls_total{function="address_to_country_code"} 1',
+            'geoconvert_calls_total{function="address_to_subdivision_code"} 1',
+        ]
+        labels = 'function="address_to_country_code",path="capital name (de)"'
+        assert lines[9:13] == [
+            "geoconvert_resolution_seconds_bucket{" + labels + ',le="0.5"} 0',
+            "geoconvert_resolution_seconds_bucket{" + labels + ',le="+Inf"} 1',
+            "geoconvert_resolution_seconds_sum{" + labels + "} 1.5",
+            "geoconvert_resolution_seconds_count{" + labels + "} 1",
+        ]
+        assert len(lines) == 17
+
+    def test_export_escapes_labels(self):
+        convert._metrics.record("f", 'say "hi"\\\n', 0.1)
+        assert export_metrics(prefix="geo").splitlines()[-1] == (
+            'geo_resolution_seconds_count{function="f",path="say \\"hi\\"\\\\\\n"} 1'
+        )
+
+
+class TestDisabledMetrics:
+    def test_nothing_is_recorded(self):
+        address_to_country_code("Kairo")
+        reset_metrics()
+        assert metrics_snapshot() is None
+        assert export_metrics() == ""
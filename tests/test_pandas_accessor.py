@@ -0,0 +1,111 @@
+import importlib
+import sys
+
+import mock
+import pytest
+
+from geoconvert import (
+    address_to_country_and_subdivision_codes,
+    address_to_country_code,
+    address_to_subdivision_code,
+)
+
+pandas = pytest.importorskip("pandas")
+pytest.importorskip("geoconvert.pandas_accessor")
+
+ADDRESSES = ["14467 Potsdam", "Kairo", "Montréal, Québec", "Wonderland", "Roma"]
+
+
+@pytest.fixture
+def series():
+    values = ADDRESSES * 3 + [None, float("nan")]
+    return pandas.Series(values, index=range(100, 100 + len(values)), name="address")
+
+
+def expected(series, function, **options):
+    return [
+        function(value, **options) if isinstance(value, str) else None
+        for value in series
+    ]
+
+
+def values(result):
+    return [None if pandas.isna(value) else value for value in result]
+
+
+class TestGeoconvertAccessor:
+    @pytest.mark.parametrize(
+        "lang, country", [(None, None), ("de", None), (None, "CA")]
+    )
+    def test_country_and_subdivision(self, series, lang, country):
+        result = series.geoconvert.country_and_subdivision(lang=lang, country=country)
+        assert list(result.columns) == ["country_code", "subdivision_code"]
+        assert (result.index == series.index).all()
+        assert (result.dtypes == "category").all()
+        codes = expected(
+            series,
+            address_to_country_and_subdivision_codes,
+            lang=lang,
+            country=country,
+        )
+        assert values(result.country_code) == [code and code[0] for code in codes]
+        assert values(result.subdivision_code) == [code and code[1] for code in codes]
+
+    def test_iso_format(self, series):
+        result = series.geoconvert.country_and_subdivision(iso_format=True)
+        assert result.name == "iso_code"
+        assert result.dtype == "category"
+        assert values(result) == expected(
+            series, address_to_country_and_subdivision_codes, iso_format=True
+        )
+
+    @pytest.mark.parametrize("lang", [None, "de"])
+    def test_country_code(self, series, lang):
+        result = series.geoconvert.country_code(lang=lang)
+        assert result.name == "country_code"
+        assert values(result) == expected(series, address_to_country_code, lang=lang)
+
+    @pytest.mark.parametrize("country", [None, "DE"])
+    def test_subdivision_code(self, series, country):
+        result = series.geoconvert.subdivision_code(country=country)
+        assert result.name == "subdivision_code"
+        assert values(result) == expected(
+            series, address_to_subdivision_code, country=country
+        )
+
+    def test_distinct_values_resolved_once(self, series):
+        with mock.patch(
+            "geoconvert.pandas_accessor.address_to_country_code",
+            side_effect=address_to_country_code,
+        ) as function:
+            series.geoconvert.country_code()
+        assert sorted(call.args[0] for call in function.call_args_list) == sorted(
+            ADDRESSES
+        )
+
+    def test_categories(self, series):
+        result = series.geoconvert.country_and_subdivision()
+        assert result.country_code.cat.categories.tolist() == ["CA", "DE", "EG"]
+        assert result.subdivision_code.cat.categories.tolist() == ["BB", "QC"]
+
+    def test_values_which_are_not_texts(self):
+        series = pandas.Series([44000, 29000, 44000])
+        assert values(series.geoconvert.subdivision_code(country="FR")) == [
+            "44",
+            "29",
+            "44",
+        ]
+
+    def test_empty(self):
+        series = pandas.Series([], dtype=object)
+        result = series.geoconvert.country_and_subdivision()
+        assert list(result.columns) == ["country_code", "subdivision_code"]
+        assert result.empty
+        assert series.geoconvert.country_code().empty
+
+    def test_missing_pandas(self):
+        # sys.modules is restored as it was when leaving patch.dict
+        with mock.patch.dict(sys.modules, {"pandas": None}):
+            del sys.modules["geoconvert.pandas_accessor"]
+            with pytest.raises(ImportError, match=r"geoconvert\[pandas\]"):
+                importlib.import_module("geoconvert.pandas_accessor")
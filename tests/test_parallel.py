@@ -0,0 +1,109 @@
+import mock
+import pytest
+
+from geoconvert import (
+    address_to_country_and_subdivision_codes,
+    address_to_country_code,
+    parallel,
+)
+from geoconvert.parallel import (
+    WorkerPool,
+    close_parallel_pool,
+    parallel_addresses_to_country_and_subdivision_codes,
+    parallel_batch,
+)
+
+ADDRESSES = [
+    "14467 Potsdam",
+    "Kairo",
+    "Montréal, QC",
+    "Wonderland",
+    "1800 W Erie Ave, Lorain, OH 44052",
+    "2 pl. Saint-Pierre, 44000 Nantes, France",
+] * 20 + [f"{postcode:05} Nantes, France" for postcode in range(44000, 44100)]
+
+
+@pytest.fixture
+def pool():
+    with WorkerPool(processes=2, min_parallel_size=0) as pool:
+        yield pool
+
+
+class TestWorkerPool:
+    def test_same_results_as_serial(self, pool):
+        expected = [
+            address_to_country_and_subdivision_codes(text) for text in ADDRESSES
+        ]
+        assert (
+            pool.batch(address_to_country_and_subdivision_codes, ADDRESSES) == expected
+        )
+        # Workers are reused, with any chunk size and any options
+        expected = [address_to_country_code(text, lang="de") for text in ADDRESSES]
+        assert (
+            pool.batch(address_to_country_code, ADDRESSES, chunk_size=7, lang="de")
+            == expected
+        )
+
+    def test_small_batches_are_resolved_serially(self):
+        with WorkerPool(processes=2, min_parallel_size=1000) as pool:
+            assert pool.batch(address_to_country_code, ADDRESSES) == [
+                address_to_country_code(text) for text in ADDRESSES
+            ]
+            assert pool._executor is None
+
+    @pytest.mark.parametrize(
+        "processes, distinct_count, expected",
+        [(4, 100, 64), (4, 100000, 4096), (4, 10000, 625), (1, 0, 64)],
+    )
+    def test_chunk_size(self, processes, distinct_count, expected):
+        assert WorkerPool(processes).chunk_size(distinct_count) == expected
+
+    def test_close_twice(self, pool):
+        pool.close()
+        pool.close()
+
+    def test_worker_functions(self):
+        # NOTE: these run in workers, call them here to keep a 100% coverage
+        parallel._warm_up()
+        assert parallel._resolve_chunk(address_to_country_code, ["Kairo"], {}) == ["EG"]
+
+
+class TestParallelBatch:
+    def test_shared_pool(self):
+        try:
+            with mock.patch.object(WorkerPool, "batch", return_value=[]) as pool_batch:
+                assert parallel_batch(address_to_country_code, [], lang="fr") == []
+                (first_pool,) = parallel._default_pools.values()
+                parallel_addresses_to_country_and_subdivision_codes([])
+                assert list(parallel._default_pools.values()) == [first_pool]
+                parallel_batch(address_to_country_code, [], processes=3)
+                assert parallel._default_pools[3].processes == 3
+                # The other pool is left open for the threads using it
+                assert parallel._default_pools[first_pool.processes] is first_pool
+            pool_batch.assert_any_call(
+                address_to_country_code, [], chunk_size=None, lang="fr"
+            )
+        finally:
+            close_parallel_pool()
+        assert parallel._default_pools == {}
+        # Nothing to stop anymore
+        close_parallel_pool()
+
+    def test_pools_are_not_closed_while_used(self):
+        first_pool = WorkerPool(2)
+        with mock.patch.dict(parallel._default_pools, {2: first_pool}):
+            with mock.patch.object(WorkerPool, "close") as close:
+                with mock.patch.object(WorkerPool, "batch", return_value=[]):
+                    parallel_batch(address_to_country_code, [], processes=4)
+                    parallel_batch(address_to_country_code, [], processes=2)
+                close.assert_not_called()
+            assert parallel._default_pools[2] is first_pool
+            assert parallel._default_pools[4].processes == 4
+
+    def test_parallel_addresses_to_country_and_subdivision_codes(self):
+        try:
+            assert parallel_addresses_to_country_and_subdivision_codes(
+                ADDRESSES[:6], iso_format=True
+            ) == ["DE-BB", "EG", None, None, "US-OH", "FR-44"]
+        finally:
+            close_parallel_pool()
@@ -0,0 +1,91 @@
+import sys
+
+import mock
+import pytest
+
+from geoconvert.data import (
+    BR_POSTCODES_RANGE,
+    BR_POSTCODES_TABLE,
+    DE_POSTCODE_RANGE,
+    DE_POSTCODE_TABLE,
+)
+from geoconvert.ranges import DenseTable, RangeTable
+
+
+def linear_get(upper_bound_to_code, value):
+    """
+    Reference implementation: the first range whose upper bound is not lower.
+    """
+    for bound, code in upper_bound_to_code.items():
+        if bound >= value:
+            return code
+
+
+class TestRangeTable:
+    def test_unreachable_bounds_are_dropped(self):
+        table = RangeTable({10: "A", 30: "B", 20: "C", 25: "D", 40: "E"})
+        assert table.bounds == (10, 30, 40)
+        assert table.codes == ("A", "B", "E")
+
+    def test_empty(self):
+        assert RangeTable({}).get(0) is None
+
+    @pytest.mark.parametrize(
+        "upper_bound_to_code, table, maximum",
+        [
+            (DE_POSTCODE_RANGE, DE_POSTCODE_TABLE, 99999),
+            (BR_POSTCODES_RANGE, BR_POSTCODES_TABLE, 999),
+        ],
+    )
+    def test_same_result_as_linear_search(self, upper_bound_to_code, table, maximum):
+        values = set(range(0, maximum + 2, 7))
+        for bound in upper_bound_to_code:
+            values.update((bound - 1, bound, bound + 1))
+        for value in values:
+            assert table.get(value) == linear_get(upper_bound_to_code, value)
+
+    def test_get_many(self):
+        numpy = pytest.importorskip("numpy")
+        table = RangeTable({10: "A", 30: "B", 20: "C", 40: "E"})
+        values = numpy.array([0, 10, 11, 25, 40, 41])
+        assert table.get_many(values).tolist() == [table.get(v) for v in values]
+
+    def test_get_many_without_numpy(self):
+        with mock.patch.dict(sys.modules, {"numpy": None}):
+            with pytest.raises(ImportError, match="NumPy"):
+                RangeTable({10: "A"}).get_many([1, 2])
+
+
+class TestDenseTable:
+    def test_codes_are_stored_once(self):
+        table = DenseTable(10)
+        table.set(0, 5, "A")
+        table.set(5, 10, "A")
+        table.set(8, 9, "B")
+        assert table.codes == [None, "A", "B"]
+        assert [table.get(value) for value in (-1, 0, 8, 9, 10)] == [
+            None,
+            "A",
+            "B",
+            "A",
+            None,
+        ]
+
+    def test_too_many_codes(self):
+        table = DenseTable(1000)
+        for value in range(DenseTable.MAX_CODES):
+            table.set(value, value + 1, str(value))
+        with pytest.raises(ValueError):
+            table.set(999, 1000, "one too many")
+
+    def test_get_many(self):
+        numpy = pytest.importorskip("numpy")
+        table = DenseTable(10)
+        table.set(2, 4, "A")
+        values = numpy.array([[-5, 0, 2], [3, 9, 10]])
+        assert table.get_many(values).tolist() == [[None, None, "A"], ["A", None, None]]
+
+    def test_get_many_without_numpy(self):
+        with mock.patch.dict(sys.modules, {"numpy": None}):
+            with pytest.raises(ImportError, match="NumPy"):
+                DenseTable(10).get_many([1, 2])
@@ -0,0 +1,174 @@
+import importlib
+import re
+
+import mock
+import pytest
+
+from geoconvert import (
+    address_to_country_and_subdivision_codes,
+    address_to_subdivision_code,
+    data,
+    explain,
+    regex_backend,
+)
+from geoconvert.regex_backend import (
+    BackendRegex,
+    available_regex_backends,
+    get_regex_backend,
+    set_regex_backend,
+)
+from geoconvert.utils import safe_string
+from tests.test_convert import TEXTS
+
+BACKEND_REGEXES = [
+    "br_state_code_backend_regex",
+    "br_state_name_backend_regex",
+    "ca_province_code_backend_regex",
+    "ca_province_name_backend_regex",
+    "de_land_code_backend_regex",
+    "de_land_hauptstadt_backend_regex",
+    "de_land_name_backend_regex",
+    "fr_department_name_backend_regex",
+    "fr_region_name_backend_regex",
+    "us_state_code_backend_regex",
+    "us_state_name_backend_regex",
+]
+
+CORPUS = (
+    TEXTS
+    + [safe_string(text) for text in TEXTS]
+    + list(data.us_states)
+    + list(data.fr_departments)
+    + list(data.de_landers)
+    + [
+        # Word boundaries and spaces which are not ASCII ones
+        "ÉSP, Brasil",
+        "Öhio, BÉrlin",
+        "Lorain, OH\v44052",
+        "Lorain, OH 44052",
+        "Bonn_Berlin",
+        "ＮＹ 10001",
+        "DEA1x DE2",
+    ]
+)
+
+
+@pytest.fixture(params=["re2", "regex"])
+def backend(request):
+    pytest.importorskip(request.param)
+    previous_backend = get_regex_backend()
+    set_regex_backend(request.param)
+    yield request.param
+    set_regex_backend(previous_backend)
+
+
+def matches(regex, texts):
+    result = []
+    for text in texts:
+        match = regex.search(text)
+        result.append(match and (match.span(), match.groups()))
+    return result
+
+
+class TestBackends:
+    @pytest.mark.parametrize("name", BACKEND_REGEXES)
+    def test_same_matches_as_re(self, backend, name):
+        regex = getattr(data, name)
+        expected = matches(getattr(data, name.replace("_backend", "")), CORPUS)
+        assert matches(regex, CORPUS) == expected
+        assert backend in regex._compiled
+
+    @pytest.mark.parametrize(
+        "function",
+        [address_to_subdivision_code, address_to_country_and_subdivision_codes],
+    )
+    def test_same_results(self, backend, function):
+        results = [function(text) for text in CORPUS]
+        explained = [explain(function, text).result for text in CORPUS]
+        set_regex_backend("re")
+        assert results == explained == [function(text) for text in CORPUS]
+
+    def test_texts_which_are_not_ascii_are_searched_with_re(self):
+        pytest.importorskip("re2")
+        regex = BackendRegex(r"\bSP\b")
+        with mock.patch.object(regex_backend, "_backend", "re2"):
+            assert regex.search("Sao Paulo, SP, Brasil")
+            assert list(regex._compiled) == ["re2"]
+            assert not regex.search("Sao Paulo, ÉSP, Brasil")
+            assert not regex.search("Sao Paulo,\vÉSP, Brasil")
+            assert list(regex._compiled) == ["re2", "re"]
+
+    def test_short_texts_are_searched_with_re(self):
+        pytest.importorskip("re2")
+        regex = BackendRegex(r"\bSP\b")
+        with mock.patch.object(regex_backend, "_backend", "re2"):
+            assert regex.search("SP, Brasil")
+            assert list(regex._compiled) == ["re"]
+
+
+@pytest.mark.parametrize("name", BACKEND_REGEXES)
+def test_public_regexes_are_re_patterns(name):
+    regex = getattr(data, name.replace("_backend", ""))
+    assert isinstance(regex, re.Pattern)
+    assert (regex.pattern, regex.flags) == (
+        getattr(data, name).pattern,
+        getattr(data, name).flags | re.U,
+    )
+
+
+class TestBackendRegex:
+    def test_other_methods_use_re(self):
+        regex = BackendRegex(r"(?P<land>bonn|berlin)", re.I)
+        assert regex.sub("x", "Bonn, Berlin") == "x, x"
+        assert [match.group("land") for match in regex.finditer("Bonn, Berlin")] == [
+            "Bonn",
+            "Berlin",
+        ]
+        assert regex.groupindex == {"land": 1}
+        assert regex.pattern == "(?P<land>bonn|berlin)"
+        assert regex.flags == re.I
+        assert list(regex._compiled) == ["re"]
+        with pytest.raises(AttributeError):
+            regex._missing
+        assert repr(regex) == "<BackendRegex '(?P<land>bonn|berlin)'...>"
+
+
+class TestSetRegexBackend:
+    @pytest.fixture(autouse=True)
+    def restore_backend(self):
+        previous_backend = get_regex_backend()
+        yield
+        set_regex_backend(previous_backend)
+
+    def test_auto(self):
+        with mock.patch.object(regex_backend, "find_spec", return_value=None):
+            set_regex_backend("auto")
+            assert get_regex_backend() == "re"
+            assert available_regex_backends() == ["re"]
+        with mock.patch.object(regex_backend, "find_spec", return_value=object()):
+            set_regex_backend()
+            assert get_regex_backend() == "re2"
+            assert available_regex_backends() == ["re", "re2", "regex"]
+
+    def test_missing_backend(self):
+        set_regex_backend("re")
+        with mock.patch.object(regex_backend, "find_spec", return_value=None):
+            with pytest.raises(ImportError, match=r"pip install geoconvert\[re2\]"):
+                set_regex_backend("re2")
+        assert get_regex_backend() == "re"
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError, match="one of re, re2, regex"):
+            set_regex_backend("pcre")
+
+    @pytest.mark.parametrize("variable, expected", [("re", "re"), (None, "auto")])
+    def test_environment_variable(self, variable, expected):
+        environ = {} if variable is None else {"GEOCONVERT_REGEX_BACKEND": variable}
+        with mock.patch.dict("os.environ", environ, clear=True):
+            module = importlib.reload(regex_backend)
+        try:
+            assert module._requested_backend == expected
+            assert module._backend is None
+            assert module.get_regex_backend() in ("re", "re2")
+        finally:
+            importlib.reload(regex_backend)
@@ -0,0 +1,218 @@
+import itertools
+from threading import Event, current_thread
+
+import mock
+import pytest
+
+from geoconvert import (
+    address_to_country_and_subdivision_codes,
+    address_to_country_code,
+    address_to_subdivision_code,
+    clear_slow_calls,
+    disable_cache,
+    disable_metrics,
+    disable_slow_log,
+    dropped_slow_calls,
+    enable_cache,
+    enable_metrics,
+    enable_slow_log,
+    explain,
+    metrics_snapshot,
+    slow_calls,
+)
+from geoconvert.slowlog import SlowCall, SlowCallLog
+
+
+@pytest.fixture
+def slow_log():
+    enable_slow_log(threshold=0)
+    yield
+    disable_slow_log()
+
+
+@pytest.fixture
+def clock():
+    """
+    Make every call of the main address functions take 0.25 second.
+    """
+    with mock.patch("geoconvert.slowlog.time") as time:
+        time.perf_counter.side_effect = itertools.count(0, 0.25)
+        time.time.return_value = 1234.5
+        yield time
+
+
+class TestSlowCallLog:
+    def test_invalid_threshold(self):
+        with pytest.raises(ValueError, match="positive or zero"):
+            SlowCallLog(threshold=-1)
+        assert SlowCallLog(threshold=0).threshold == 0
+
+    @pytest.mark.parametrize("threshold, recorded", [(0.2, True), (0.25, False)])
+    def test_threshold(self, clock, threshold, recorded):
+        enable_slow_log(threshold=threshold)
+        try:
+            assert address_to_country_code("Kairo", lang="de") == "EG"
+            calls = slow_calls()
+        finally:
+            disable_slow_log()
+        assert calls == (
+            [
+                SlowCall(
+                    "address_to_country_code",
+                    "Kairo",
+                    5,
+                    {"lang": "de"},
+                    "capital name (de)",
+                    mock.ANY,
+                    0.25,
+                    1234.5,
+                )
+            ]
+            if recorded
+            else []
+        )
+
+    def test_callback_and_ring_buffer(self):
+        called = Event()
+        callback = mock.Mock(side_effect=lambda call: called.set())
+        enable_slow_log(threshold=0, maxlen=2, callback=callback)
+        try:
+            for text in ("Kairo", "Montréal, Québec", "Wonderland"):
+                address_to_country_and_subdivision_codes(text, iso_format=True)
+                # Not more calls than maxlen wait for the callback
+                assert called.wait(5)
+                called.clear()
+            calls = slow_calls()
+        finally:
+            disable_slow_log()
+        assert [(call.text, call.path) for call in calls] == [
+            ("Montréal, Québec", "ca_province_name_to_province_code (CA)"),
+            ("Wonderland", "miss"),
+        ]
+        assert [call.args[0].text for call in callback.call_args_list] == [
+            "Kairo",
+            "Montréal, Québec",
+            "Wonderland",
+        ]
+        assert calls[0].options == {"lang": None, "country": None, "iso_format": True}
+
+    def test_long_texts_are_truncated(self):
+        text = "<p>" + "Lorem ipsum " * 100 + "</p><p>Maine-et-Loire</p>"
+        enable_slow_log(threshold=0, max_text_length=20)
+        try:
+            assert address_to_subdivision_code(text) == "49"
+            (call,) = slow_calls()
+        finally:
+            disable_slow_log()
+        assert call.text == "<p>Lorem ipsum Lorem"
+        assert call.length == len(text)
+        # Explained from its most address-like part
+        assert call.path == "fr_dept_name_to_dept_code (FR)"
+        assert call.slowest_stage is not None
+
+    @pytest.mark.usefixtures("slow_log")
+    def test_explain_errors_do_not_break_calls(self, caplog):
+        with mock.patch("geoconvert.slowlog.explain", side_effect=AttributeError):
+            assert address_to_country_code("Kairo") == "EG"
+            assert slow_calls()[0][4:6] == ("unknown", None)
+        assert "cannot explain address_to_country_code('Kairo')" in caplog.text
+
+    @pytest.mark.usefixtures("slow_log")
+    def test_calls_are_explained_once_when_read(self):
+        with mock.patch("geoconvert.slowlog.explain", wraps=explain) as explained:
+            assert address_to_country_code("Kairo") == "EG"
+            explained.assert_not_called()
+            assert slow_calls()[0].path == "capital name (de)"
+            assert slow_calls()[0].path == "capital name (de)"
+        explained.assert_called_once_with(address_to_country_code, "Kairo", lang=None)
+
+    def test_callback_is_called_in_background(self):
+        threads = []
+        callback = mock.Mock(side_effect=lambda call: threads.append(current_thread()))
+        enable_slow_log(threshold=0, callback=callback)
+        try:
+            address_to_country_code("Kairo")
+        finally:
+            disable_slow_log()
+        assert callback.call_args.args[0].path == "capital name (de)"
+        assert threads != [current_thread()]
+
+    def test_callback_backlog_is_bounded(self):
+        started, release = Event(), Event()
+        callback = mock.Mock(side_effect=lambda call: started.set() or release.wait())
+        log = SlowCallLog(threshold=0, maxlen=3, callback=callback)
+        text = "Kairo " * 1000
+        log.record(address_to_country_code, text, {}, 0.5)
+        started.wait()
+        # The first call is being passed to the callback, which is stuck
+        for _ in range(100):
+            log.record(address_to_country_code, text, {}, 0.5)
+        assert len(log._pending) == 3
+        assert log.dropped_calls == 97
+        assert all(len(call.explained_text) <= 200 for call in log._pending)
+        release.set()
+        log.close()
+        assert callback.call_count == 4
+        assert callback.call_args.args[0].length == len(text)
+
+    def test_dropped_slow_calls(self):
+        assert dropped_slow_calls() is None
+        enable_slow_log(threshold=0, callback=mock.Mock())
+        try:
+            assert dropped_slow_calls() == 0
+        finally:
+            disable_slow_log()
+
+    def test_closed_log(self):
+        callback = mock.Mock()
+        log = SlowCallLog(threshold=0, callback=callback)
+        log.close()
+        log.record(address_to_country_code, "Kairo", {}, 0.5)
+        callback.assert_not_called()
+        assert log.calls()[0].path == "capital name (de)"
+
+    def test_callback_errors_do_not_break_calls(self, caplog):
+        enable_slow_log(threshold=0, callback=mock.Mock(side_effect=ValueError))
+        try:
+            assert address_to_country_code("Kairo") == "EG"
+            assert len(slow_calls()) == 1
+        finally:
+            disable_slow_log()
+        assert "slow call callback failed" in caplog.text
+
+    @pytest.mark.usefixtures("slow_log")
+    def test_no_stage(self):
+        assert address_to_subdivision_code("Kairo", country="XX") is None
+        assert slow_calls()[0][4:6] == ("miss", None)
+
+    @pytest.mark.usefixtures("slow_log")
+    def test_cached_results_are_not_timed(self):
+        enable_cache()
+        try:
+            address_to_country_code("Kairo")
+            address_to_country_code("Kairo")
+        finally:
+            disable_cache()
+        assert len(slow_calls()) == 1
+
+    @pytest.mark.usefixtures("slow_log")
+    def test_with_metrics(self):
+        enable_metrics()
+        try:
+            address_to_country_code("Kairo")
+            calls = metrics_snapshot().calls
+        finally:
+            disable_metrics()
+        assert calls == {"address_to_country_code": 1}
+        assert len(slow_calls()) == 1
+
+    @pytest.mark.usefixtures("slow_log")
+    def test_clear(self):
+        address_to_country_code("Kairo")
+        clear_slow_calls()
+        assert slow_calls() == []
+
+    def test_disabled(self):
+        address_to_country_code("Kairo")
+        clear_slow_calls()
+        assert slow_calls() is None
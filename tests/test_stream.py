@@ -0,0 +1,177 @@
+import io
+import mmap
+import random
+
+import mock
+import pytest
+
+from geoconvert import (
+    find_countries,
+    find_countries_in_stream,
+    find_country_mentions,
+    iter_country_mentions,
+    stream,
+)
+from geoconvert.stream import _iter_windows, iter_text_chunks
+from tests.test_convert import ADDRESSES, TEXTS, overlapping_names
+
+
+def split(text, rng, max_size=20):
+    """
+    Split text into chunks of random sizes, some of them empty.
+    """
+    chunks = []
+    while text:
+        size = rng.randint(0, max_size)
+        chunks.append(text[:size])
+        text = text[size:]
+    return chunks
+
+
+def documents():
+    rng = random.Random(15)
+    texts = TEXTS + ADDRESSES + ["FR, DE and CH", "NO X", "ÉTATS-UNIS, FR"]
+    # Overlapping names, found by find_countries one language after the other
+    texts += ["Port of Spain", "Samoa Americana", "norfolk, panama, ocean indien"]
+    for text in texts:
+        yield text
+    for _ in range(200):
+        yield rng.choice(["\n", " ", ", ", " - "]).join(
+            rng.sample(texts, rng.randint(2, 6))
+        )
+
+
+class TestIterTextChunks:
+    def test_text(self):
+        assert list(iter_text_chunks("Côte d’Ivoire")) == ["Côte d’Ivoire"]
+        assert list(iter_text_chunks("Côte d’Ivoire".encode())) == ["Côte d’Ivoire"]
+
+    def test_files(self, tmp_path):
+        text = "Côte d’Ivoire, " * 100
+        assert "".join(iter_text_chunks(io.StringIO(text), chunk_size=7)) == text
+        file = io.BytesIO(text.encode())
+        assert "".join(iter_text_chunks(file, chunk_size=7)) == text
+        path = tmp_path / "text.txt"
+        path.write_text(text, encoding="utf-8")
+        with path.open("rb") as file, mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped:
+            assert "".join(iter_text_chunks(mapped, chunk_size=7)) == text
+
+    def test_truncated_character(self):
+        with pytest.raises(UnicodeDecodeError):
+            list(iter_text_chunks([b"C\xc3"]))
+
+
+class TestFindCountriesInStream:
+    @pytest.mark.parametrize("enable_ambiguous_detection", [False, True])
+    def test_same_result_as_find_countries(self, enable_ambiguous_detection):
+        rng = random.Random(int(enable_ambiguous_detection))
+        for text in documents():
+            assert find_countries_in_stream(
+                split(text, rng), enable_ambiguous_detection=enable_ambiguous_detection
+            ) == find_countries(
+                text, enable_ambiguous_detection=enable_ambiguous_detection
+            ), text
+
+    def test_same_result_as_find_countries_with_overlapping_names(self):
+        rng = random.Random(5)
+        for text, lang in overlapping_names(1):
+            assert find_countries_in_stream(split(text, rng), lang) == (
+                find_countries(text, lang)
+            ), (text, lang)
+
+    @pytest.mark.parametrize("lang", ["de", "en", "fr"])
+    def test_lang(self, lang):
+        rng = random.Random(lang)
+        for text in TEXTS:
+            assert find_countries_in_stream(
+                split(text, rng), lang=lang
+            ) == find_countries(text, lang=lang)
+
+    def test_names_left_in_text(self):
+        # "georgia" is hidden by "ocean indien", which has no country code, so
+        # find_countries leaves it in the text and finds the US state
+        text = "ilhas georgia do sul e sandwich do sul-italien-ocean indien"
+        assert find_countries_in_stream(split(text, random.Random(4)), lang="es") == (
+            find_countries(text, lang="es")
+        )
+        assert find_countries(text, lang="es") == ["US"]
+        # "georgia" is removed from "islas georgia del sur" without country code
+        text = "tansania-islas georgia del sur y islas sandwich del sur"
+        assert find_countries_in_stream([text]) == find_countries(text) == ["GE", "TZ"]
+
+    def test_windows(self):
+        rng = random.Random(3)
+        text = "Kairo " * 20 + "Lorain, OH 44052 " + "Kairo " * 20 + "Potsdam"
+        with mock.patch("geoconvert.stream.WINDOW_SIZE", 40), mock.patch(
+            "geoconvert.stream.WINDOW_OVERLAP", 10
+        ):
+            assert find_countries_in_stream(split(text, rng)) == ["DE", "EG"]
+            assert find_countries_in_stream("Kairo, H3T 1X6 Potsdam") == ["CA", "EG"]
+        assert find_countries(text) == ["DE", "EG"]
+
+    def test_codes_split_between_chunks(self):
+        chunks = ["F", "R, D", "E ", "ABC", "DE", "F CH"]
+        assert find_countries_in_stream(
+            chunks, enable_ambiguous_detection=True
+        ) == find_countries("".join(chunks), enable_ambiguous_detection=True)
+        assert find_countries_in_stream(chunks, enable_ambiguous_detection=True) == [
+            "CH",
+            "DE",
+            "FR",
+        ]
+
+    def test_long_words_are_not_searched_from_every_character(self):
+        text = "A" * 200000 + " FR"
+        with mock.patch.object(
+            stream, "_last_word_re", mock.Mock(wraps=stream._last_word_re)
+        ) as last_word_re:
+            assert find_countries_in_stream(
+                io.StringIO(text), enable_ambiguous_detection=True
+            ) == ["FR"]
+        # Only the last characters of each chunk are searched
+        assert last_word_re.search.call_count == 4
+        for (chunk_text, pos), _ in last_word_re.search.call_args_list:
+            assert len(chunk_text) - pos <= 3
+        assert find_countries_in_stream(
+            ["B" * 10, "A" * 10 + " DE", " C", "H"], enable_ambiguous_detection=True
+        ) == ["CH", "DE"]
+
+
+class TestIterCountryMentions:
+    def test_same_result_as_find_country_mentions(self):
+        rng = random.Random(0)
+        for text in documents():
+            assert list(iter_country_mentions(split(text, rng))) == (
+                find_country_mentions(text)
+            ), text
+
+    def test_file(self):
+        file = io.BytesIO("Trinidad y Tobago, Costa de Marfil\n".encode() * 1000)
+        mentions = list(iter_country_mentions(file, lang="es", chunk_size=10))
+        assert len(mentions) == 2000
+        assert {mention.country_code for mention in mentions} == {"CI", "TT"}
+
+
+class TestIterWindows:
+    @pytest.mark.parametrize("size, overlap", [(16, 5), (40, 10), (1000, 10)])
+    def test_windows_cover_all_words(self, size, overlap):
+        rng = random.Random(size)
+        text = " ".join(f"w{index}" for index in range(300))
+        windows = list(_iter_windows(split(text, rng), size, overlap))
+        # Windows are made of whole words, each one overlapping the previous
+        # one, and every word of the text is in a window
+        end = 0
+        for window in windows:
+            start = text.index(window)
+            assert start == 0 or text[start - 1] == " "
+            assert start <= max(0, end - overlap)
+            assert text[start + len(window) :][:1] in ("", " ")
+            end = start + len(window)
+        assert end == len(text)
+
+    def test_long_words(self):
+        # Words longer than the windows are cut
+        windows = list(_iter_windows(["ab" * 10, "cd" * 10], 8, 3))
+        assert windows == ["ab" * 10, "bab" + "cd" * 10, "dcd"]
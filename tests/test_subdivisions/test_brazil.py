@@ -5,8 +5,10 @@ from geoconvert.convert import (
     address_to_country_and_subdivision_codes,
     br_address_to_state_code,
     br_postcode_to_state_code,
+    br_postcodes_to_state_codes,
     br_state_name_to_state_code,
 )
+from geoconvert.ranges import RangeTable
 
 
 class TestBrazil:
@@ -111,7 +113,15 @@ class TestBrazil:
             == "BR-" + expected
         )
 
-    @mock.patch("geoconvert.convert.BR_POSTCODES_RANGE", {})
+    @mock.patch("geoconvert.data.BR_POSTCODES_TABLE", RangeTable({}))
     def test_br_postcode_to_state_code_with_no_data(self):
         # NOTE : this test has no other use than to keep a 100% coverage
         assert br_postcode_to_state_code("00000-000") is None
+
+    def test_br_postcodes_to_state_codes(self):
+        numpy = pytest.importorskip("numpy")
+        postcodes = numpy.array([1120010, 20000000, 59999999, 60000000, 99999999])
+        assert br_postcodes_to_state_codes(postcodes).tolist() == [
+            br_postcode_to_state_code(f"{postcode // 1000:05}-{postcode % 1000:03}")
+            for postcode in postcodes
+        ]
@@ -6,7 +6,30 @@ from geoconvert.convert import (
     fr_address_to_dept_code,
     fr_dept_name_to_dept_code,
     fr_postcode_to_dept_code,
+    fr_postcodes_to_dept_codes,
+    get_fr_postcode_table,
 )
+from geoconvert.data import corse_du_sud_special_zipcodes, fr_departments
+
+
+def reference_postcode_to_dept_code(postcode):
+    """
+    Reference implementation: special cases applied to each postcode.
+    """
+    if postcode in ("97701", "97098"):
+        return "977"
+    if postcode[:3] in ("977", "978"):
+        return "974"
+    if postcode[:2] == "20":
+        postcode_int = int(postcode)
+        if postcode_int < 20200 or postcode_int in corse_du_sud_special_zipcodes:
+            return "20A"
+        return "20B"
+    if postcode[:3] == "970":
+        return "971"
+    for code in (postcode[:2], postcode[:3]):
+        if code in fr_departments.values():
+            return code
 
 
 class TestFrance:
@@ -203,6 +226,11 @@ class TestFrance:
             ("Code postal 97051", "971"),
             ("Code postal 97080", "971"),
             ("99999", None),
+            # Any space in the postcode, but only ASCII digits
+            ("75\xa0001 Paris", "75"),
+            ("44\u202f000 Nantes", "44"),
+            ("75\t001 Paris", "75"),
+            ("Paris \u0667\u0665\u0660\u0660\u0661", None),
         ],
     )
     def test_fr_postcode_to_dept_code(self, input_data, expected):
@@ -265,3 +293,23 @@ class TestFrance:
     def test_fr_dept_name_dept_code(self, input_data, expected):
         assert fr_dept_name_to_dept_code(input_data) == expected
         assert dept_name_to_zipcode(input_data) == expected
+
+    def test_postcode_table_has_the_special_cases(self):
+        table = get_fr_postcode_table()
+        for postcode in range(100000):
+            expected = reference_postcode_to_dept_code(f"{postcode:05}")
+            assert table.get(postcode) == expected, postcode
+
+    def test_fr_postcodes_to_dept_codes(self):
+        numpy = pytest.importorskip("numpy")
+        postcodes = numpy.array([44000, 1000, 20183, 20537, 20223, 97098, 97821, -1])
+        assert fr_postcodes_to_dept_codes(postcodes).tolist() == [
+            "44",
+            "01",
+            "20A",
+            "20A",
+            "20B",
+            "977",
+            "974",
+            None,
+        ]
@@ -7,7 +7,9 @@ from geoconvert.convert import (
     de_hauptstadt_to_land_code,
     de_land_name_to_land_code,
     de_postcode_to_land_code,
+    de_postcodes_to_land_codes,
 )
+from geoconvert.ranges import RangeTable
 
 
 class TestGermany:
@@ -111,7 +113,14 @@ class TestGermany:
             == expected
         )
 
-    @mock.patch("geoconvert.convert.DE_POSTCODE_RANGE", {})
+    @mock.patch("geoconvert.data.DE_POSTCODE_TABLE", RangeTable({}))
     def test_de_postcode_to_land_code_with_no_data(self):
         # NOTE : this test has no other use than to keep a 100% coverage
         assert de_postcode_to_land_code("00000") is None
+
+    def test_de_postcodes_to_land_codes(self):
+        numpy = pytest.importorskip("numpy")
+        postcodes = numpy.array([1067, 14467, 53119, 66849, 99998])
+        assert de_postcodes_to_land_codes(postcodes).tolist() == [
+            de_postcode_to_land_code(f"{postcode:05}") for postcode in postcodes
+        ]
@@ -0,0 +1,61 @@
+import random
+import re
+
+import pytest
+
+from geoconvert.data import (
+    ALL_NUTS_CODES,
+    NUTS_CODES_BY_COUNTRY,
+    all_nuts_index,
+    nuts_indexes_by_country,
+)
+from geoconvert.token_index import TokenIndex
+
+
+def regex_find(codes, text):
+    """
+    Reference implementation: one regex branch per code.
+    """
+    match = re.search(r"|".join(rf"\b{code}\b" for code in codes), text, re.I)
+    if match:
+        return match.group().upper()
+
+
+def texts():
+    codes = list(ALL_NUTS_CODES)
+    rng = random.Random(13)
+    words = ["region", "Straße", "de", "fr", "123", "_", "é", "-", "DE1_", "xFR1"]
+    texts = [
+        "",
+        "stasticial region FRB04",
+        "stasticial region fr244",
+        "Ahrweiler DEB12 and DE1",
+        "DEB12x FR1_ FR1é ÉFR1 FR1-DE2",
+    ]
+    for code in codes:
+        texts.append(f"{rng.choice(words)} {code.lower()}{rng.choice(words)}")
+        texts.append(f"{rng.choice(words)}, {code} {rng.choice(codes)}")
+    for _ in range(200):
+        texts.append(" ".join(rng.choice(words + codes) for _ in range(6)))
+    return texts
+
+
+class TestTokenIndex:
+    def test_empty(self):
+        assert TokenIndex([]).find("DE1") is None
+
+    def test_all_nuts_codes(self):
+        for text in texts():
+            assert all_nuts_index.find(text) == regex_find(ALL_NUTS_CODES, text)
+
+    @pytest.mark.parametrize("country", list(NUTS_CODES_BY_COUNTRY))
+    def test_nuts_codes_by_country(self, country):
+        index = nuts_indexes_by_country[country]
+        assert nuts_indexes_by_country[country] is index
+        for text in texts():
+            expected = regex_find(NUTS_CODES_BY_COUNTRY[country], text)
+            assert index.find(text) == expected
+
+    def test_unknown_country(self):
+        with pytest.raises(KeyError):
+            nuts_indexes_by_country["XX"]
@@ -0,0 +1,212 @@
+import pytest
+
+from geoconvert import (
+    address_to_country_and_subdivision_codes,
+    address_to_country_code,
+    address_to_subdivision_code,
+    cache_info,
+    disable_cache,
+    enable_cache,
+    explain,
+    find_countries,
+)
+from geoconvert.utils import safe_string
+from tests.test_convert import ADDRESSES, TEXTS
+
+EXAMPLES = ADDRESSES + [
+    "DE2 région",
+    "Luz, 01120-010",
+    "Montréal, Québec",
+    "Toronto (Ontario) M5V 3L9",
+    "Loire-Atlantique",
+    "2 rue de Paris, Maine-et-Loire",
+    "Bonn, Nordrhein-Westfalen",
+    "Los Angeles, CA 90068",
+    "Springfield, Illinois",
+    "ÉTATS-UNIS",
+    "",
+]
+
+
+def matched_stages(explanation):
+    return [
+        (stage.name, stage.result, stage.matched, stage.span)
+        for stage in explanation.stages
+        if stage.matched
+    ]
+
+
+class TestExplain:
+    @pytest.mark.parametrize(
+        "function, options",
+        [
+            (address_to_country_code, {}),
+            (address_to_country_code, {"lang": "fr"}),
+            (address_to_subdivision_code, {}),
+            (address_to_subdivision_code, {"country": "us"}),
+            (address_to_subdivision_code, {"country": "XX"}),
+            (address_to_country_and_subdivision_codes, {}),
+            (address_to_country_and_subdivision_codes, {"lang": "de"}),
+            (address_to_country_and_subdivision_codes, {"country": "CA"}),
+            (address_to_country_and_subdivision_codes, {"country": "fr"}),
+            (address_to_country_and_subdivision_codes, {"country": "EG"}),
+            (address_to_country_and_subdivision_codes, {"iso_format": True}),
+        ],
+    )
+    def test_same_result(self, function, options):
+        for text in EXAMPLES + TEXTS:
+            explanation = explain(function, text, **options)
+            assert explanation.result == function(text, **options), text
+            assert explanation.elapsed >= sum(
+                stage.elapsed for stage in explanation.stages
+            )
+
+    def test_spans(self):
+        for text in EXAMPLES + TEXTS:
+            explanation = explain(address_to_country_and_subdivision_codes, text)
+            for stage in explanation.stages:
+                if stage.matched:
+                    start, end = stage.span
+                    assert safe_string(text[start:end]) in (
+                        stage.matched.lower(),
+                        stage.matched.replace("-", " "),
+                    ), (text, stage)
+
+    def test_nuts_code(self):
+        explanation = explain(address_to_country_and_subdivision_codes, "DE2 région")
+        assert explanation.result == ("DE", "BY")
+        assert matched_stages(explanation) == [("NUTS code", "DE2", "DE2", (0, 3))]
+
+    def test_country_name(self):
+        explanation = explain(address_to_country_code, "Ici, la Côte d’Ivoire")
+        assert explanation.result == "CI"
+        assert [stage.name for stage in explanation.stages] == [
+            "scan names",
+            "country name (de)",
+            "country name (en)",
+        ]
+        assert matched_stages(explanation) == [
+            ("country name (en)", "CI", "cote d'ivoire", (8, 21))
+        ]
+
+    def test_capital_name(self):
+        explanation = explain(address_to_country_code, "Kairo", lang="de")
+        assert [stage.name for stage in explanation.stages] == [
+            "scan names",
+            "country name (de)",
+            "capital name (de)",
+        ]
+        assert matched_stages(explanation) == [
+            ("capital name (de)", "EG", "kairo", (0, 5))
+        ]
+
+    @pytest.mark.parametrize(
+        "text, stage",
+        [
+            (
+                "Montréal, Québec",
+                ("ca_province_name_to_province_code (CA)", "QC", "quebec", (10, 16)),
+            ),
+            (
+                "Luz, 01120-010",
+                ("br_postcode_to_state_code (BR)", "SP", "01120-010", (5, 14)),
+            ),
+            (
+                "2 rue de Nantes, Maine-et-Loire",
+                ("fr_dept_name_to_dept_code (FR)", "49", "maine-et-loire", (17, 31)),
+            ),
+        ],
+    )
+    def test_safe_subdivision_lookups(self, text, stage):
+        explanation = explain(address_to_country_and_subdivision_codes, text)
+        # The subdivision is then looked up again, once the country is known
+        assert matched_stages(explanation)[0] == stage
+        assert matched_stages(explanation)[-1] == stage
+
+    @pytest.mark.parametrize(
+        "text, country, stages",
+        [
+            (
+                "2 rue X, 44000 Nantes, France",
+                None,
+                [
+                    ("country name (en)", "FR", "france", (23, 29)),
+                    ("fr_address_to_dept_code", "44", "44000", (9, 14)),
+                    ("fr_postcode_to_dept_code (FR)", "44", "44000", (9, 14)),
+                ],
+            ),
+            (
+                "Lyon, Auvergne-Rhône-Alpes",
+                "FR",
+                [
+                    ("fr_address_to_dept_code", "69", "auvergne rhone alpes", (6, 26)),
+                    (
+                        "fr_region_name_to_dept_code (FR)",
+                        "69",
+                        "auvergne rhone alpes",
+                        (6, 26),
+                    ),
+                ],
+            ),
+            (
+                "Bonn, DE1",
+                "DE",
+                [
+                    ("de_address_to_land_code", "BW", "DE1", (6, 9)),
+                    ("NUTS code (DE)", "DE1", "DE1", (6, 9)),
+                ],
+            ),
+            (
+                "Toronto, ON",
+                "CA",
+                [
+                    ("ca_address_to_province_code", "ON", "ON", (9, 11)),
+                    ("ca_province_code_to_province_code (CA)", "ON", "ON", (9, 11)),
+                ],
+            ),
+        ],
+    )
+    def test_subdivision_lookup_steps(self, text, country, stages):
+        explanation = explain(
+            address_to_country_and_subdivision_codes, text, country=country
+        )
+        assert matched_stages(explanation) == stages
+
+    def test_department_name_only_found_without_street_names(self):
+        text = "Haute rue abcdefghijklmnopqrs-Garonne"
+        explanation = explain(address_to_country_code, text)
+        assert explanation.result == address_to_country_code(text) == "FR"
+        assert matched_stages(explanation) == [
+            ("fr_dept_name_to_dept_code (FR)", "31", "haute-garonne", None)
+        ]
+
+    def test_lookups_which_cannot_find_anything_are_skipped(self):
+        explanation = explain(address_to_country_code, "Wonderland")
+        assert explanation.result is None
+        # Only the country and capital names were looked for
+        assert all("name (" in stage.name for stage in explanation.stages[1:])
+
+    def test_given_country(self):
+        explanation = explain(
+            address_to_country_and_subdivision_codes, "Los Angeles, CA", country="us"
+        )
+        assert explanation.result == ("US", "CA")
+        assert [(stage.name, stage.result) for stage in explanation.stages] == [
+            ("us_address_to_state_code", "CA"),
+            ("us_postcode_to_state_code (US)", None),
+            ("us_state_name_to_state_code (US)", None),
+            ("us_state_code_to_state_code (US)", "CA"),
+        ]
+        assert explanation.elapsed >= sum(stage.elapsed for stage in explanation.stages)
+
+    def test_result_cache_is_not_used(self):
+        enable_cache()
+        try:
+            explain(address_to_country_code, "Kairo")
+            assert cache_info().currsize == 0
+        finally:
+            disable_cache()
+
+    def test_other_functions(self):
+        with pytest.raises(ValueError, match="cannot be explained"):
+            explain(find_countries, "Kairo")
@@ -0,0 +1,192 @@
+import random
+import re
+import unicodedata
+
+import mock
+import pytest
+
+from geoconvert import (
+    address_to_country_and_subdivision_codes,
+    address_to_country_code,
+    address_to_subdivision_code,
+    ca_address_to_province_code,
+    ca_province_name_to_province_code,
+    country_name_to_country_code,
+    de_address_to_land_code,
+    fr_address_to_dept_code,
+    us_state_name_to_state_code,
+    utils,
+)
+from geoconvert.data import language_to_capital_names, language_to_country_names
+from geoconvert.utils import (
+    LookupText,
+    SafeText,
+    address_window,
+    iter_safe_chunks,
+    remove_accents,
+    safe_string,
+    safe_string_with_offsets,
+)
+
+
+def regex_remove_accents(text):
+    """
+    Reference implementation of remove_accents.
+    """
+    try:
+        text = text.decode("utf-8")
+    except (UnicodeEncodeError, AttributeError):
+        pass
+    text = text.replace("’", "'")
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore")
+    return text.decode()
+
+
+def regex_safe_string(text):
+    """
+    Reference implementation of safe_string, with one regex per step.
+    """
+    text = regex_remove_accents(text)
+    text = re.sub(r"[-:/<>]", " ", text)
+    text = re.sub(r"[ʼ]", "'", text)
+    text = re.sub(r"[^\w\s']", "", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip().lower()
+
+
+def corpus():
+    rng = random.Random(0)
+    # Every Latin, Greek, Cyrillic... character and a sample of the others,
+    # 64 by 64
+    characters = [chr(code) for code in range(0x3000)]
+    characters += [chr(rng.randrange(0x3000, 0xD800)) for _ in range(2000)]
+    characters += [chr(rng.randrange(0xE000, 0x30000)) for _ in range(2000)]
+    for i in range(0, len(characters), 64):
+        yield "".join(characters[i : i + 64])
+    # Country and capital names in every language
+    for language_to_names in (language_to_country_names, language_to_capital_names):
+        for names in language_to_names.values():
+            yield from names
+            yield from (name.upper() for name in names)
+    # Random texts mixing ASCII, accents, punctuation, spaces and anything else
+    common = "aAzZ09_ -:/<>'’ʼ.,;()&\t\n\x1c éÈçœßﬁ½①\u0301 "
+    for _ in range(2000):
+        yield "".join(
+            rng.choice(common) if rng.random() < 0.8 else rng.choice(characters)
+            for _ in range(rng.randint(0, 40))
+        )
+
+
+class TestUtils:
+    def test_same_results_as_regexes(self):
+        for text in corpus():
+            assert safe_string(text) == regex_safe_string(text), repr(text)
+            assert remove_accents(text) == regex_remove_accents(text), repr(text)
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            (b"C\xc3\xb4te d\xe2\x80\x99Ivoire", "cote d'ivoire"),
+            ("", ""),
+            ("  \t ", ""),
+            ("ﬁdji ½", "fidji 12"),
+        ],
+    )
+    def test_safe_string(self, text, expected):
+        assert safe_string(text) == expected
+
+    def test_safe_string_with_offsets(self):
+        for text in corpus():
+            safe_text, offsets = safe_string_with_offsets(text)
+            assert safe_text == safe_string(text), repr(text)
+            assert len(offsets) == len(safe_text)
+            assert offsets == sorted(offsets)
+            for char, offset in zip(safe_text, offsets):
+                assert char in safe_string(text[offset]) or char == " ", repr(text)
+        assert safe_string_with_offsets(b"C\xc3\xb4te") == ("cote", [0, 1, 2, 3])
+
+    def test_iter_safe_chunks(self):
+        rng = random.Random(1)
+        for text in corpus():
+            cuts = sorted(rng.randint(0, len(text)) for _ in range(rng.randint(0, 4)))
+            chunks = [text[start:end] for start, end in zip([0] + cuts, cuts + [None])]
+            assert "".join(iter_safe_chunks(chunks)) == safe_string(text), chunks
+
+    @pytest.mark.parametrize(
+        "text, max_length, expected",
+        [
+            ("Lorem ipsum", 20, "Lorem ipsum"),
+            ("Lorem ipsum dolor", 5, "Lorem"),
+            ("<p>Lorem</p><p>Ipsum</p><p>Dolor</p>", 11, "Lorem\nIpsum"),
+            ("Lorem\n\nParis, France\r\nIpsum", 18, "Paris, France"),
+            ("Lorem\n\nParis, France\r\nIpsum", 19, "Lorem\nParis, France"),
+            ("Lorem ipsum dolor\nAmet", 10, "Amet"),
+            ("Lorem | 44000 Nantes | Ipsum dolor sit amet", 20, "Lorem\n44000 Nantes"),
+            ("Lorem; 1 rue de Paris, 44000 Nantes; Ipsum", 12, "1 rue de Par"),
+            ("<div <div <div <div", 8, "<div <di"),
+            ("\n" * 20, 5, ""),
+        ],
+    )
+    def test_address_window(self, text, max_length, expected):
+        window = address_window(text, max_length)
+        assert window == expected
+        assert len(window) <= max_length
+
+
+class TestLookupText:
+    def test_safe_string_returns_safe_texts(self):
+        text = safe_string("Loire-Atlantique")
+        assert isinstance(text, SafeText)
+        assert text == "loire atlantique"
+        assert safe_string(text) is text
+
+    def test_lookup_text_computes_its_safe_version_once(self):
+        text = LookupText("Loire-Atlantique")
+        with mock.patch(
+            "geoconvert.utils._safe_string", wraps=utils._safe_string
+        ) as normalize:
+            assert safe_string(text) == "loire atlantique"
+            assert safe_string(text) == "loire atlantique"
+        assert normalize.call_count == 1
+
+    def test_wrap(self):
+        text = LookupText.wrap("Loire-Atlantique")
+        assert isinstance(text, LookupText)
+        assert LookupText.wrap(text) is text
+        safe_text = safe_string("Loire-Atlantique")
+        assert LookupText.wrap(safe_text) is safe_text
+        assert LookupText.wrap(b"bytes") == b"bytes"
+
+    @pytest.mark.parametrize(
+        "function, text, expected_calls",
+        [
+            (address_to_country_and_subdivision_codes, "Welcome to Cyprus", 1),
+            (address_to_country_and_subdivision_codes, "Lorain, OH 44052", 1),
+            (address_to_country_and_subdivision_codes, "Montréal, Québec", 1),
+            (address_to_country_and_subdivision_codes, "Nantes, France", 1),
+            (address_to_country_and_subdivision_codes, "Wonderland", 1),
+            # The street name is removed before looking for the department name
+            (address_to_country_and_subdivision_codes, "Rue de Paris, France", 2),
+            (address_to_country_code, "Welcome to Cyprus", 1),
+            (address_to_subdivision_code, "Lorain, OH 44052", 1),
+            (ca_address_to_province_code, "Toronto, ON", 1),
+            (de_address_to_land_code, "Potsdam", 1),
+            (fr_address_to_dept_code, "Loire-Atlantique", 1),
+        ],
+    )
+    def test_top_level_functions_normalize_once(self, function, text, expected_calls):
+        with mock.patch(
+            "geoconvert.utils._safe_string", wraps=utils._safe_string
+        ) as normalize:
+            function(text)
+        assert normalize.call_count == expected_calls
+
+    def test_already_safe_texts_are_not_normalized(self):
+        text = safe_string("Welcome to Ontario")
+        with mock.patch(
+            "geoconvert.utils._safe_string", wraps=utils._safe_string
+        ) as normalize:
+            assert ca_province_name_to_province_code(text) == "ON"
+            assert us_state_name_to_state_code(text) is None
+            assert country_name_to_country_code(text) is None
+        assert not normalize.called